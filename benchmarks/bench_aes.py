@@ -0,0 +1,76 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""AES backends benchmark.
+
+Measures the throughput of AES-256-IGE (MTProto packets) and AES-256-CTR (obfuscated transports,
+CDN files) with every backend available on this machine, to check what a deployment can expect.
+
+Usage: ``python -m benchmarks.bench_aes [seconds]``
+"""
+
+import argparse
+import os
+import time
+
+from pyrogram.crypto import aes
+
+SIZES = (1024, 64 * 1024, 1024 * 1024)
+
+
+def measure(func, data: bytes, budget: float) -> float:
+    rounds = 0
+    start = time.perf_counter()
+
+    while True:
+        func(data)
+        rounds += 1
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= budget:
+            return rounds * len(data) / elapsed / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("seconds", nargs="?", type=float, default=0.5, help="seconds per measure (default: 0.5)")
+    budget = parser.parse_args().seconds
+    key, iv = os.urandom(32), os.urandom(32)
+
+    print(f"Default backend: {aes.backend}")
+
+    for name in aes.available():
+        backend = aes.BACKENDS[name]()
+        stream = backend.CTR256(key, bytearray(iv[:16]))
+
+        for size in SIZES:
+            data = os.urandom(size)
+
+            encrypt = measure(lambda d: backend.ige256_encrypt(d, key, iv), data, budget)
+            decrypt = measure(lambda d: backend.ige256_decrypt(d, key, iv), data, budget)
+            ctr = measure(stream.update, data, budget)
+
+            print(
+                f"{name:>12} {size // 1024:>5} KiB | IGE encrypt {encrypt:9.2f} MiB/s | "
+                f"IGE decrypt {decrypt:9.2f} MiB/s | CTR {ctr:9.2f} MiB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Response decoding benchmark.
+
+Decodes ``messages.getHistory`` and ``messages.getDialogs`` shaped responses of growing
+size with:
+
+- legacy: the previous BytesIO decoder, whose :class:`~pyrogram.raw.core.Vector` copied the
+  whole remaining buffer for every vector it met in order to guess the size of its items;
+- stream: the generated ``read`` methods, still used for streams other than BytesIO;
+- buffer: the generated ``read_from`` methods, decoding straight from a memoryview.
+
+Usage: ``python -m benchmarks.bench_decode [rounds]``
+"""
+
+import argparse
+import time
+from io import BufferedReader, BytesIO
+from typing import Any
+
+from benchmarks import payloads
+from pyrogram.raw.core import Int, List, TLObject, Vector
+
+
+def legacy_read(cls, data: BytesIO, t: Any = None, *args: Any) -> List:
+    # Vectors of boxed objects used to be read without an item type
+    t = None if t is TLObject else t
+
+    count = Int.read(data)
+    left = len(data.read())
+    size = (left / count) if count else 0
+    data.seek(-left, 1)
+
+    return List(
+        t.read(data) if t
+        else Vector.read_bare(data, size)
+        for _ in range(count)
+    )
+
+
+def read_stream(payload: bytes) -> TLObject:
+    # Any stream which is not a BytesIO goes through the generated read methods
+    return TLObject.read(BufferedReader(BytesIO(payload)))
+
+
+def read_buffer(payload: bytes) -> TLObject:
+    return TLObject.read_from(memoryview(payload), 0)[0]
+
+
+def measure(read, payload: bytes, rounds: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(rounds):
+        read(payload)
+
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rounds", nargs="?", type=int, default=20, help="decoding rounds per response (default: 20)")
+    rounds = parser.parse_args().rounds
+    current_read = Vector.__dict__["read"]
+
+    for name, build in (("getHistory", payloads.get_history), ("getDialogs", payloads.get_dialogs)):
+        for count in (10, 100, 1000, 3000):
+            payload = build(count).write()
+
+            Vector.read = classmethod(legacy_read)
+
+            try:
+                legacy = measure(read_stream, payload, rounds)
+                expected = repr(read_stream(payload))
+            finally:
+                Vector.read = current_read
+
+            stream = measure(read_stream, payload, rounds)
+            buffer = measure(read_buffer, payload, rounds)
+
+            assert repr(read_stream(payload)) == repr(read_buffer(payload)) == expected
+
+            print(
+                f"{name:>10} x{count:<4} {len(payload) / 1024:8.1f} KiB | "
+                f"legacy {legacy * 1000:8.2f} ms | stream {stream * 1000:8.2f} ms | "
+                f"buffer {buffer * 1000:8.2f} ms | speedup {legacy / buffer:6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Cold import benchmark.
+
+Measures, in fresh interpreters, the time it takes to import pyrogram and the resulting
+resident memory, with raw constructors imported lazily (the default) and eagerly, as
+pyrogram.raw used to do at import time.
+
+Usage: ``python -m benchmarks.bench_import [runs]``
+"""
+
+import argparse
+import compileall
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pyrogram
+
+SCRIPT = """
+import json, resource, time
+
+start = time.perf_counter()
+
+import pyrogram
+
+if {eager}:
+    from pyrogram.raw.all import constructors, objects
+
+    for i in constructors:
+        objects[i]
+
+print(json.dumps({{
+    "time": time.perf_counter() - start,
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+def measure(eager: bool, runs: int):
+    results = [
+        json.loads(subprocess.check_output([sys.executable, "-c", SCRIPT.format(eager=eager)]))
+        for _ in range(runs)
+    ]
+
+    return (
+        statistics.median(i["time"] for i in results),
+        statistics.median(i["rss"] for i in results)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("runs", nargs="?", type=int, default=5, help="fresh interpreters started per mode (default: 5)")
+    runs = parser.parse_args().runs
+
+    # Compile everything upfront, so that only imports are measured
+    compileall.compile_dir(Path(pyrogram.__file__).parent, quiet=1)
+
+    eager = measure(True, runs)
+    lazy = measure(False, runs)
+
+    for name, (time, rss) in (("eager", eager), ("lazy", lazy)):
+        print(f"{name:>6}: import {time * 1000:8.1f} ms | max RSS {rss:6.1f} MiB")
+
+    print(f"speedup: import {eager[0] / lazy[0]:.2f}x | memory {eager[1] / lazy[1]:.2f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Lazy decoding benchmark.
+
+Decodes a stream of ``Updates`` as pushed by busy groups, eagerly (``read_from``) and lazily
+(``read_lazy``), and has a handler look at the fields most handlers care about: the message id,
+chat, sender and text. Reports the CPU time per update and the memory held by the decoded
+updates, while they are alive.
+
+Usage: ``python -m benchmarks.bench_lazy [bursts]``
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks import payloads
+from pyrogram.raw.core import TLObject
+
+
+def handle(updates) -> None:
+    for update in updates.updates:
+        message = getattr(update, "message", None)
+
+        if message is not None:
+            message.id, message.peer_id, message.from_id, message.message
+
+
+def measure(read, stream: list, rounds: int = 5) -> tuple:
+    timings = []
+
+    # The first round also pays for importing the constructors met, the best one is kept
+    for _ in range(rounds):
+        start = time.process_time()
+
+        for payload in stream:
+            handle(read(memoryview(payload), 0)[0])
+
+        timings.append(time.process_time() - start)
+
+    cpu = min(timings)
+
+    tracemalloc.start()
+    alive = [read(memoryview(payload), 0)[0] for payload in stream]
+
+    for updates in alive:
+        handle(updates)
+
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return cpu, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bursts", nargs="?", type=int, default=200, help="bursts of updates decoded (default: 200)")
+    bursts = parser.parse_args().bursts
+    stream = [payloads.group_updates(20).write() for _ in range(bursts)]
+    count = bursts * len(payloads.group_updates(20).updates)
+
+    eager_cpu, eager_memory = measure(TLObject.read_from, stream)
+    lazy_cpu, lazy_memory = measure(TLObject.read_lazy, stream)
+
+    # The fields which were never accessed must decode to the same values
+    eager, lazy = (TLObject.read_from(memoryview(stream[0]), 0)[0], TLObject.read_lazy(memoryview(stream[0]), 0)[0])
+    assert repr(eager) == repr(lazy)
+
+    for name, cpu, memory in (("eager", eager_cpu, eager_memory), ("lazy", lazy_cpu, lazy_memory)):
+        print(
+            f"{name:>5} | {cpu / count * 1e6:7.2f} us/update | "
+            f"{memory / 1024 / 1024:7.2f} MiB for {count} updates ({memory / count:7.0f} B/update)"
+        )
+
+    print(f"speedup {eager_cpu / lazy_cpu:.2f}x, memory {lazy_memory / eager_memory:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
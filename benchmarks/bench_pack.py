@@ -0,0 +1,106 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Upload path serialization benchmark.
+
+Measures how fast ``SaveBigFilePart`` requests go through the message factory and
+:func:`pyrogram.crypto.mtproto.pack`, compared with the previous implementation which
+serialized the body once for the length and once more for packing.
+
+Usage: ``python -m benchmarks.bench_pack [parts]``
+"""
+
+import argparse
+import os
+import time
+from hashlib import sha256
+
+from pyrogram import raw
+from pyrogram.crypto import aes, mtproto
+from pyrogram.raw.core import Long, Message
+from pyrogram.session.internals import MsgFactory, MsgId
+
+PART_SIZE = 512 * 1024
+
+
+def legacy_pack(message: Message, salt: int, session_id: bytes, auth_key: bytes, auth_key_id: bytes) -> bytes:
+    data = Long(salt) + session_id + message.write()
+    padding = os.urandom(-(len(data) + 12) % 16 + 12)
+
+    msg_key_large = sha256(auth_key[88: 88 + 32] + data + padding).digest()
+    msg_key = msg_key_large[8:24]
+    aes_key, aes_iv = mtproto.kdf(auth_key, msg_key, True)
+
+    return auth_key_id + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+
+
+def legacy_factory(body) -> Message:
+    return Message(body, MsgId(), 1, len(body))
+
+
+def run(name: str, factory, pack, parts: int):
+    auth_key = os.urandom(256)
+    auth_key_id = os.urandom(8)
+    session_id = os.urandom(8)
+    chunk = os.urandom(PART_SIZE)
+
+    bodies = [
+        raw.functions.upload.SaveBigFilePart(
+            file_id=1,
+            file_part=i,
+            file_total_parts=parts,
+            bytes=chunk
+        )
+        for i in range(parts)
+    ]
+
+    start = time.perf_counter()
+
+    for body in bodies:
+        factory(body).write()
+
+    serialize = time.perf_counter() - start
+    start = time.perf_counter()
+
+    for body in bodies:
+        pack(factory(body), 0, session_id, auth_key, auth_key_id)
+
+    total = time.perf_counter() - start
+    size = parts * PART_SIZE / 1024 / 1024
+
+    print(
+        f"{name:>8}: serialize {size / serialize:8.1f} MiB/s | "
+        f"serialize + encrypt {size / total:8.1f} MiB/s"
+    )
+
+    return serialize, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("parts", nargs="?", type=int, default=32, help="number of 512 KiB parts to pack (default: 32)")
+    parts = parser.parse_args().parts
+
+    before = run("legacy", legacy_factory, legacy_pack, parts)
+    after = run("current", MsgFactory(), mtproto.pack, parts)
+
+    print(f"speedup: serialize {before[0] / after[0]:.2f}x | serialize + encrypt {before[1] / after[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Receive path benchmark.
+
+A local server streams intermediate framed packets, which are received with
+:class:`~pyrogram.connection.transport.TCPIntermediate`, compared with the previous
+StreamReader based implementation which read each frame in several ``recv`` calls,
+concatenating chunks under a fresh ``wait_for`` timer for every read.
+
+Usage: ``python -m benchmarks.bench_recv``
+"""
+
+import asyncio
+import os
+import time
+from struct import pack, unpack
+
+from pyrogram.connection.transport import TCPIntermediate
+
+
+class LegacyIntermediate:
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, address):
+        self.reader, self.writer = await asyncio.open_connection(*address)
+        self.writer.write(b"\xee" * 4)
+
+    async def read(self, length: int):
+        data = b""
+
+        while len(data) < length:
+            chunk = await asyncio.wait_for(self.reader.read(length - len(data)), 10)
+
+            if not chunk:
+                return None
+
+            data += chunk
+
+        return data
+
+    async def recv(self):
+        length = await self.read(4)
+
+        if length is None:
+            return None
+
+        return await self.read(unpack("<i", length)[0])
+
+    async def close(self):
+        self.writer.close()
+
+
+async def measure(transport, size: int, count: int) -> float:
+    frame = pack("<i", size) + os.urandom(size)
+
+    async def handle(reader, writer):
+        await reader.readexactly(4)
+
+        for _ in range(count):
+            writer.write(frame)
+            await writer.drain()
+
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    await transport.connect(("127.0.0.1", server.sockets[0].getsockname()[1]))
+
+    start = time.perf_counter()
+
+    for _ in range(count):
+        assert len(await transport.recv()) == size
+
+    elapsed = time.perf_counter() - start
+
+    await transport.close()
+    server.close()
+    await server.wait_closed()
+
+    return elapsed
+
+
+async def main():
+    for size, count in ((128, 20000), (4096, 5000), (1024 * 1024, 100)):
+        legacy = await measure(LegacyIntermediate(), size, count)
+        current = await measure(TCPIntermediate(False, None), size, count)
+
+        print(
+            f"{size:>8} B x{count:<6} | legacy {count / legacy:9.0f} frames/s | "
+            f"current {count / current:9.0f} frames/s | speedup {legacy / current:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Replay protection benchmark.
+
+Runs the msg_id checks :meth:`~pyrogram.session.Session.handle_packet` makes for every
+message received, on a stream of ids arriving slightly out of order as container items
+do, with:
+
+- legacy: the previous sorted list, scanned for every lookup and shifted for every insertion;
+- window: :class:`~pyrogram.session.internals.ReplayWindow`.
+
+Usage: ``python -m benchmarks.bench_replay [messages]``
+"""
+
+import argparse
+import bisect
+import random
+import time
+
+from pyrogram.session import Session
+from pyrogram.session.internals import ReplayWindow
+
+SIZE = Session.STORED_MSG_IDS_MAX_SIZE
+
+
+def msg_ids(count: int) -> list:
+    start = int(time.time()) * 2 ** 32
+    ids = [start + i * 4 + 1 for i in range(count)]
+
+    # Shuffle within groups of 16, like the messages of a container
+    for i in range(0, count, 16):
+        group = ids[i:i + 16]
+        random.shuffle(group)
+        ids[i:i + 16] = group
+
+    return ids
+
+
+def legacy(ids: list) -> int:
+    stored = []
+    rejected = 0
+
+    for msg_id in ids:
+        if len(stored) > SIZE:
+            del stored[:SIZE // 2]
+
+        if stored and (msg_id < stored[0] or msg_id in stored):
+            rejected += 1
+            continue
+
+        bisect.insort(stored, msg_id)
+
+    return rejected
+
+
+def window(ids: list) -> int:
+    stored = ReplayWindow(SIZE)
+    rejected = 0
+
+    for msg_id in ids:
+        if stored and (msg_id < stored.floor or msg_id in stored):
+            rejected += 1
+            continue
+
+        stored.add(msg_id)
+
+    return rejected
+
+
+def measure(check, ids: list, rounds: int = 5) -> float:
+    best = float("inf")
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        check(ids)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("messages", nargs="?", type=int, default=200_000, help="msg_ids checked (default: 200000)")
+    count = parser.parse_args().messages
+
+    for label, ids in (
+        ("in order", msg_ids(count)),
+        # A tenth of the messages received twice
+        ("replays", [i for n, i in enumerate(msg_ids(count)) for _ in range(2 if n % 10 == 0 else 1)]),
+    ):
+        assert legacy(ids) == window(ids)
+
+        old = measure(legacy, ids)
+        new = measure(window, ids)
+
+        print(
+            f"{label:>8} x{len(ids):<7} | legacy {old / len(ids) * 1e9:8.0f} ns/msg | "
+            f"window {new / len(ids) * 1e9:8.0f} ns/msg | speedup {old / new:6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Download path decryption benchmark.
+
+Measures how many packets per second :func:`pyrogram.crypto.mtproto.unpack` goes through,
+for update sized packets and file chunks, compared with the previous implementation which
+read the packet and its plaintext through BytesIO copies, hashed a concatenated copy of the
+plaintext and derived the AES key from freshly sliced parts of the auth key for every packet.
+Both make the same security checks.
+
+Usage: ``python -m benchmarks.bench_unpack [seconds]``
+"""
+
+import argparse
+import os
+import time
+from hashlib import sha256
+from io import BytesIO
+
+from benchmarks import payloads
+from pyrogram import raw
+from pyrogram.crypto import aes, mtproto
+from pyrogram.errors import SecurityCheckMismatch
+from pyrogram.raw.core import Message
+
+AUTH_KEY = os.urandom(256)
+SESSION_ID = os.urandom(8)
+
+
+def legacy_kdf(auth_key: bytes, msg_key: bytes, outgoing: bool) -> tuple:
+    x = 0 if outgoing else 8
+
+    sha256_a = sha256(msg_key + auth_key[x: x + 36]).digest()
+    sha256_b = sha256(auth_key[x + 40:x + 76] + msg_key).digest()
+
+    aes_key = sha256_a[:8] + sha256_b[8:24] + sha256_a[24:32]
+    aes_iv = sha256_b[:8] + sha256_a[8:24] + sha256_b[24:32]
+
+    return aes_key, aes_iv
+
+
+def legacy_unpack(b: BytesIO, session_id: bytes, auth_key: bytes, auth_key_id: bytes) -> Message:
+    # The previous implementation, checks included, only its error reporting is left out
+    SecurityCheckMismatch.check(b.read(8) == auth_key_id, "b.read(8) == auth_key_id")
+
+    msg_key = b.read(16)
+    aes_key, aes_iv = legacy_kdf(auth_key, msg_key, False)
+    data = BytesIO(aes.ige256_decrypt(b.read(), aes_key, aes_iv))
+    data.read(8)  # Salt
+
+    SecurityCheckMismatch.check(data.read(8) == session_id, "data.read(8) == session_id")
+
+    message = Message.read(data)
+
+    SecurityCheckMismatch.check(
+        msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24],
+        "msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24]"
+    )
+
+    data.seek(32)  # Get to the payload, skip salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
+    payload = data.read()
+    padding = payload[message.length:]
+    SecurityCheckMismatch.check(12 <= len(padding) <= 1024, "12 <= len(padding) <= 1024")
+    SecurityCheckMismatch.check(len(payload) % 4 == 0, "len(payload) % 4 == 0")
+
+    SecurityCheckMismatch.check(message.msg_id % 2 != 0, "message.msg_id % 2 != 0")
+
+    return message
+
+
+def server_packet(body) -> bytes:
+    # Packets are sealed the way the server does, with the incoming half of the auth key
+    server_key = AUTH_KEY[8:] + bytes(8)
+    data = body.write()
+
+    return mtproto.pack(Message(body, 3, 1, len(data), data), 0, SESSION_ID, server_key, bytes(8))
+
+
+def measure(unpack, packet: bytes, seconds: float) -> float:
+    auth_key = mtproto.AuthKey(AUTH_KEY)
+    count = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            unpack(packet, SESSION_ID, auth_key, auth_key.id)
+
+        count += 100
+
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("seconds", nargs="?", type=float, default=1, help="seconds spent on each measure (default: 1)")
+    seconds = parser.parse_args().seconds
+    auth_key_id = mtproto.AuthKey(AUTH_KEY).id
+
+    packets = {
+        "ping": raw.types.Pong(msg_id=1, ping_id=2),
+        "update": raw.types.UpdateShort(update=raw.types.UpdateUserStatus(
+            user_id=1, status=raw.types.UserStatusOnline(expires=2)
+        ), date=3),
+        "group": payloads.group_updates(5),
+        "chunk": raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=os.urandom(512 * 1024)),
+    }
+
+    for name, body in packets.items():
+        packet = auth_key_id + server_packet(body)[8:]
+
+        legacy = lambda p, *args: legacy_unpack(BytesIO(p), *args)
+
+        # Runs are interleaved and the best one is kept, to even out the noise
+        before = after = 0
+
+        for _ in range(5):
+            before = max(before, measure(legacy, packet, seconds / 5))
+            after = max(after, measure(mtproto.unpack, packet, seconds / 5))
+
+        print(
+            f"{name:>7} {len(packet) / 1024:8.1f} KiB | legacy {before:9.0f} packets/s | "
+            f"current {after:9.0f} packets/s | speedup {after / before:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
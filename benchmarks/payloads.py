@@ -0,0 +1,137 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Synthetic, but realistically shaped, Telegram payloads shared by the benchmarks."""
+
+from pyrogram import raw
+
+
+def message(i: int, channel_id: int = 1234567890) -> raw.types.Message:
+    text = f"Message number {i} with a link https://example.com/{i} and some #hashtag @mention"
+
+    return raw.types.Message(
+        id=i,
+        peer_id=raw.types.PeerChannel(channel_id=channel_id),
+        from_id=raw.types.PeerUser(user_id=1000 + i % 50),
+        date=1700000000 + i,
+        message=text,
+        entities=[
+            raw.types.MessageEntityUrl(offset=35, length=24),
+            raw.types.MessageEntityHashtag(offset=70, length=8),
+            raw.types.MessageEntityMention(offset=79, length=8),
+            raw.types.MessageEntityBold(offset=0, length=7),
+        ],
+        reply_markup=raw.types.ReplyInlineMarkup(
+            rows=[
+                raw.types.KeyboardButtonRow(
+                    buttons=[
+                        raw.types.KeyboardButtonCallback(text=f"Button {j}", data=f"data_{i}_{j}".encode())
+                        for j in range(3)
+                    ]
+                )
+            ]
+        ),
+        reactions=raw.types.MessageReactions(
+            results=[
+                raw.types.ReactionCount(reaction=raw.types.ReactionEmoji(emoticon=e), count=i % 7 + 1)
+                for e in ("👍", "❤", "🔥")
+            ]
+        ),
+        views=i * 10,
+        forwards=i,
+        edit_date=1700000100 + i,
+    )
+
+
+def user(i: int) -> raw.types.User:
+    return raw.types.User(
+        id=1000 + i,
+        access_hash=i * 7919,
+        first_name=f"User {i}",
+        last_name="Benchmark",
+        username=f"user_{i}",
+        status=raw.types.UserStatusRecently(),
+    )
+
+
+def channel(channel_id: int = 1234567890) -> raw.types.Channel:
+    return raw.types.Channel(
+        id=channel_id,
+        access_hash=42,
+        title="Benchmark group",
+        photo=raw.types.ChatPhotoEmpty(),
+        date=1700000000,
+        megagroup=True,
+        username="benchmark_group",
+    )
+
+
+def get_history(count: int = 100) -> raw.types.messages.Messages:
+    return raw.types.messages.Messages(
+        messages=[message(i) for i in range(count)],
+        topics=[],
+        chats=[channel()],
+        users=[user(i) for i in range(50)],
+    )
+
+
+def get_dialogs(count: int = 100) -> raw.types.messages.Dialogs:
+    return raw.types.messages.Dialogs(
+        dialogs=[
+            raw.types.Dialog(
+                peer=raw.types.PeerChannel(channel_id=1000000 + i),
+                top_message=i,
+                read_inbox_max_id=i,
+                read_outbox_max_id=i,
+                unread_count=i % 5,
+                unread_mentions_count=0,
+                unread_reactions_count=0,
+                unread_poll_votes_count=0,
+                notify_settings=raw.types.PeerNotifySettings(),
+            )
+            for i in range(count)
+        ],
+        messages=[message(i, 1000000 + i) for i in range(count)],
+        chats=[channel(1000000 + i) for i in range(count)],
+        users=[user(i) for i in range(count)],
+    )
+
+
+def group_updates(count: int = 20) -> raw.types.Updates:
+    """A burst of updates as pushed by a busy group: new messages mixed with noise."""
+    updates = []
+
+    for i in range(count):
+        updates.append(raw.types.UpdateNewChannelMessage(message=message(i), pts=i, pts_count=1))
+        updates.append(raw.types.UpdateUserStatus(user_id=1000 + i, status=raw.types.UserStatusOnline(expires=i)))
+        updates.append(raw.types.UpdateChannelUserTyping(
+            channel_id=1234567890,
+            from_id=raw.types.PeerUser(user_id=1000 + i),
+            action=raw.types.SendMessageTypingAction()
+        ))
+        updates.append(raw.types.UpdateReadChannelInbox(
+            channel_id=1234567890, max_id=i, still_unread_count=0, pts=i
+        ))
+
+    return raw.types.Updates(
+        updates=updates,
+        users=[user(i) for i in range(count)],
+        chats=[channel()],
+        date=1700000000,
+        seq=0,
+    )
@@ -24,7 +24,8 @@ import urllib.request
 import urllib.error
 from functools import partial
 from pathlib import Path
-from typing import NamedTuple, List, Tuple
+from struct import calcsize
+from typing import NamedTuple, Dict, List, Tuple
 
 # from autoflake import fix_code
 # from black import format_str, FileMode
@@ -44,6 +45,15 @@ INT_RE = re.compile(r"int(\d+)")
 
 CORE_TYPES = ["int", "long", "int128", "int256", "double", "bytes", "string", "Bool", "true"]
 
+# Fixed-width core types decoded together through precompiled struct.Struct objects
+STRUCT_FORMATS = {"#": "i", "int": "i", "long": "q", "double": "d"}
+
+# Sizes of the fixed-width core types, for skipping over them
+CORE_SIZES = {"#": 4, "int": 4, "long": 8, "double": 8, "int128": 16, "int256": 32, "Bool": 4}
+
+# Vectors of these types are always consumed right away, there's no point in deferring their decoding
+EAGER_VECTORS = {"Update", "User", "Chat"}
+
 WARNING = """
 # # # # # # # # # # # # # # # # # # # # # # # #
 #               !!! WARNING !!!               #
@@ -52,6 +62,33 @@ WARNING = """
 # # # # # # # # # # # # # # # # # # # # # # # #
 """.strip()
 
+LAZY_DECODER = """
+    @staticmethod
+    def read_lazy(b: memoryview, o: int, *args: Any) -> Tuple["{name}", int]:
+        obj = object.__new__({name})
+
+        {read_lazy_types}
+        return obj, o
+"""
+
+ALL_OBJECTS = """
+
+class Objects(dict):
+    \"\"\"Constructors by ID, each one imported the first time it is needed\"\"\"
+
+    def __missing__(self, key: int) -> type:
+        path, name = constructors[key].rsplit(".", 1)
+        value = self[key] = getattr(import_module(path), name)
+
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in constructors
+
+
+objects = Objects()
+"""
+
 # noinspection PyShadowingBuiltins
 open = partial(open, encoding="utf-8")
 
@@ -153,6 +190,266 @@ def get_type_hint(type: str) -> str:
         return f'{type}{" = None" if is_flag else ""}'
 
 
+def get_vector_item_reader(sub_type: str) -> str:
+    """Get the reader of vector items, so that the decoder never has to guess their size"""
+    return sub_type.title() if sub_type in CORE_TYPES else "TLObject"
+
+
+def is_lazy(arg_type: str) -> bool:
+    """Check whether a field holds TL objects, which can be decoded lazily"""
+    if "vector" in arg_type.lower():
+        return arg_type.split("<")[1][:-1] not in CORE_TYPES
+
+    return arg_type not in CORE_TYPES
+
+
+def is_deferred(arg_type: str) -> bool:
+    """Check whether the decoding of a field can be deferred until it's accessed.
+
+    Only vectors are deferred: finding the end of a field means walking through it, which is worth it
+    for whole lists of objects, but not for single ones. Vectors of updates, users and chats aren't
+    either, Client.handle_updates goes through them for every update received.
+    """
+    return is_lazy(arg_type) and "vector" in arg_type.lower() and arg_type.split("<")[1][:-1] not in EAGER_VECTORS
+
+
+def get_struct(structs: Dict[str, str], fmt: str) -> str:
+    """Get the name of the module level Struct object for the given format"""
+    if fmt not in structs:
+        structs[fmt] = f"_STRUCT_{len(structs)}"
+
+    return structs[fmt]
+
+
+def get_read_from(args: List[Tuple[str, str]], structs: Dict[str, str], lazy: bool = False) -> str:
+    """Get the body of the memoryview based decoder.
+
+    The lazy decoder decodes nested objects lazily too and only records the offset of deferred vectors,
+    see TLObject.read_lazy.
+    """
+    deferred = lazy and any(is_deferred(FLAGS_RE.sub("", arg_type)) for _, arg_type in args)
+    lines = ["lazy = {}"] if deferred else []
+    run = []
+    true_flags = []
+
+    def flush_run():
+        # Consecutive fixed-width fields are decoded with a single unpack_from call
+        if run:
+            fmt = "<" + "".join(i[1] for i in run)
+            targets = ", ".join(i[0] for i in run) + ("," if len(run) == 1 else "")
+            lines.append(f"{targets} = {get_struct(structs, fmt)}.unpack_from(b, o)")
+            lines.append(f"o += {calcsize(fmt)}")
+            run.clear()
+
+        # Boolean flags are emitted after the run, so that they don't split it
+        lines.extend(true_flags)
+        true_flags.clear()
+
+    def reader(arg_type: str) -> str:
+        if arg_type in CORE_TYPES:
+            return f"{arg_type.title()}.read_from(b, o)"
+
+        if "vector" in arg_type.lower():
+            sub_type = arg_type.split("<")[1][:-1]
+
+            # Vectors of updates get the filter of the updates to decode, when there is one
+            return "TLObject.read_from(b, o, {}{})".format(
+                get_vector_item_reader(sub_type), ", *args" if sub_type == "Update" else ""
+            )
+
+        return "TLObject.read_from(b, o)"
+
+    def field(arg_name: str, arg_type: str) -> List[str]:
+        if not lazy or not is_lazy(arg_type):
+            return [f"obj.{arg_name}, o = {reader(arg_type)}"]
+
+        if not is_deferred(arg_type):
+            return [f"obj.{arg_name}, o = {reader(arg_type).replace('.read_from(', '.read_lazy(')}"]
+
+        # The reader arguments are stored along with the offset, the vector itself is skipped over
+        return [f'lazy["{arg_name}"] = o, (TLObject,)', "o = TLObject.skip(b, o, TLObject)"]
+
+    for arg_name, arg_type in args:
+        flag = FLAGS_RE_2.match(arg_type)
+
+        if re.match(r"flags\d?", arg_name) and arg_type == "#":
+            run.append((arg_name, STRUCT_FORMATS[arg_type]))
+            continue
+
+        if not flag:
+            if arg_type in STRUCT_FORMATS:
+                run.append((f"obj.{arg_name}", STRUCT_FORMATS[arg_type]))
+            else:
+                flush_run()
+                lines.extend(field(arg_name, arg_type))
+
+            continue
+
+        number, index, flag_type = flag.groups()
+        condition = f"flags{number} & (1 << {index})"
+
+        if flag_type == "true":
+            true_flags.append(f"obj.{arg_name} = True if {condition} else False")
+            continue
+
+        flush_run()
+
+        lines.append(f"if {condition}:")
+
+        if flag_type in STRUCT_FORMATS:
+            fmt = "<" + STRUCT_FORMATS[flag_type]
+            lines.append(f"    obj.{arg_name}, = {get_struct(structs, fmt)}.unpack_from(b, o)")
+            lines.append(f"    o += {calcsize(fmt)}")
+        else:
+            lines.extend(f"    {line}" for line in field(arg_name, flag_type))
+
+        lines.append("else:")
+        lines.append(f"    obj.{arg_name} = {'[]' if 'vector' in flag_type.lower() else 'None'}")
+
+    flush_run()
+
+    if deferred:
+        lines.append("if lazy:")
+        lines.append("    obj._lazy = b, lazy")
+
+    return "\n        ".join(lines)
+
+
+def get_skip(args: List[Tuple[str, str]], structs: Dict[str, str]) -> str:
+    """Get the body of the function finding the end of an object without decoding it"""
+    lines = []
+    run = []
+
+    def flush_run():
+        # Consecutive fixed-width fields are skipped at once
+        if run:
+            lines.append(f"o += {sum(run)}")
+            run.clear()
+
+    def skipper(arg_type: str) -> str:
+        if arg_type in CORE_TYPES:
+            return f"{arg_type.title()}.skip(b, o)"
+
+        if "vector" in arg_type.lower():
+            return f"TLObject.skip(b, o, {get_vector_item_reader(arg_type.split('<')[1][:-1])})"
+
+        return "TLObject.skip(b, o)"
+
+    for arg_name, arg_type in args:
+        flag = FLAGS_RE_2.match(arg_type)
+
+        if re.match(r"flags\d?", arg_name) and arg_type == "#":
+            lines.append(f"{arg_name}, = {get_struct(structs, '<i')}.unpack_from(b, o + {sum(run)})")
+            run.append(CORE_SIZES[arg_type])
+            continue
+
+        if not flag:
+            if arg_type in CORE_SIZES:
+                run.append(CORE_SIZES[arg_type])
+            else:
+                flush_run()
+                lines.append(f"o = {skipper(arg_type)}")
+
+            continue
+
+        number, index, flag_type = flag.groups()
+
+        if flag_type == "true":
+            continue
+
+        flush_run()
+
+        lines.append(f"if flags{number} & (1 << {index}):")
+
+        if flag_type in CORE_SIZES:
+            lines.append(f"    o += {CORE_SIZES[flag_type]}")
+        else:
+            lines.append(f"    o = {skipper(flag_type)}")
+
+    flush_run()
+
+    return "\n        ".join(lines)
+
+
+def get_write_into(id: str, args: List[Tuple[str, str]], structs: Dict[str, str]) -> str:
+    """Get the body of the serializer appending to a shared bytearray"""
+    lines = []
+    run = [(id, "I")]
+
+    # Flags are computed upfront, so that they can be packed together with the fields around them
+    for arg_name, arg_type in args:
+        if not (re.match(r"flags\d?", arg_name) and arg_type == "#"):
+            continue
+
+        lines.append(f"{arg_name} = 0")
+
+        for i in args:
+            flag = FLAGS_RE_2.match(i[1])
+
+            if flag and arg_name == f"flags{flag.group(1)}":
+                if flag.group(3) == "true" or flag.group(3).startswith("Vector"):
+                    lines.append(f"{arg_name} |= (1 << {flag.group(2)}) if self.{i[0]} else 0")
+                else:
+                    lines.append(f"{arg_name} |= (1 << {flag.group(2)}) if self.{i[0]} is not None else 0")
+
+        lines.append("")
+
+    def flush_run():
+        # Consecutive fixed-width fields are encoded with a single pack call
+        if run:
+            fmt = "<" + "".join(i[1] for i in run)
+            lines.append(f"b += {get_struct(structs, fmt)}.pack({', '.join(i[0] for i in run)})")
+            run.clear()
+
+    def writer(arg_type: str, value: str) -> str:
+        if arg_type in CORE_TYPES:
+            return f"{arg_type.title()}.write_into(b, {value})"
+
+        if "vector" in arg_type.lower():
+            sub_type = arg_type.split("<")[1][:-1]
+            return f"Vector.write_into(b, {value}{f', {sub_type.title()}' if sub_type in CORE_TYPES else ''})"
+
+        return f"{value}.write_into(b)"
+
+    for arg_name, arg_type in args:
+        flag = FLAGS_RE_2.match(arg_type)
+
+        if re.match(r"flags\d?", arg_name) and arg_type == "#":
+            run.append((arg_name, STRUCT_FORMATS[arg_type]))
+            continue
+
+        if not flag:
+            if arg_type in STRUCT_FORMATS:
+                run.append((f"self.{arg_name}", STRUCT_FORMATS[arg_type]))
+            else:
+                flush_run()
+                lines.append(writer(arg_type, f"self.{arg_name}"))
+
+            continue
+
+        flag_type = flag.group(3)
+
+        if flag_type == "true":
+            continue
+
+        flush_run()
+
+        # Must match the flags computation above
+        if "vector" in flag_type.lower():
+            lines.append(f"if self.{arg_name}:")
+        else:
+            lines.append(f"if self.{arg_name} is not None:")
+
+        if flag_type in STRUCT_FORMATS:
+            lines.append(f"    b += {get_struct(structs, '<' + STRUCT_FORMATS[flag_type])}.pack(self.{arg_name})")
+        else:
+            lines.append(f"    {writer(flag_type, f'self.{arg_name}')}")
+
+    flush_run()
+
+    return "\n        ".join(lines)
+
+
 def sort_args(args):
     """Put flags at the end"""
     args = args.copy()
@@ -230,9 +527,11 @@ def start(format: bool = False):
         schema = (f1.read() + f2.read() + f3.read()).splitlines()
 
     with open(HOME_PATH / "template/type.txt") as f1, \
-        open(HOME_PATH / "template/combinator.txt") as f2:
+        open(HOME_PATH / "template/combinator.txt") as f2, \
+        open(HOME_PATH / "template/namespace.txt") as f3:
         type_tmpl = f1.read()
         combinator_tmpl = f2.read()
+        namespace_tmpl = f3.read()
 
     with open(NOTICE_PATH, encoding="utf-8") as f:
         notice = []
@@ -467,36 +766,13 @@ def start(format: bool = False):
                              f"            :nosignatures:\n\n" \
                              f"            " + references
 
-        write_types = read_types = "" if c.has_flags else "# No flags\n        "
+        read_types = "" if c.has_flags else "# No flags\n        "
 
         for arg_name, arg_type in c.args:
             flag = FLAGS_RE_2.match(arg_type)
 
             if re.match(r"flags\d?", arg_name) and arg_type == "#":
-                write_flags = []
-
-                for i in c.args:
-                    flag = FLAGS_RE_2.match(i[1])
-
-                    if flag:
-                        if arg_name != f"flags{flag.group(1)}":
-                            continue
-
-                        if flag.group(3) == "true" or flag.group(3).startswith("Vector"):
-                            write_flags.append(f"{arg_name} |= (1 << {flag.group(2)}) if self.{i[0]} else 0")
-                        else:
-                            write_flags.append(
-                                f"{arg_name} |= (1 << {flag.group(2)}) if self.{i[0]} is not None else 0")
-
-                write_flags = "\n        ".join([
-                    f"{arg_name} = 0",
-                    "\n        ".join(write_flags),
-                    f"b.write(Int({arg_name}))\n        "
-                ])
-
-                write_types += write_flags
                 read_types += f"\n        {arg_name} = Int.read(b)\n        "
-
                 continue
 
             if flag:
@@ -506,59 +782,55 @@ def start(format: bool = False):
                     read_types += "\n        "
                     read_types += f"{arg_name} = True if flags{number} & (1 << {index}) else False"
                 elif flag_type in CORE_TYPES:
-                    write_types += "\n        "
-                    write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write({flag_type.title()}(self.{arg_name}))\n        "
-
                     read_types += "\n        "
                     read_types += f"{arg_name} = {flag_type.title()}.read(b) if flags{number} & (1 << {index}) else None"
                 elif "vector" in flag_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
 
-                    write_types += "\n        "
-                    write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
-                    )
-
                     read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{}) if flags{} & (1 << {}) else []\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else "", number, index
+                    read_types += "{} = TLObject.read(b, {}) if flags{} & (1 << {}) else []\n        ".format(
+                        arg_name, get_vector_item_reader(sub_type), number, index
                     )
                 else:
-                    write_types += "\n        "
-                    write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
-
                     read_types += "\n        "
                     read_types += f"{arg_name} = TLObject.read(b) if flags{number} & (1 << {index}) else None\n        "
             else:
                 if arg_type in CORE_TYPES:
-                    write_types += "\n        "
-                    write_types += f"b.write({arg_type.title()}(self.{arg_name}))\n        "
-
                     read_types += "\n        "
                     read_types += f"{arg_name} = {arg_type.title()}.read(b)\n        "
                 elif "vector" in arg_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
 
-                    write_types += "\n        "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
-                    )
-
                     read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{})\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
+                    read_types += "{} = TLObject.read(b, {})\n        ".format(
+                        arg_name, get_vector_item_reader(sub_type)
                     )
                 else:
-                    write_types += "\n        "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
-
                     read_types += "\n        "
                     read_types += f"{arg_name} = TLObject.read(b)\n        "
 
-        slots = ", ".join([f'"{i[0]}"' for i in sorted_args])
+        structs = {}
+        read_from_types = get_read_from(c.args, structs)
+        skip_types = get_skip(c.args, structs)
+
+        # Only types get a lazy decoder, and only when they hold other TL objects
+        field_types = [FLAGS_RE.sub("", arg_type) for _, arg_type in c.args if arg_type != "#"]
+        lazy_slots = []
+
+        if c.section == "types" and any(is_lazy(t) for t in field_types):
+            read_lazy = LAZY_DECODER.format(name=c.name, read_lazy_types=get_read_from(c.args, structs, True))
+
+            # Deferred fields are tracked in a private slot until they are decoded
+            if any(is_deferred(t) for t in field_types):
+                lazy_slots.append('"_lazy"')
+        else:
+            read_lazy = ""
+
+        write_types = get_write_into(c.id, c.args, structs)
+        structs = "".join(f'\n{name} = Struct("{fmt}")' for fmt, name in structs.items())
+
+
+        slots = ", ".join([f'"{i[0]}"' for i in sorted_args] + lazy_slots)
         return_arguments = ", ".join([f"{i[0]}={i[0]}" for i in sorted_args])
 
         # Generate generic type hint for functions
@@ -578,6 +850,10 @@ def start(format: bool = False):
             arguments=arguments,
             fields=fields,
             read_types=read_types,
+            read_from_types=read_from_types,
+            skip_types=skip_types,
+            read_lazy=read_lazy,
+            structs=structs,
             write_types=write_types,
             return_arguments=return_arguments,
             generic_type=generic_type
@@ -604,60 +880,39 @@ def start(format: bool = False):
 
         d[c.namespace].append(c.name)
 
-    for namespace, types in namespaces_to_types.items():
-        os.makedirs(DESTINATION_PATH / "base" / namespace, exist_ok=True)
-        with open(DESTINATION_PATH / "base" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
-
-            for t in types:
-                module = t
-
-                if module == "Updates":
-                    module = "UpdatesT"
-
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_types))}")
-
-    for namespace, types in namespaces_to_constructors.items():
-        with open(DESTINATION_PATH / "types" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
-
-            for t in types:
-                module = t
-
-                if module == "Updates":
-                    module = "UpdatesT"
-
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_constructors))}\n")
-
-    for namespace, types in namespaces_to_functions.items():
-        with open(DESTINATION_PATH / "functions" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
-
-            for t in types:
-                module = t
-
-                if module == "Updates":
-                    module = "UpdatesT"
-
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_functions))}")
+    for section, namespaces in (
+        ("base", namespaces_to_types),
+        ("types", namespaces_to_constructors),
+        ("functions", namespaces_to_functions)
+    ):
+        for namespace, types in namespaces.items():
+            os.makedirs(DESTINATION_PATH / section / namespace, exist_ok=True)
+
+            modules = {t: snake("UpdatesT" if t == "Updates" else t) for t in types}
+            children = list(filter(bool, namespaces)) if not namespace else []
+
+            imports = [f"from .{module} import {t}" for t, module in modules.items()]
+
+            if children:
+                imports.append(f"from . import {', '.join(children)}")
+
+            with open(DESTINATION_PATH / section / namespace / "__init__.py", "w") as f:
+                f.write(
+                    namespace_tmpl.format(
+                        notice=notice,
+                        warning=WARNING,
+                        imports="\n    ".join(imports),
+                        modules="".join(f'\n    "{t}": "{module}",' for t, module in modules.items()),
+                        namespaces=", ".join(f'"{i}"' for i in children)
+                    )
+                )
 
     with open(DESTINATION_PATH / "all.py", "w", encoding="utf-8") as f:
         f.write(notice + "\n\n")
         f.write(WARNING + "\n\n")
+        f.write("from importlib import import_module\n\n")
         f.write(f"layer = {layer}\n\n")
-        f.write("objects = {")
+        f.write("constructors = {")
 
         for c in combinators:
             f.write(f'\n    {c.id}: "pyrogram.raw.{c.section}.{c.qualname}",')
@@ -672,6 +927,7 @@ def start(format: bool = False):
         f.write('\n    0x5bb8e511: "pyrogram.raw.core.Message",')
 
         f.write("\n}\n")
+        f.write(ALL_OBJECTS)
 
 
 if "__main__" == __name__:
@@ -20,8 +20,6 @@ __version__ = "2.4.1"
 __license__ = "GNU Lesser General Public License v3.0 (LGPL-3.0)"
 __copyright__ = "Copyright (C) 2017-present Dan <https://github.com/delivrance>"
 
-from concurrent.futures.thread import ThreadPoolExecutor
-
 
 class StopTransmission(Exception):
     pass
@@ -39,4 +37,8 @@ from . import raw, types, filters, handlers, emoji, enums
 from .client import Client
 from .sync import idle, compose
 
-crypto_executor = ThreadPoolExecutor(1, thread_name_prefix="CryptoWorker")
+from .crypto.scheduler import CryptoScheduler
+
+# Shared by the clients which don't have a crypto pool of their own
+crypto_scheduler = CryptoScheduler()
+crypto_executor = crypto_scheduler.executor
@@ -27,13 +27,14 @@ import shutil
 import sys
 from concurrent.futures.thread import ThreadPoolExecutor
 from configparser import ConfigParser
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from hashlib import sha256
 from importlib import import_module
 from io import StringIO, BytesIO
 from mimetypes import MimeTypes
 from pathlib import Path
-from typing import Union, List, Optional, Callable, AsyncGenerator, Type, Tuple
+from typing import Union, List, Optional, Callable, AsyncGenerator, Type, Tuple, Dict
 
 import aiofiles
 
@@ -43,6 +44,7 @@ from pyrogram import enums
 from pyrogram import raw
 from pyrogram import utils
 from pyrogram.crypto import aes
+from pyrogram.crypto.scheduler import CryptoScheduler
 from pyrogram.errors import CDNFileHashMismatch, AuthBytesInvalid, ChannelInvalid, PersistentTimestampInvalid, \
     PersistentTimestampOutdated
 from pyrogram.errors import (
@@ -58,17 +60,17 @@ from pyrogram.errors import (
 )
 from pyrogram.handlers.handler import Handler
 from pyrogram.methods import Methods
-from pyrogram.session import Auth, Session
+from pyrogram.session import Auth, MediaSessions, Session
 from pyrogram.storage import FileStorage, MemoryStorage
 from pyrogram.types import User, TermsOfService
 from pyrogram.utils import ainput
-from .connection import Connection
+from .connection import Connection, ProxyPool
 from .connection.transport import TCP, TCPAbridged
 from .dispatcher import Dispatcher
 from .file_id import FileId, FileType, ThumbnailSource
 from .mime_types import mime_types
 from .parser import Parser
-from .session.internals import MsgId
+from .session.internals import MsgId, DataCenter, RateLimiter
 
 log = logging.getLogger(__name__)
 
@@ -108,10 +110,12 @@ class Client(Methods):
             Pass True to connect to Telegram using IPv6.
             Defaults to False (IPv4).
 
-        proxy (``dict``, *optional*):
+        proxy (``dict`` | List of ``dict`` | :obj:`~pyrogram.connection.ProxyPool`, *optional*):
             The Proxy settings as dict.
             E.g.: *dict(scheme="socks5", hostname="11.22.33.44", port=1234, username="user", password="pass")*.
             The *username* and *password* can be omitted if the proxy doesn't require authorization.
+            Pass a list of them, or a :obj:`~pyrogram.connection.ProxyPool`, to spread the connections over
+            several proxies and fail over when one goes down.
 
         test_mode (``bool``, *optional*):
             Enable or disable login to the test servers.
@@ -210,6 +214,53 @@ class Client(Methods):
         use_experimental_download_boost (``bool``, *optional*):
             If True, downloads multiple file chunks in parallel instead of sequentially.
             May significantly increase download speed on fast connections. Defaults to False.
+
+        lazy_decoding (``bool``, *optional*):
+            If True, the raw objects received are decoded lazily: their vector fields (entities, ...) are only
+            decoded the first time they are accessed. Vectors of updates, users and chats, as well as single nested
+            objects such as media and reply markups, are still decoded right away. Saves CPU time when handlers only
+            look at a few fields, at the cost of keeping the received data alive along with the objects.
+            Defaults to False.
+
+        crypto_workers (``int``, *optional*):
+            Number of threads of a pool encrypting and decrypting the large packets of this client only, instead of
+            the single thread shared by every client in the process. Small packets are always processed inline.
+            Defaults to None (shared thread).
+
+        crypto_pool_per_dc (``bool``, *optional*):
+            Pass True to give each data center its own pool of *crypto_workers* threads (1 if unset), so that file
+            transfers with a data center don't delay the packets of the others.
+            Defaults to False.
+
+        ping_interval (``float``, *optional*):
+            Seconds of silence after which the main session pings the server to keep the connection alive. No ping
+            is sent while data keeps coming in, except a few times as long apart.
+            Defaults to 5.
+
+        media_ping_interval (``float``, *optional*):
+            Same as *ping_interval*, for the sessions transferring files with other data centers.
+            Defaults to 30.
+
+        media_sessions_idle_timeout (``float``, *optional*):
+            Seconds after which the sessions transferring files are closed if unused. They are opened again, without
+            logging in anew, when needed. Pass 0 to keep them open.
+            Defaults to 300.
+
+        max_media_sessions (``int``, *optional*):
+            How many sessions transferring files can be open at once, the least recently used ones are closed first
+            when more are needed. Pass 0 for no limit.
+            Defaults to 5.
+
+        updates_queue_size (``int``, *optional*):
+            How many updates can wait to be processed before the client stops reading from the network, holding back
+            the server until they're caught up with. Updates are processed one at a time, in the order they come in.
+            Defaults to 1000.
+
+        max_requests_in_flight (``int``, *optional*):
+            How many requests each session can have waiting for a response at once. The next ones wait for their
+            turn, by priority (see :obj:`~pyrogram.enums.RequestPriority`). The limit is lowered for a while whenever
+            the server reports a flood of requests.
+            Defaults to 100.
     """
 
     APP_VERSION = f"PyrogramMod {__version__}"
@@ -231,6 +282,8 @@ class Client(Methods):
 
     MAX_CONCURRENT_TRANSMISSIONS = 1
 
+    UPDATES_QUEUE_SIZE = 1000
+
     mimetypes = MimeTypes()
     mimetypes.readfp(StringIO(mime_types))
 
@@ -244,7 +297,7 @@ class Client(Methods):
         system_version: str = SYSTEM_VERSION,
         lang_code: str = LANG_CODE,
         ipv6: bool = False,
-        proxy: dict = None,
+        proxy: Union[dict, List[dict], ProxyPool] = None,
         test_mode: bool = False,
         bot_token: str = None,
         session_string: str = None,
@@ -267,7 +320,16 @@ class Client(Methods):
         connection_factory: Type[Connection] = Connection,
         protocol_factory: Type[TCP] = TCPAbridged,
         use_experimental_upload_boost: bool = False,
-        use_experimental_download_boost: bool = False
+        use_experimental_download_boost: bool = False,
+        lazy_decoding: bool = False,
+        crypto_workers: int = None,
+        crypto_pool_per_dc: bool = False,
+        ping_interval: float = Session.PING_INTERVAL,
+        media_ping_interval: float = Session.MEDIA_PING_INTERVAL,
+        media_sessions_idle_timeout: float = MediaSessions.IDLE_TIMEOUT,
+        max_media_sessions: int = MediaSessions.MAX_SESSIONS,
+        updates_queue_size: int = UPDATES_QUEUE_SIZE,
+        max_requests_in_flight: int = Session.MAX_REQUESTS_IN_FLIGHT
     ):
         super().__init__()
 
@@ -279,7 +341,7 @@ class Client(Methods):
         self.system_version = system_version
         self.lang_code = lang_code.lower()
         self.ipv6 = ipv6
-        self.proxy = proxy
+        self.proxy = ProxyPool(proxy) if isinstance(proxy, list) else proxy
         self.test_mode = test_mode
         self.bot_token = bot_token
         self.session_string = session_string
@@ -301,6 +363,15 @@ class Client(Methods):
         self.protocol_factory = protocol_factory
         self.use_experimental_upload_boost = use_experimental_upload_boost
         self.use_experimental_download_boost = use_experimental_download_boost
+        self.lazy_decoding = lazy_decoding
+        self.crypto_workers = crypto_workers
+        self.crypto_pool_per_dc = crypto_pool_per_dc
+        self.ping_interval = ping_interval
+        self.media_ping_interval = media_ping_interval
+        self.updates_queue_size = updates_queue_size
+        self.rate_limiter = RateLimiter()
+        self.max_requests_in_flight = max_requests_in_flight
+        self.crypto_schedulers: Dict[Optional[int], CryptoScheduler] = {}
         self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="Handler")
 
         if self.session_string:
@@ -318,8 +389,7 @@ class Client(Methods):
 
         self.session = None
 
-        self.media_sessions = {}
-        self.media_sessions_lock = asyncio.Lock()
+        self.media_sessions = MediaSessions(self, media_sessions_idle_timeout, max_media_sessions)
 
         self.save_file_semaphore = asyncio.Semaphore(self.max_concurrent_transmissions)
         self.get_file_semaphore = asyncio.Semaphore(self.max_concurrent_transmissions)
@@ -342,6 +412,13 @@ class Client(Methods):
         self.updates_watchdog_event = asyncio.Event()
         self.last_update_time = datetime.now()
 
+        # Updates received, handled one at a time and in order. The sessions wait for room once there are
+        # updates_queue_size of them, except while the updates being handled wait for a response themselves.
+        self.raw_updates = asyncio.Queue()
+        self.raw_updates_room = asyncio.Event()
+        self.raw_updates_task = None
+        self.updates_fetching = 0
+
         self.loop = None
         self.config_file = config_file
 
@@ -579,6 +656,65 @@ class Client(Methods):
 
         return is_min
 
+    async def put_updates(self, updates):
+        while self.raw_updates.qsize() >= self.updates_queue_size and not self.updates_fetching:
+            self.raw_updates_room.clear()
+            await self.raw_updates_room.wait()
+
+        self.raw_updates.put_nowait(updates)
+
+        if self.raw_updates_task is None:
+            self.raw_updates_task = asyncio.get_running_loop().create_task(self.updates_worker())
+
+    async def updates_worker(self):
+        while True:
+            updates = await self.raw_updates.get()
+
+            if self.raw_updates.qsize() < self.updates_queue_size:
+                self.raw_updates_room.set()
+
+            try:
+                await self.handle_updates(updates)
+            except Exception as e:
+                log.exception(e)
+
+    async def stop_updates_worker(self):
+        if self.raw_updates_task is not None:
+            self.raw_updates_task.cancel()
+
+            try:
+                await self.raw_updates_task
+            except asyncio.CancelledError:
+                pass
+
+            self.raw_updates_task = None
+
+        # The updates left are handled again with the difference fetched after a restart
+        while not self.raw_updates.empty():
+            self.raw_updates.get_nowait()
+
+        self.raw_updates_room.set()
+
+    @asynccontextmanager
+    async def fetching_difference(self):
+        # The responses come in after the updates waiting behind the ones being handled, let them through meanwhile
+        self.updates_fetching += 1
+        self.raw_updates_room.set()
+
+        try:
+            yield
+        finally:
+            self.updates_fetching -= 1
+
+    def pipeline_stats(self) -> Dict[str, int]:
+        """Get the number of packets and updates waiting at each stage of the main session, from the ones received
+        and not read yet to the ones waiting for the handlers (see :meth:`~pyrogram.session.Session.stats`)."""
+        return {
+            **(self.session.stats() if self.session is not None else {"frames": 0, "packets": 0}),
+            "updates": self.raw_updates.qsize(),
+            "dispatcher": self.dispatcher.updates_queue.qsize()
+        }
+
     async def handle_updates(self, updates):
         self.last_update_time = datetime.now()
 
@@ -621,37 +757,39 @@ class Client(Methods):
                     message = update.message
 
                     if not isinstance(message, raw.types.MessageEmpty):
-                        retries = 5
-                        while retries > 0:
-                            try:
-                                diff = await self.invoke(
-                                    raw.functions.updates.GetChannelDifference(
-                                        channel=await self.resolve_peer(utils.get_channel_id(channel_id)),
-                                        filter=raw.types.ChannelMessagesFilter(
-                                            ranges=[raw.types.MessageRange(
-                                                min_id=update.message.id,
-                                                max_id=update.message.id
-                                            )]
-                                        ),
-                                        pts=pts - pts_count,
-                                        limit=pts,
-                                        force=False
+                        # Resolving the channel may take a request too
+                        async with self.fetching_difference():
+                            retries = 5
+                            while retries > 0:
+                                try:
+                                    diff = await self.invoke(
+                                        raw.functions.updates.GetChannelDifference(
+                                            channel=await self.resolve_peer(utils.get_channel_id(channel_id)),
+                                            filter=raw.types.ChannelMessagesFilter(
+                                                ranges=[raw.types.MessageRange(
+                                                    min_id=update.message.id,
+                                                    max_id=update.message.id
+                                                )]
+                                            ),
+                                            pts=pts - pts_count,
+                                            limit=pts,
+                                            force=False
+                                        )
                                     )
-                                )
-                                break
-                            except (ChannelPrivate, PersistentTimestampOutdated, PersistentTimestampInvalid):
-                                pass
-                            except OSError as e:
-                                log.error(f"Connection error while fetching ChannelDifference: {e}. Retrying...")
-                                retries -= 1
-                                if retries == 0:
-                                    log.error(f"Max retries reached for ChannelDifference: {e}")
-                                    raise
-                                await asyncio.sleep(5)
-                        else:
-                            if not isinstance(diff, raw.types.updates.ChannelDifferenceEmpty):
-                                users.update({u.id: u for u in diff.users})
-                                chats.update({c.id: c for c in diff.chats})
+                                    break
+                                except (ChannelPrivate, PersistentTimestampOutdated, PersistentTimestampInvalid):
+                                    pass
+                                except OSError as e:
+                                    log.error(f"Connection error while fetching ChannelDifference: {e}. Retrying...")
+                                    retries -= 1
+                                    if retries == 0:
+                                        log.error(f"Max retries reached for ChannelDifference: {e}")
+                                        raise
+                                    await asyncio.sleep(5)
+                            else:
+                                if not isinstance(diff, raw.types.updates.ChannelDifferenceEmpty):
+                                    users.update({u.id: u for u in diff.users})
+                                    chats.update({c.id: c for c in diff.chats})
 
                 self.dispatcher.updates_queue.put_nowait((update, users, chats))
         elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
@@ -666,24 +804,25 @@ class Client(Methods):
                     )
                 )
 
-            retries = 5
-            while retries > 0:
-                try:
-                    diff = await self.invoke(
-                        raw.functions.updates.GetDifference(
-                            pts=updates.pts - updates.pts_count,
-                            date=updates.date,
-                            qts=-1
+            async with self.fetching_difference():
+                retries = 5
+                while retries > 0:
+                    try:
+                        diff = await self.invoke(
+                            raw.functions.updates.GetDifference(
+                                pts=updates.pts - updates.pts_count,
+                                date=updates.date,
+                                qts=-1
+                            )
                         )
-                    )
-                    break
-                except OSError as e:
-                    log.error(f"Connection error during GetDifference: {e}. Retrying...")
-                    retries -= 1
-                    if retries == 0:
-                        log.error(f"Max retries reached for GetDifference: {e}")
-                        raise
-                    await asyncio.sleep(5)
+                        break
+                    except OSError as e:
+                        log.error(f"Connection error during GetDifference: {e}. Retrying...")
+                        retries -= 1
+                        if retries == 0:
+                            log.error(f"Max retries reached for GetDifference: {e}")
+                            raise
+                        await asyncio.sleep(5)
 
             if diff.new_messages:
                 self.dispatcher.updates_queue.put_nowait((
@@ -823,9 +962,31 @@ class Client(Methods):
         log.info("Recovered %s messages and %s updates.", message_updates_counter, other_updates_counter)
         return (message_updates_counter, other_updates_counter)
 
+    def get_crypto_scheduler(self, dc_id: int) -> CryptoScheduler:
+        """Get the scheduler encrypting and decrypting the packets exchanged with a data center."""
+        if self.crypto_workers is None and not self.crypto_pool_per_dc:
+            return pyrogram.crypto_scheduler
+
+        key = dc_id if self.crypto_pool_per_dc else None
+
+        if key not in self.crypto_schedulers:
+            self.crypto_schedulers[key] = CryptoScheduler(
+                self.crypto_workers if self.crypto_workers is not None else 1,
+                name=f"CryptoWorker-{self.name}" + (f"-DC{dc_id}" if key is not None else "")
+            )
+
+        return self.crypto_schedulers[key]
+
     async def load_session(self):
         await self.storage.open()
 
+        # Connect to the addresses the last help.GetConfig gave, even if it expired since
+        test_mode = await self.storage.test_mode()
+        DataCenter.update(await self.storage.dc_options(), self.test_mode if test_mode is None else test_mode)
+
+        # Along with the limits learned from the flood waits of the previous runs
+        self.rate_limiter.load(await self.storage.rate_limits())
+
         session_empty = any([
             await self.storage.test_mode() is None,
             await self.storage.auth_key() is None,
@@ -1077,40 +1238,10 @@ class Client(Methods):
 
             dc_id = file_id.dc_id
 
-            try:
-                session = self.media_sessions.get(dc_id)
-                if not session:
-                    session = self.media_sessions[dc_id] = Session(
-                        self, dc_id,
-                        await Auth(self, dc_id, await self.storage.test_mode()).create()
-                        if dc_id != await self.storage.dc_id()
-                        else await self.storage.auth_key(),
-                        await self.storage.test_mode(),
-                        is_media=True
-                    )
-                    await session.start()
+            session = None
 
-                    if dc_id != await self.storage.dc_id():
-                        for _ in range(3):
-                            exported_auth = await self.invoke(
-                                raw.functions.auth.ExportAuthorization(
-                                    dc_id=dc_id
-                                )
-                            )
-
-                            try:
-                                await session.invoke(
-                                    raw.functions.auth.ImportAuthorization(
-                                        id=exported_auth.id,
-                                        bytes=exported_auth.bytes
-                                    )
-                                )
-                            except AuthBytesInvalid:
-                                continue
-                            else:
-                                break
-                        else:
-                            raise AuthBytesInvalid
+            try:
+                session = await self.media_sessions.acquire(dc_id)
 
                 if not use_experimental_download_boost:
                     current = 0
@@ -1162,14 +1293,9 @@ class Client(Methods):
                             )
 
                     elif isinstance(r, raw.types.upload.FileCdnRedirect):
-                        cdn_session = Session(
-                            self, r.dc_id, await Auth(self, r.dc_id, await self.storage.test_mode()).create(),
-                            await self.storage.test_mode(), is_media=True, is_cdn=True
-                        )
+                        cdn_session = await self.media_sessions.acquire(r.dc_id, cdn=True)
 
                         try:
-                            await cdn_session.start()
-
                             while True:
                                 r2 = await cdn_session.invoke(
                                     raw.functions.upload.GetCdnFile(
@@ -1242,7 +1368,7 @@ class Client(Methods):
                         except Exception as e:
                             raise e
                         finally:
-                            await cdn_session.stop()
+                            self.media_sessions.release(cdn_session)
                 else:
                     total = abs(limit) or file_size or (1 << 31) - 1
                     total_chunks = (total + chunk_size - 1) // chunk_size
@@ -1264,14 +1390,7 @@ class Client(Methods):
                         if isinstance(r, raw.types.upload.File):
                             return idx, r.bytes
                         elif isinstance(r, raw.types.upload.FileCdnRedirect):
-                            cdn_session = Session(
-                                self, r.dc_id,
-                                await Auth(self, r.dc_id, await self.storage.test_mode()).create(),
-                                await self.storage.test_mode(),
-                                is_media=True,
-                                is_cdn=True
-                            )
-                            await cdn_session.start()
+                            cdn_session = await self.media_sessions.acquire(r.dc_id, cdn=True)
                             try:
                                 r2 = await cdn_session.invoke(
                                     raw.functions.upload.GetCdnFile(
@@ -1312,7 +1431,7 @@ class Client(Methods):
                                     )
                                 return idx, decrypted_chunk
                             finally:
-                                await cdn_session.stop()
+                                self.media_sessions.release(cdn_session)
 
                         raise RuntimeError("Unexpected response type")
 
@@ -1350,6 +1469,9 @@ class Client(Methods):
                 raise
             except Exception as e:
                 log.exception(e)
+            finally:
+                if session is not None:
+                    self.media_sessions.release(session)
 
     def guess_mime_type(self, filename: str) -> Optional[str]:
         return self.mimetypes.guess_type(filename)[0]
@@ -17,3 +17,4 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .connection import Connection
+from .proxy_pool import ProxyPool
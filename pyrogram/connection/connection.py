@@ -18,9 +18,11 @@
 
 import asyncio
 import logging
-from typing import Optional, Type
+from typing import Optional, Type, List, Tuple, Union
 
+from .proxy_pool import ProxyPool
 from .transport import TCP, TCPAbridged
+from ..crypto.scheduler import CryptoScheduler
 from ..session.internals import DataCenter
 
 log = logging.getLogger(__name__)
@@ -29,14 +31,18 @@ log = logging.getLogger(__name__)
 class Connection:
     MAX_CONNECTION_ATTEMPTS = 3
 
+    # Head start given to an endpoint before the next one is tried alongside
+    RACE_DELAY = 0.25
+
     def __init__(
         self,
         dc_id: int,
         test_mode: bool,
         ipv6: bool,
-        proxy: dict,
+        proxy: Union[dict, ProxyPool],
         media: bool = False,
-        protocol_factory: Type[TCP] = TCPAbridged
+        protocol_factory: Type[TCP] = TCPAbridged,
+        crypto_scheduler: Optional[CryptoScheduler] = None
     ) -> None:
         self.dc_id = dc_id
         self.test_mode = test_mode
@@ -44,38 +50,173 @@ class Connection:
         self.proxy = proxy
         self.media = media
         self.protocol_factory = protocol_factory
+        self.crypto_scheduler = crypto_scheduler
 
-        self.address = DataCenter(dc_id, test_mode, ipv6, media)
+        self.address = next(iter(DataCenter.endpoints(dc_id, test_mode, ipv6, media)), None)
         self.protocol: Optional[TCP] = None
 
+        # The proxy drawn from the pool for the current connection
+        self.pool = proxy if isinstance(proxy, ProxyPool) else None
+        self.pool_proxy: Optional[dict] = None
+
     async def connect(self) -> None:
+        loop = asyncio.get_running_loop()
+
         for i in range(Connection.MAX_CONNECTION_ATTEMPTS):
-            self.protocol = self.protocol_factory(ipv6=self.ipv6, proxy=self.proxy)
-
-            try:
-                log.info("Connecting...")
-                await self.protocol.connect(self.address)
-            except OSError as e:
-                log.warning("Unable to connect due to network issues: %s", e)
-                await self.protocol.close()
-                await asyncio.sleep(1)
-            else:
+            log.info("Connecting...")
+
+            proxy = self.pool.pick(self.media) if self.pool else self.proxy
+            endpoints = DataCenter.endpoints(self.dc_id, self.test_mode, self.ipv6, self.media)
+
+            start = loop.time()
+            protocol = await self.race(endpoints, proxy)
+
+            if self.pool:
+                if protocol is None:
+                    # The next attempt goes through another proxy, if any works
+                    self.pool.failed(proxy)
+                else:
+                    self.pool.connected(proxy, loop.time() - start)
+                    self.pool_proxy = proxy
+
+            if protocol is not None:
+                self.protocol = protocol
+
                 log.info("Connected! %s DC%s%s - IPv%s",
                          "Test" if self.test_mode else "Production",
                          self.dc_id,
                          " (media)" if self.media else "",
-                         "6" if self.ipv6 else "4")
+                         "6" if ":" in self.address[0] else "4")
                 break
+
+            # Failing over to another proxy doesn't need to wait
+            if self.pool is None or self.pool.pick(self.media) is proxy:
+                await asyncio.sleep(1)
         else:
             log.warning("Connection failed! Trying again...")
             raise ConnectionError
 
+    async def race(self, endpoints: List[Tuple[str, int]], proxy: Optional[dict] = None) -> Optional[TCP]:
+        """Connect to the first endpoint which answers, through the *proxy* if any.
+
+        Endpoints are tried in order, each one getting a head start of :attr:`RACE_DELAY` seconds, or
+        less if it fails earlier, before the next one joins in (happy eyeballs, RFC 8305).
+        """
+        endpoints = iter(endpoints)
+        addresses = {}
+        pending = set()
+        protocol = None
+
+        try:
+            while protocol is None:
+                address = next(endpoints, None)
+
+                if address is not None:
+                    task = asyncio.create_task(self.open(address, proxy))
+                    addresses[task] = address
+                    pending.add(task)
+                elif not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=Connection.RACE_DELAY if address is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    e = task.exception()
+
+                    if e is not None:
+                        # Network issues only rule the endpoint out, anything else is a real error
+                        if not isinstance(e, OSError):
+                            raise e
+
+                        continue
+
+                    if protocol is None:
+                        protocol = task.result()
+                        self.address = addresses[task]
+                    else:
+                        await task.result().close()
+        finally:
+            for task in pending:
+                task.cancel()
+
+            # Attempts may still have made it in the meantime
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, TCP):
+                    await result.close()
+
+        return protocol
+
+    async def open(self, address: Tuple[str, int], proxy: Optional[dict] = None) -> TCP:
+        protocol = self.protocol_factory(ipv6=":" in address[0], proxy=proxy)
+
+        if self.crypto_scheduler is not None:
+            protocol.crypto_scheduler = self.crypto_scheduler
+
+        start = asyncio.get_running_loop().time()
+
+        try:
+            await protocol.connect(address)
+        except OSError as e:
+            log.warning("Unable to connect to %s:%s due to network issues: %s", *address, e)
+
+            # Through a proxy, it's the proxy which is measured rather than the endpoint
+            if not proxy:
+                DataCenter.record_failure(address)
+
+            await protocol.close()
+            raise
+        except asyncio.CancelledError:
+            await protocol.close()
+            raise
+
+        if not proxy:
+            DataCenter.record(address, asyncio.get_running_loop().time() - start)
+
+        return protocol
+
     async def close(self) -> None:
-        await self.protocol.close()
+        # There's nothing to close if every endpoint failed
+        if self.protocol is not None:
+            await self.protocol.close()
+            self.protocol = None
+
+        if self.pool_proxy is not None:
+            self.pool.disconnected(self.pool_proxy)
+            self.pool_proxy = None
+
         log.info("Disconnected")
 
     async def send(self, data: bytes) -> None:
+        if self.protocol is None:
+            raise ConnectionResetError("Not connected")
+
         await self.protocol.send(data)
 
-    async def recv(self) -> Optional[bytes]:
-        return await self.protocol.recv()
+        if self.pool_proxy is not None:
+            self.pool.transferred(self.pool_proxy, sent=len(data))
+
+    @property
+    def last_received(self) -> float:
+        """Event loop time at which data was last received."""
+        return self.protocol.last_received if self.protocol is not None else 0.0
+
+    @property
+    def pending(self) -> int:
+        """Number of frames received and not consumed yet."""
+        return self.protocol.pending if self.protocol is not None else 0
+
+    async def recv(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        # Same as a connection closed by the server
+        if self.protocol is None:
+            return None
+
+        data = await self.protocol.recv(timeout=timeout)
+
+        if data is not None and self.pool_proxy is not None:
+            self.pool.transferred(self.pool_proxy, received=len(data))
+
+        return data
@@ -0,0 +1,177 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class ProxyStats:
+    __slots__ = ("proxy", "latency", "failures", "last_failure", "connections", "sent", "received", "uptime", "since")
+
+    def __init__(self, proxy: dict):
+        self.proxy = proxy
+
+        self.latency: Optional[float] = None  # Smoothed connect time
+        self.failures = 0  # Failures in a row
+        self.last_failure = 0.0
+
+        self.connections = 0  # Connections open right now
+        self.sent = 0
+        self.received = 0
+
+        # Time spent with at least a connection open, to tell the throughput
+        self.uptime = 0.0
+        self.since = 0.0
+
+
+class ProxyPool:
+    """Spread the connections of a client over several proxies, keeping away from the failing ones.
+
+    Pass it, or simply a list of proxy dicts, as the *proxy* of a :obj:`~pyrogram.Client`.
+    Every connection draws a proxy from the pool: the main ones go through the fastest healthy proxy,
+    while media connections, which move the most data, go through the least busy ones so that
+    transfers add up the bandwidth of every proxy.
+
+    A proxy failing to connect *failure_threshold* times in a row is left out for *retry_after*
+    seconds, unless all of them are.
+
+    Parameters:
+        proxies (Iterable of ``dict``):
+            The proxy settings, as accepted by :obj:`~pyrogram.Client`.
+
+        failure_threshold (``int``, *optional*):
+            Failures in a row after which a proxy is unhealthy.
+            Defaults to 3.
+
+        retry_after (``float``, *optional*):
+            Seconds an unhealthy proxy is left out.
+            Defaults to 60.
+    """
+
+    FAILURE_THRESHOLD = 3
+    RETRY_AFTER = 60
+
+    # Connect time used to rank the proxies never tried
+    UNKNOWN_LATENCY = 1.0
+
+    # Weight of the latest measure in the smoothed connect time of a proxy
+    LATENCY_WEIGHT = 0.3
+
+    def __init__(
+        self,
+        proxies: Iterable[dict],
+        failure_threshold: int = FAILURE_THRESHOLD,
+        retry_after: float = RETRY_AFTER
+    ):
+        self.proxies: List[ProxyStats] = [ProxyStats(proxy) for proxy in proxies]
+        self.failure_threshold = failure_threshold
+        self.retry_after = retry_after
+
+        if not self.proxies:
+            raise ValueError("The proxy pool is empty")
+
+        self.by_id: Dict[int, ProxyStats] = {id(p.proxy): p for p in self.proxies}
+
+    def is_healthy(self, stats: ProxyStats) -> bool:
+        return (
+            stats.failures < self.failure_threshold
+            or time.monotonic() - stats.last_failure >= self.retry_after
+        )
+
+    def pick(self, media: bool = False) -> dict:
+        """Get the proxy a new connection should go through."""
+        healthy = [p for p in self.proxies if self.is_healthy(p)]
+
+        if not healthy:
+            # Everything is down, the proxy which failed the longest time ago is the best bet
+            return min(self.proxies, key=lambda p: p.last_failure).proxy
+
+        def latency(p: ProxyStats) -> float:
+            # Proxies which just failed go last, until they work again
+            if p.failures:
+                return float("inf")
+
+            return self.UNKNOWN_LATENCY if p.latency is None else p.latency
+
+        if media:
+            return min(healthy, key=lambda p: (p.connections, latency(p))).proxy
+
+        return min(healthy, key=lambda p: (latency(p), p.connections)).proxy
+
+    def connected(self, proxy: dict, elapsed: float) -> None:
+        """Account for a connection through a proxy, which took *elapsed* seconds."""
+        stats = self.by_id[id(proxy)]
+
+        if stats.latency is None or stats.failures:
+            stats.latency = elapsed
+        else:
+            stats.latency += (elapsed - stats.latency) * self.LATENCY_WEIGHT
+
+        stats.failures = 0
+
+        if not stats.connections:
+            stats.since = time.monotonic()
+
+        stats.connections += 1
+
+    def failed(self, proxy: dict) -> None:
+        """Account for a connection which couldn't go through a proxy."""
+        stats = self.by_id[id(proxy)]
+        stats.failures += 1
+        stats.last_failure = time.monotonic()
+
+        if stats.failures == self.failure_threshold:
+            log.warning("Proxy %s:%s is unhealthy", stats.proxy.get("hostname"), stats.proxy.get("port"))
+
+    def disconnected(self, proxy: dict) -> None:
+        """Account for a connection through a proxy being closed."""
+        stats = self.by_id[id(proxy)]
+        stats.connections -= 1
+
+        if not stats.connections:
+            stats.uptime += time.monotonic() - stats.since
+
+    def transferred(self, proxy: dict, sent: int = 0, received: int = 0) -> None:
+        stats = self.by_id[id(proxy)]
+        stats.sent += sent
+        stats.received += received
+
+    def stats(self) -> List[dict]:
+        """Get the connect time, health, load and throughput of every proxy."""
+        now = time.monotonic()
+        result = []
+
+        for p in self.proxies:
+            uptime = p.uptime + (now - p.since if p.connections else 0)
+
+            result.append(dict(
+                hostname=p.proxy.get("hostname"),
+                port=p.proxy.get("port"),
+                healthy=self.is_healthy(p),
+                latency=p.latency,
+                failures=p.failures,
+                connections=p.connections,
+                sent=p.sent,
+                received=p.received,
+                throughput=(p.sent + p.received) / uptime if uptime else 0.0
+            ))
+
+        return result
@@ -0,0 +1,237 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import base64
+import ipaddress
+import logging
+import socket
+from struct import pack
+from typing import Tuple, Optional, Union
+
+log = logging.getLogger(__name__)
+
+SCHEMES = ("SOCKS4", "SOCKS5", "HTTP")
+
+SOCKS5_ERRORS = {
+    1: "general SOCKS server failure",
+    2: "connection not allowed by ruleset",
+    3: "network unreachable",
+    4: "host unreachable",
+    5: "connection refused",
+    6: "TTL expired",
+    7: "command not supported",
+    8: "address type not supported"
+}
+
+
+class ProxyError(ConnectionError):
+    """The proxy refused the connection or didn't speak the expected protocol."""
+
+
+async def recv_exactly(sock: socket.socket, length: int) -> bytes:
+    loop = asyncio.get_running_loop()
+    data = b""
+
+    while len(data) < length:
+        chunk = await loop.sock_recv(sock, length - len(data))
+
+        if not chunk:
+            raise ProxyError("Connection closed by the proxy")
+
+        data += chunk
+
+    return data
+
+
+def get_ip(host: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    try:
+        return ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+
+async def socks4(sock: socket.socket, destination: Tuple[str, int], username: Optional[str]) -> None:
+    host, port = destination
+    ip = get_ip(host)
+
+    if isinstance(ip, ipaddress.IPv6Address):
+        raise ProxyError("SOCKS4 proxies don't support IPv6")
+
+    user_id = (username or "").encode() + b"\x00"
+
+    if ip is None:
+        # SOCKS4a: the proxy resolves the host name
+        request = pack(">BBH", 4, 1, port) + b"\x00\x00\x00\x01" + user_id + host.encode("idna") + b"\x00"
+    else:
+        request = pack(">BBH", 4, 1, port) + ip.packed + user_id
+
+    await asyncio.get_running_loop().sock_sendall(sock, request)
+
+    reply = await recv_exactly(sock, 8)
+
+    if reply[0] != 0:
+        raise ProxyError("Invalid SOCKS4 reply")
+
+    if reply[1] != 0x5A:
+        raise ProxyError(f"SOCKS4 request rejected ({reply[1]:#x})")
+
+
+async def socks5(
+    sock: socket.socket,
+    destination: Tuple[str, int],
+    username: Optional[str],
+    password: Optional[str]
+) -> None:
+    loop = asyncio.get_running_loop()
+    host, port = destination
+
+    methods = b"\x00\x02" if username else b"\x00"
+    await loop.sock_sendall(sock, b"\x05" + bytes([len(methods)]) + methods)
+
+    version, method = await recv_exactly(sock, 2)
+
+    if version != 5:
+        raise ProxyError("Invalid SOCKS5 reply")
+
+    if method == 2 and username:
+        user, pwd = username.encode(), (password or "").encode()
+        await loop.sock_sendall(sock, b"\x01" + bytes([len(user)]) + user + bytes([len(pwd)]) + pwd)
+
+        if (await recv_exactly(sock, 2))[1] != 0:
+            raise ProxyError("SOCKS5 authentication failed")
+    elif method != 0:
+        raise ProxyError("No acceptable SOCKS5 authentication method")
+
+    ip = get_ip(host)
+
+    if ip is None:
+        name = host.encode("idna")
+        address = b"\x03" + bytes([len(name)]) + name
+    else:
+        address = (b"\x01" if ip.version == 4 else b"\x04") + ip.packed
+
+    await loop.sock_sendall(sock, b"\x05\x01\x00" + address + pack(">H", port))
+
+    version, reply, _, address_type = await recv_exactly(sock, 4)
+
+    if version != 5:
+        raise ProxyError("Invalid SOCKS5 reply")
+
+    if reply != 0:
+        raise ProxyError(f"SOCKS5 request failed: {SOCKS5_ERRORS.get(reply, reply)}")
+
+    # The address the proxy bound to is of no use, though it must be consumed
+    if address_type == 1:
+        await recv_exactly(sock, 4 + 2)
+    elif address_type == 4:
+        await recv_exactly(sock, 16 + 2)
+    elif address_type == 3:
+        await recv_exactly(sock, (await recv_exactly(sock, 1))[0] + 2)
+    else:
+        raise ProxyError("Invalid SOCKS5 reply")
+
+
+async def http(
+    sock: socket.socket,
+    destination: Tuple[str, int],
+    username: Optional[str],
+    password: Optional[str]
+) -> None:
+    loop = asyncio.get_running_loop()
+    host, port = destination
+    ip = get_ip(host)
+
+    target = f"[{host}]:{port}" if isinstance(ip, ipaddress.IPv6Address) else f"{host}:{port}"
+    request = f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n"
+
+    if username:
+        credentials = base64.b64encode(f"{username}:{password or ''}".encode()).decode()
+        request += f"Proxy-Authorization: Basic {credentials}\r\n"
+
+    await loop.sock_sendall(sock, (request + "\r\n").encode())
+
+    # Read the headers one byte at a time, nothing past them must be taken away from the transport
+    response = b""
+
+    while not response.endswith(b"\r\n\r\n"):
+        if len(response) > 16 * 1024:
+            raise ProxyError("HTTP proxy response too long")
+
+        response += await recv_exactly(sock, 1)
+
+    status = response.split(b"\r\n", 1)[0].split(b" ", 2)
+
+    if len(status) < 2 or not status[0].startswith(b"HTTP/"):
+        raise ProxyError("Invalid HTTP proxy response")
+
+    if status[1] != b"200":
+        raise ProxyError(f"HTTP proxy error: {b' '.join(status[1:]).decode(errors='replace')}")
+
+
+async def open_tunnel(proxy: dict, destination: Tuple[str, int]) -> socket.socket:
+    """Get a non-blocking socket connected to the destination through the proxy.
+
+    The handshake runs on the event loop: nothing blocks, whatever the number of connections at once.
+    """
+    scheme = proxy.get("scheme")
+    if scheme is None:
+        raise ValueError("No scheme specified")
+
+    scheme = scheme.upper()
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown proxy type {scheme}")
+
+    hostname = proxy.get("hostname")
+    port = proxy.get("port")
+    username = proxy.get("username")
+    password = proxy.get("password")
+
+    loop = asyncio.get_running_loop()
+    addresses = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+
+    error = None
+
+    for family, type_, proto, _, address in addresses:
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+
+        try:
+            await loop.sock_connect(sock, address)
+        except OSError as e:
+            sock.close()
+            error = e
+            continue
+        except BaseException:
+            sock.close()
+            raise
+
+        try:
+            if scheme == "SOCKS4":
+                await socks4(sock, destination, username)
+            elif scheme == "SOCKS5":
+                await socks5(sock, destination, username, password)
+            else:
+                await http(sock, destination, username, password)
+        except BaseException:
+            sock.close()
+            raise
+
+        return sock
+
+    raise error or OSError(f"Unable to resolve {hostname}")
@@ -17,22 +17,15 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import ipaddress
 import logging
 import socket
-from concurrent.futures import ThreadPoolExecutor
-from typing import Tuple, Dict, TypedDict, Optional
+from typing import Tuple, TypedDict, Optional, Callable
 
-import socks
+import pyrogram
+from .proxy import open_tunnel
 
 log = logging.getLogger(__name__)
 
-proxy_type_by_scheme: Dict[str, int] = {
-    "SOCKS4": socks.SOCKS4,
-    "SOCKS5": socks.SOCKS5,
-    "HTTP": socks.HTTP,
-}
-
 
 class Proxy(TypedDict):
     scheme: str
@@ -42,63 +35,271 @@ class Proxy(TypedDict):
     password: Optional[str]
 
 
+class TCPProtocol(asyncio.BufferedProtocol):
+    """Receive data straight into a reusable buffer and cut it into frames as soon as it arrives.
+
+    The framing is described by the transport (abridged, intermediate, full, ...), see
+    :meth:`TCP.frame_size` and :meth:`TCP.unwrap`. Whole frames are queued for :meth:`TCP.recv`.
+
+    Outgoing frames are queued as well and written together once per loop iteration.
+
+    Reading from the socket pauses while :attr:`TCP.MAX_PENDING_FRAMES` frames wait to be received, so that
+    a slow consumer holds back the server instead of piling up data. It pauses as well while a large chunk of
+    obfuscated data is decrypted by the crypto pool, the stream cipher needs the chunks in order.
+    """
+
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, tcp: "TCP"):
+        self.tcp = tcp
+        self.loop = asyncio.get_running_loop()
+
+        self.buffer = bytearray(TCPProtocol.BUFFER_SIZE)
+        self.start = 0  # Start of the first incomplete frame
+        self.end = 0  # End of the data received
+        self.frame_end = 0  # End of the first incomplete frame, once its header is known
+        self.header_size = 0
+
+        self.frames = asyncio.Queue()
+        self.last_received = self.loop.time()
+        self.reading_paused = False
+        self.decrypting = False
+
+        self.transport: Optional[asyncio.Transport] = None
+        self.closed = self.loop.create_future()
+        self.paused = False
+        self.drain_waiter: Optional[asyncio.Future] = None
+
+        self.outgoing = []
+        self.flush_scheduled = False
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+
+        # Let the OS find out about dead peers, without waking the client up
+        sock = transport.get_extra_info("socket")
+
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+                if hasattr(socket, "TCP_KEEPIDLE"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP.KEEPALIVE_IDLE)
+                elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, TCP.KEEPALIVE_IDLE)
+
+                if hasattr(socket, "TCP_KEEPINTVL"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, TCP.KEEPALIVE_INTERVAL)
+
+                if hasattr(socket, "TCP_KEEPCNT"):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, TCP.KEEPALIVE_COUNT)
+            except OSError as e:
+                log.debug("Unable to enable TCP keepalive: %s", e)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.frames.put_nowait(None)
+
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+        if self.drain_waiter is not None and not self.drain_waiter.done():
+            self.drain_waiter.set_exception(ConnectionResetError("Connection lost"))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        # Make room for the whole frame being received, when its size is known, so that it lands in one place
+        free = max(self.frame_end - self.end, TCPProtocol.BUFFER_SIZE // 4)
+
+        if len(self.buffer) - self.end < free:
+            pending = self.end - self.start
+
+            if pending + free > len(self.buffer):
+                buffer = bytearray(max(pending + free, len(self.buffer) * 2))
+                buffer[:pending] = self.buffer[self.start:self.end]
+                self.buffer = buffer
+            else:
+                self.buffer[:pending] = self.buffer[self.start:self.end]
+
+            if self.frame_end:
+                self.frame_end -= self.start
+
+            self.start, self.end = 0, pending
+
+        return memoryview(self.buffer)[self.end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.last_received = self.loop.time()
+
+        if self.tcp.decrypt_stream is not None:
+            end = self.end + nbytes
+            scheduler = self.tcp.crypto_scheduler
+
+            if scheduler.executor is not None and nbytes > scheduler.inline_threshold:
+                # Nothing is received meanwhile, so the buffer stays where it is until the chunk is back
+                self.decrypting = True
+                self.transport.pause_reading()
+
+                future = scheduler.submit(nbytes, self.tcp.decrypt_stream, bytes(self.buffer[self.end:end]))
+                future.add_done_callback(self.chunk_decrypted)
+                return
+
+            self.buffer[self.end:end] = self.tcp.decrypt_stream(self.buffer[self.end:end])
+
+        self.end += nbytes
+        self.cut_frames()
+
+    def chunk_decrypted(self, future: asyncio.Future) -> None:
+        self.decrypting = False
+
+        if self.transport.is_closing():
+            return
+
+        if future.cancelled() or future.exception() is not None:
+            log.warning("Unable to decrypt the data received: %r", None if future.cancelled() else future.exception())
+            self.transport.close()
+            return
+
+        chunk = future.result()
+        self.buffer[self.end:self.end + len(chunk)] = chunk
+        self.end += len(chunk)
+
+        self.cut_frames()
+
+        if not self.reading_paused and not self.transport.is_closing():
+            self.transport.resume_reading()
+
+    def cut_frames(self) -> None:
+        while self.start < self.end:
+            data = memoryview(self.buffer)[self.start:self.end]
+
+            if not self.frame_end:
+                size = self.tcp.frame_size(data)
+
+                if size is None:
+                    break
+
+                self.header_size, frame_size = size
+                self.frame_end = self.start + frame_size
+
+            if self.end < self.frame_end:
+                break
+
+            frame = self.tcp.unwrap(data[:self.frame_end - self.start], self.header_size)
+            self.start, self.frame_end = self.frame_end, 0
+
+            self.frames.put_nowait(frame)
+
+            if frame is None:
+                # Corrupted frame, there's no way to find where the next one starts
+                self.transport.close()
+                break
+
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        if (
+            not self.reading_paused
+            and self.frames.qsize() >= self.tcp.MAX_PENDING_FRAMES
+            and not self.transport.is_closing()
+        ):
+            self.reading_paused = True
+            self.transport.pause_reading()
+
+    def frame_taken(self) -> None:
+        if self.reading_paused and self.frames.qsize() <= self.tcp.MAX_PENDING_FRAMES // 2:
+            self.reading_paused = False
+
+            # The time spent paused doesn't count as silence from the server
+            self.last_received = self.loop.time()
+
+            if not self.decrypting and not self.transport.is_closing():
+                self.transport.resume_reading()
+
+    def eof_received(self) -> bool:
+        return False
+
+    def pause_writing(self) -> None:
+        self.paused = True
+
+    def resume_writing(self) -> None:
+        self.paused = False
+
+        if self.drain_waiter is not None and not self.drain_waiter.done():
+            self.drain_waiter.set_result(None)
+
+    def write(self, data: bytes) -> None:
+        """Queue a frame, in order. Frames queued during the same loop iteration are written at once."""
+        if self.transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+
+        self.outgoing.append(data)
+
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def flush(self) -> None:
+        self.flush_scheduled = False
+        outgoing, self.outgoing = self.outgoing, []
+
+        if outgoing and not self.transport.is_closing():
+            self.transport.writelines(outgoing)
+
+    async def drain(self) -> None:
+        if self.transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+
+        if self.paused:
+            # Every sender waiting for the buffer to go below the low-water mark shares the same future
+            if self.drain_waiter is None or self.drain_waiter.done():
+                self.drain_waiter = self.loop.create_future()
+
+            await asyncio.shield(self.drain_waiter)
+
+
 class TCP:
     TIMEOUT = 10
 
+    # TCP keepalive probes start after this many idle seconds, then go every interval, up to count
+    KEEPALIVE_IDLE = 30
+    KEEPALIVE_INTERVAL = 10
+    KEEPALIVE_COUNT = 3
+
+    # Frames received and not consumed yet after which reading from the socket pauses
+    MAX_PENDING_FRAMES = 32
+
     def __init__(self, ipv6: bool, proxy: Proxy) -> None:
         self.ipv6 = ipv6
         self.proxy = proxy
 
-        self.reader: Optional[asyncio.StreamReader] = None
-        self.writer: Optional[asyncio.StreamWriter] = None
+        self.protocol: Optional[TCPProtocol] = None
 
-        self.lock = asyncio.Lock()
         self.loop = asyncio.get_event_loop()
 
-    async def _connect_via_proxy(
-        self,
-        destination: Tuple[str, int]
-    ) -> None:
-        scheme = self.proxy.get("scheme")
-        if scheme is None:
-            raise ValueError("No scheme specified")
+        # Transports encrypting their stream use the shared scheduler, unless the connection has its own
+        self.crypto_scheduler = pyrogram.crypto_scheduler
 
-        proxy_type = proxy_type_by_scheme.get(scheme.upper())
-        if proxy_type is None:
-            raise ValueError(f"Unknown proxy type {scheme}")
+        # Obfuscated transports decrypt incoming data as it arrives, before it's cut into frames
+        self.decrypt_stream: Optional[Callable[[bytearray], bytes]] = None
 
-        hostname = self.proxy.get("hostname")
-        port = self.proxy.get("port")
-        username = self.proxy.get("username")
-        password = self.proxy.get("password")
+    def frame_size(self, data: memoryview) -> Optional[Tuple[int, int]]:
+        """Get the size of the header and of the whole frame at the start of the data received.
 
-        try:
-            ip_address = ipaddress.ip_address(hostname)
-        except ValueError:
-            is_proxy_ipv6 = False
-        else:
-            is_proxy_ipv6 = isinstance(ip_address, ipaddress.IPv6Address)
+        Returns None when not enough data is available yet to tell.
+        """
+        raise NotImplementedError
 
-        proxy_family = socket.AF_INET6 if is_proxy_ipv6 else socket.AF_INET
-        sock = socks.socksocket(proxy_family)
+    def unwrap(self, frame: memoryview, header_size: int) -> Optional[bytes]:
+        """Get the payload out of a whole frame, None if the frame is not valid."""
+        return bytes(frame[header_size:])
 
-        sock.set_proxy(
-            proxy_type=proxy_type,
-            addr=hostname,
-            port=port,
-            username=username,
-            password=password
-        )
-        sock.settimeout(TCP.TIMEOUT)
-
-        await self.loop.sock_connect(
-            sock=sock,
-            address=destination
-        )
-
-        sock.setblocking(False)
+    async def _connect_via_proxy(
+        self,
+        destination: Tuple[str, int]
+    ) -> None:
+        sock = await open_tunnel(self.proxy, destination)
 
-        self.reader, self.writer = await asyncio.open_connection(
+        _, self.protocol = await self.loop.create_connection(
+            lambda: TCPProtocol(self),
             sock=sock
         )
 
@@ -108,7 +309,8 @@ class TCP:
     ) -> None:
         host, port = destination
         family = socket.AF_INET6 if self.ipv6 else socket.AF_INET
-        self.reader, self.writer = await asyncio.open_connection(
+        _, self.protocol = await self.loop.create_connection(
+            lambda: TCPProtocol(self),
             host=host,
             port=port,
             family=family
@@ -127,42 +329,83 @@ class TCP:
             raise TimeoutError("Connection timed out")
 
     async def close(self) -> None:
-        if self.writer is None:
+        if self.protocol is None:
             return None
 
         try:
-            self.writer.close()
-            await asyncio.wait_for(self.writer.wait_closed(), TCP.TIMEOUT)
+            self.protocol.transport.close()
+            await asyncio.wait_for(asyncio.shield(self.protocol.closed), TCP.TIMEOUT)
         except Exception as e:
             log.info("Close exception: %s %s", type(e).__name__, e)
 
-    async def send(self, data: bytes) -> None:
-        if self.writer is None:
+    def write(self, data: bytes) -> None:
+        """Queue a whole frame for sending.
+
+        Frames go out in the order they are queued, transports whose framing keeps state from a
+        frame to the next (sequence numbers, CTR streams) must prepare and queue them without
+        awaiting in between.
+        """
+        if self.protocol is None:
             return None
 
-        async with self.lock:
-            try:
-                self.writer.write(data)
-                await self.writer.drain()
-            except Exception as e:
-                log.info("Send exception: %s %s", type(e).__name__, e)
-                raise OSError(e)
+        try:
+            self.protocol.write(data)
+        except Exception as e:
+            log.info("Send exception: %s %s", type(e).__name__, e)
+            raise OSError(e)
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        data = b""
+    async def drain(self) -> None:
+        """Wait for the outgoing buffer to empty out, only when it went above its high-water mark."""
+        if self.protocol is None or not self.protocol.paused:
+            return None
 
-        while len(data) < length:
-            try:
-                chunk = await asyncio.wait_for(
-                    self.reader.read(length - len(data)),
-                    TCP.TIMEOUT
-                )
-            except (OSError, asyncio.TimeoutError):
-                return None
-            else:
-                if chunk:
-                    data += chunk
-                else:
+        try:
+            await self.protocol.drain()
+        except Exception as e:
+            log.info("Send exception: %s %s", type(e).__name__, e)
+            raise OSError(e)
+
+    async def send(self, data: bytes) -> None:
+        self.write(data)
+        await self.drain()
+
+    @property
+    def last_received(self) -> float:
+        """Event loop time at which data was last received."""
+        return self.protocol.last_received
+
+    @property
+    def pending(self) -> int:
+        """Number of frames received and not consumed yet."""
+        return self.protocol.frames.qsize() if self.protocol is not None else 0
+
+    async def recv(self, length: int = 0, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Get the payload of the next frame received.
+
+        Returns None once the connection is lost, or when nothing at all was received for *timeout*
+        seconds (:attr:`TIMEOUT` by default).
+        """
+        frames = self.protocol.frames
+
+        if frames.empty():
+            timeout = TCP.TIMEOUT if timeout is None else timeout
+
+            while True:
+                # Big frames take a while to arrive, only give up if nothing at all was received lately
+                left = self.protocol.last_received + timeout - self.loop.time()
+
+                if left <= 0:
                     return None
 
-        return data
+                try:
+                    frame = await asyncio.wait_for(frames.get(), left)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    break
+        else:
+            frame = frames.get_nowait()
+
+        self.protocol.frame_taken()
+
+        return frame
@@ -42,16 +42,14 @@ class TCPAbridged(TCP):
             + data
         )
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(1)
-
-        if length is None:
+    def frame_size(self, data: memoryview) -> Optional[Tuple[int, int]]:
+        if not data:
             return None
 
-        if length == b"\x7f":
-            length = await super().recv(3)
-
-            if length is None:
+        if data[0] == 0x7f:
+            if len(data) < 4:
                 return None
 
-        return await super().recv(int.from_bytes(length, "little") * 4)
+            return 4, 4 + int.from_bytes(data[1:4], "little") * 4
+
+        return 1, 1 + data[0] * 4
@@ -16,11 +16,11 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import logging
 import os
 from typing import Optional, Tuple
 
-import pyrogram
 from pyrogram.crypto import aes
 from .tcp import TCP, Proxy
 
@@ -33,8 +33,11 @@ class TCPAbridgedO(TCP):
     def __init__(self, ipv6: bool, proxy: Proxy) -> None:
         super().__init__(ipv6, proxy)
 
-        self.encrypt = None
-        self.decrypt = None
+        self.encrypt: Optional[aes.CTR256] = None
+        self.decrypt: Optional[aes.CTR256] = None
+
+        # CTR keeps state from a packet to the next: encryption and queueing must happen in the same order
+        self.send_lock = asyncio.Lock()
 
     async def connect(self, address: Tuple[str, int]) -> None:
         await super().connect(address)
@@ -48,39 +51,35 @@ class TCPAbridgedO(TCP):
 
         temp = bytearray(nonce[55:7:-1])
 
-        self.encrypt = (nonce[8:40], nonce[40:56], bytearray(1))
-        self.decrypt = (temp[0:32], temp[32:48], bytearray(1))
+        self.encrypt = aes.CTR256(nonce[8:40], nonce[40:56])
+        self.decrypt = aes.CTR256(temp[0:32], temp[32:48])
+
+        nonce[56:64] = self.encrypt.update(nonce)[56:64]
 
-        nonce[56:64] = aes.ctr256_encrypt(nonce, *self.encrypt)[56:64]
+        # Incoming data is decrypted as it arrives, frames are then cut from the plain stream
+        self.decrypt_stream = self.decrypt.update
 
         await super().send(nonce)
 
     async def send(self, data: bytes, *args) -> None:
         length = len(data) // 4
         data = (bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")) + data
-        payload = await self.loop.run_in_executor(pyrogram.crypto_executor, aes.ctr256_encrypt, data, *self.encrypt)
 
-        await super().send(payload)
+        async with self.send_lock:
+            payload = await self.crypto_scheduler.run(len(data), self.encrypt.update, data)
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(1)
-
-        if length is None:
-            return None
+            self.write(payload)
 
-        length = aes.ctr256_decrypt(length, *self.decrypt)
+        await self.drain()
 
-        if length == b"\x7f":
-            length = await super().recv(3)
+    def frame_size(self, data: memoryview) -> Optional[Tuple[int, int]]:
+        if not data:
+            return None
 
-            if length is None:
+        if data[0] == 0x7f:
+            if len(data) < 4:
                 return None
 
-            length = aes.ctr256_decrypt(length, *self.decrypt)
-
-        data = await super().recv(int.from_bytes(length, "little") * 4)
-
-        if data is None:
-            return None
+            return 4, 4 + int.from_bytes(data[1:4], "little") * 4
 
-        return await self.loop.run_in_executor(pyrogram.crypto_executor, aes.ctr256_decrypt, data, *self.decrypt)
+        return 1, 1 + data[0] * 4
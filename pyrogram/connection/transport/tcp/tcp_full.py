@@ -18,7 +18,7 @@
 
 import logging
 from binascii import crc32
-from struct import pack, unpack
+from struct import pack, unpack_from
 from typing import Optional, Tuple
 
 from .tcp import TCP, Proxy
@@ -43,22 +43,15 @@ class TCPFull(TCP):
 
         await super().send(data)
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(4)
-
-        if length is None:
-            return None
-
-        packet = await super().recv(unpack("<I", length)[0] - 4)
-
-        if packet is None:
+    def frame_size(self, data: memoryview) -> Optional[Tuple[int, int]]:
+        if len(data) < 4:
             return None
 
-        packet = length + packet
-        checksum = packet[-4:]
-        packet = packet[:-4]
+        # The length includes itself, along with the sequence number and the checksum
+        return 8, unpack_from("<I", data)[0]
 
-        if crc32(packet) != unpack("<I", checksum)[0]:
+    def unwrap(self, frame: memoryview, header_size: int) -> Optional[bytes]:
+        if crc32(frame[:-4]) != unpack_from("<I", frame, len(frame) - 4)[0]:
             return None
 
-        return packet[8:]
+        return bytes(frame[header_size:-4])
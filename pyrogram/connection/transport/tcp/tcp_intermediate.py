@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
-from struct import pack, unpack
+from struct import pack, unpack_from
 from typing import Optional, Tuple
 
 from .tcp import TCP, Proxy
@@ -36,10 +36,8 @@ class TCPIntermediate(TCP):
     async def send(self, data: bytes, *args) -> None:
         await super().send(pack("<i", len(data)) + data)
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(4)
-
-        if length is None:
+    def frame_size(self, data: memoryview) -> Optional[Tuple[int, int]]:
+        if len(data) < 4:
             return None
 
-        return await super().recv(unpack("<i", length)[0])
+        return 4, 4 + unpack_from("<i", data)[0]
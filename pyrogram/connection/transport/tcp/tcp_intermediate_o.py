@@ -16,9 +16,10 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import logging
 import os
-from struct import pack, unpack
+from struct import pack, unpack_from
 from typing import Optional, Tuple
 
 from pyrogram.crypto import aes
@@ -33,8 +34,11 @@ class TCPIntermediateO(TCP):
     def __init__(self, ipv6: bool, proxy: Proxy) -> None:
         super().__init__(ipv6, proxy)
 
-        self.encrypt = None
-        self.decrypt = None
+        self.encrypt: Optional[aes.CTR256] = None
+        self.decrypt: Optional[aes.CTR256] = None
+
+        # CTR keeps state from a packet to the next: encryption and queueing must happen in the same order
+        self.send_lock = asyncio.Lock()
 
     async def connect(self, address: Tuple[str, int]) -> None:
         await super().connect(address)
@@ -48,32 +52,28 @@ class TCPIntermediateO(TCP):
 
         temp = bytearray(nonce[55:7:-1])
 
-        self.encrypt = (nonce[8:40], nonce[40:56], bytearray(1))
-        self.decrypt = (temp[0:32], temp[32:48], bytearray(1))
+        self.encrypt = aes.CTR256(nonce[8:40], nonce[40:56])
+        self.decrypt = aes.CTR256(temp[0:32], temp[32:48])
+
+        nonce[56:64] = self.encrypt.update(nonce)[56:64]
 
-        nonce[56:64] = aes.ctr256_encrypt(nonce, *self.encrypt)[56:64]
+        # Incoming data is decrypted as it arrives, frames are then cut from the plain stream
+        self.decrypt_stream = self.decrypt.update
 
         await super().send(nonce)
 
     async def send(self, data: bytes, *args) -> None:
-        await super().send(
-            aes.ctr256_encrypt(
-                pack("<i", len(data)) + data,
-                *self.encrypt
-            )
-        )
+        data = pack("<i", len(data)) + data
 
-    async def recv(self, length: int = 0) -> Optional[bytes]:
-        length = await super().recv(4)
-
-        if length is None:
-            return None
+        async with self.send_lock:
+            payload = await self.crypto_scheduler.run(len(data), self.encrypt.update, data)
 
-        length = aes.ctr256_decrypt(length, *self.decrypt)
+            self.write(payload)
 
-        data = await super().recv(unpack("<i", length)[0])
+        await self.drain()
 
-        if data is None:
+    def frame_size(self, data: memoryview) -> Optional[Tuple[int, int]]:
+        if len(data) < 4:
             return None
 
-        return aes.ctr256_decrypt(data, *self.decrypt)
+        return 4, 4 + unpack_from("<i", data)[0]
@@ -17,114 +17,220 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
 
 log = logging.getLogger(__name__)
 
-try:
+COUNTER_MASK = (1 << 128) - 1
+
+
+class Backend(NamedTuple):
+    name: str
+    ige256_encrypt: Callable[[bytes, bytes, bytes], bytes]
+    ige256_decrypt: Callable[[bytes, bytes, bytes], bytes]
+
+    # AES-256-CTR stream, whose keystream carries on from a call to the next. Encryption and decryption are
+    # the same operation, through its update method. The iv and state it is given are updated in place.
+    CTR256: type
+
+
+def load_tgcrypto() -> Backend:
     import tgcrypto
 
-    log.info("Using TgCrypto")
+    class CTR256:
+        def __init__(self, key: bytes, iv: bytearray, state: bytearray = None):
+            self.key = bytes(key)
+            self.iv = iv
+            self.state = bytearray(1) if state is None else state
 
+        def update(self, data: bytes) -> bytes:
+            if not data:
+                return b""
 
-    def ige256_encrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
-        return tgcrypto.ige256_encrypt(data, key, iv)
+            return tgcrypto.ctr256_encrypt(data, self.key, self.iv, self.state)
 
+    return Backend("tgcrypto", tgcrypto.ige256_encrypt, tgcrypto.ige256_decrypt, CTR256)
 
-    def ige256_decrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
-        return tgcrypto.ige256_decrypt(data, key, iv)
 
+def load_cryptography() -> Backend:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
-    def ctr256_encrypt(data: bytes, key: bytes, iv: bytearray, state: bytearray = None) -> bytes:
-        return tgcrypto.ctr256_encrypt(data, key, iv, state or bytearray(1))
+    def ige(data: bytes, key: bytes, iv: bytes, encrypt: bool) -> bytes:
+        if len(data) % 16:
+            raise ValueError("Data size must match a multiple of 16 bytes")
+
+        # OpenSSL has no IGE, it's chained here on top of single ECB blocks
+        ecb = Cipher(algorithms.AES(bytes(key)), modes.ECB())
+        update = (ecb.encryptor() if encrypt else ecb.decryptor()).update
 
+        a = int.from_bytes(iv[:16] if encrypt else iv[16:], "big")
+        b = int.from_bytes(iv[16:] if encrypt else iv[:16], "big")
+        out = []
 
-    def ctr256_decrypt(data: bytes, key: bytes, iv: bytearray, state: bytearray = None) -> bytes:
-        return tgcrypto.ctr256_decrypt(data, key, iv, state or bytearray(1))
+        for i in range(0, len(data), 16):
+            x = int.from_bytes(data[i:i + 16], "big")
+            a = int.from_bytes(update((x ^ a).to_bytes(16, "big")), "big") ^ b
+            b = x
+            out.append(a.to_bytes(16, "big"))
 
+        return b"".join(out)
 
-    def xor(a: bytes, b: bytes) -> bytes:
-        return int.to_bytes(
-            int.from_bytes(a, "big") ^ int.from_bytes(b, "big"),
-            len(a),
-            "big",
-        )
-except ImportError:
-    import pyaes
+    class CTR256:
+        def __init__(self, key: bytes, iv: bytearray, state: bytearray = None):
+            self.iv = iv
+            self.state = bytearray(1) if state is None else state
 
-    log.warning(
-        "TgCrypto is missing! "
-        "Pyrogram will work the same, but at a much slower speed. "
-        "More info: https://pyrogrammod.readthedocs.io/topics/speedups"
+            self.counter = int.from_bytes(iv, "big")
+            self.position = self.state[0]  # Keystream bytes used since the counter above
+
+            self.cipher = Cipher(algorithms.AES(bytes(key)), modes.CTR(bytes(iv))).encryptor()
+
+            if self.position:
+                self.cipher.update(bytes(self.position))
+
+        def update(self, data: bytes) -> bytes:
+            if not data:
+                return b""
+
+            self.position += len(data)
+            self.iv[:] = ((self.counter + self.position // 16) & COUNTER_MASK).to_bytes(16, "big")
+            self.state[0] = self.position % 16
+
+            return self.cipher.update(data)
+
+    return Backend(
+        "cryptography",
+        lambda data, key, iv: ige(data, key, iv, True),
+        lambda data, key, iv: ige(data, key, iv, False),
+        CTR256
     )
 
 
-    def ige256_encrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
-        return ige(data, key, iv, True)
+def load_python() -> Backend:
+    from . import pure_aes
 
+    class CTR256:
+        def __init__(self, key: bytes, iv: bytearray, state: bytearray = None):
+            self.cipher = pure_aes.AES256(bytes(key))
+            self.iv = iv
+            self.state = bytearray(1) if state is None else state
 
-    def ige256_decrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
-        return ige(data, key, iv, False)
+            # Keystream of the current counter, of which state[0] bytes are used already
+            self.block = self.cipher.encrypt(iv)
 
+        def update(self, data: bytes) -> bytes:
+            length = len(data)
 
-    def ctr256_encrypt(data: bytes, key: bytes, iv: bytearray, state: bytearray = None) -> bytes:
-        return ctr(data, key, iv, state or bytearray(1))
+            if not length:
+                return b""
 
+            position = self.state[0]
+            counter = int.from_bytes(self.iv, "big")
+            block = self.block
+            keystream = [block[position:]]
 
-    def ctr256_decrypt(data: bytes, key: bytes, iv: bytearray, state: bytearray = None) -> bytes:
-        return ctr(data, key, iv, state or bytearray(1))
+            for _ in range((position + length - 1) // 16):
+                counter = (counter + 1) & COUNTER_MASK
+                block = self.cipher.encrypt(counter.to_bytes(16, "big"))
+                keystream.append(block)
 
+            position = (position + length) % 16
 
-    def xor(a: bytes, b: bytes) -> bytes:
-        return int.to_bytes(
-            int.from_bytes(a, "big") ^ int.from_bytes(b, "big"),
-            len(a),
-            "big",
-        )
+            # The last block is used up: move on to the next counter right away, as the IV would
+            if position == 0:
+                counter = (counter + 1) & COUNTER_MASK
+                block = self.cipher.encrypt(counter.to_bytes(16, "big"))
 
+            self.iv[:] = counter.to_bytes(16, "big")
+            self.state[0] = position
+            self.block = block
 
-    def ige(data: bytes, key: bytes, iv: bytes, encrypt: bool) -> bytes:
-        cipher = pyaes.AES(key)
+            return xor(data, b"".join(keystream)[:length])
 
-        iv_1 = iv[:16]
-        iv_2 = iv[16:]
+    return Backend(
+        "python",
+        lambda data, key, iv: pure_aes.ige256(data, key, iv, True),
+        lambda data, key, iv: pure_aes.ige256(data, key, iv, False),
+        CTR256
+    )
 
-        data = [data[i: i + 16] for i in range(0, len(data), 16)]
 
-        if encrypt:
-            for i, chunk in enumerate(data):
-                iv_1 = data[i] = xor(cipher.encrypt(xor(chunk, iv_1)), iv_2)
-                iv_2 = chunk
-        else:
-            for i, chunk in enumerate(data):
-                iv_2 = data[i] = xor(cipher.decrypt(xor(chunk, iv_2)), iv_1)
-                iv_1 = chunk
+# In order of preference
+BACKENDS: Dict[str, Callable[[], Backend]] = {
+    "tgcrypto": load_tgcrypto,
+    "cryptography": load_cryptography,
+    "python": load_python
+}
 
-        return b"".join(data)
 
+def available() -> List[str]:
+    """Get the names of the backends which can be used here."""
+    names = []
 
-    def ctr(data: bytes, key: bytes, iv: bytearray, state: bytearray) -> bytes:
-        cipher = pyaes.AES(key)
+    for name, load in BACKENDS.items():
+        try:
+            load()
+        except ImportError:
+            continue
 
-        out = bytearray(data)
-        chunk = cipher.encrypt(iv)
+        names.append(name)
 
-        for i in range(0, len(data), 16):
-            for j in range(0, min(len(data) - i, 16)):
-                out[i + j] ^= chunk[state[0]]
+    return names
+
+
+def use(name: Optional[str] = None) -> Backend:
+    """Switch the functions of this module to a backend, by default the first one available.
+
+    Parameters:
+        name (``str``, *optional*):
+            One of "tgcrypto", "cryptography" or "python".
+    """
+    global backend, ige256_encrypt, ige256_decrypt, CTR256
+
+    for candidate in ([name] if name else BACKENDS):
+        try:
+            loaded = BACKENDS[candidate]()
+        except ImportError:
+            if name:
+                raise
+
+            continue
+
+        break
+    else:
+        raise ImportError("No AES backend available")
 
-                state[0] += 1
+    backend = loaded.name
+    ige256_encrypt = loaded.ige256_encrypt
+    ige256_decrypt = loaded.ige256_decrypt
+    CTR256 = loaded.CTR256
 
-                if state[0] >= 16:
-                    state[0] = 0
+    if loaded.name == "python":
+        log.warning(
+            "TgCrypto is missing! "
+            "Pyrogram will work the same, but at a much slower speed. "
+            "More info: https://pyrogrammod.readthedocs.io/topics/speedups"
+        )
+    else:
+        log.info("Using %s", loaded.name)
+
+    return loaded
+
+
+def ctr256_encrypt(data: bytes, key: bytes, iv: bytearray, state: bytearray = None) -> bytes:
+    return CTR256(key, iv, state or bytearray(1)).update(data)
 
-                if state[0] == 0:
-                    for k in range(15, -1, -1):
-                        try:
-                            iv[k] += 1
-                            break
-                        except ValueError:
-                            iv[k] = 0
 
-                    chunk = cipher.encrypt(iv)
+# The same operation, see Backend.CTR256
+ctr256_decrypt = ctr256_encrypt
+
+
+def xor(a: bytes, b: bytes) -> bytes:
+    return int.to_bytes(
+        int.from_bytes(a, "big") ^ int.from_bytes(b, "big"),
+        len(a),
+        "big",
+    )
+
 
-        return out
+backend, ige256_encrypt, ige256_decrypt, CTR256 = use()
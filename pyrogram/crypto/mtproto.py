@@ -16,21 +16,50 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from hashlib import sha256
+from hashlib import sha1, sha256
 from io import BytesIO
 from os import urandom
+from typing import Container, Optional, Union
 
 from pyrogram.errors import SecurityCheckMismatch
 from pyrogram.raw.core import Message, Long
 from . import aes
 
 
+class AuthKey(bytes):
+    """An authorization key, along with the parts of it needed for every message, computed only once."""
+
+    def __new__(cls, auth_key: bytes) -> "AuthKey":
+        key = super().__new__(cls, auth_key)
+
+        key.id = sha1(auth_key).digest()[-8:]
+
+        # https://core.telegram.org/mtproto/description#defining-aes-key-and-initialization-vector
+        # x = 0 for outgoing messages, 8 for incoming ones
+        key.kdf_a = {x: auth_key[x:x + 36] for x in (0, 8)}
+        key.kdf_b = {x: sha256(auth_key[x + 40:x + 76]) for x in (0, 8)}  # 76 = 40 + 36
+
+        # https://core.telegram.org/mtproto/description#defining-aes-key-and-initialization-vector
+        # msg_key_large = sha256(auth_key[88 + x:88 + x + 32] + plaintext)
+        key.msg_key_outgoing = sha256(auth_key[88:88 + 32])
+        key.msg_key_incoming = sha256(auth_key[96:96 + 32])
+
+        return key
+
+
 def kdf(auth_key: bytes, msg_key: bytes, outgoing: bool) -> tuple:
     # https://core.telegram.org/mtproto/description#defining-aes-key-and-initialization-vector
+    if not isinstance(auth_key, AuthKey):
+        auth_key = AuthKey(auth_key)
+
     x = 0 if outgoing else 8
 
-    sha256_a = sha256(msg_key + auth_key[x: x + 36]).digest()
-    sha256_b = sha256(auth_key[x + 40:x + 76] + msg_key).digest()  # 76 = 40 + 36
+    sha256_a = sha256(msg_key + auth_key.kdf_a[x]).digest()
+
+    # The hash states already went through the auth key part, only msg_key is left to hash
+    sha256_b = auth_key.kdf_b[x].copy()
+    sha256_b.update(msg_key)
+    sha256_b = sha256_b.digest()
 
     aes_key = sha256_a[:8] + sha256_b[8:24] + sha256_a[24:32]
     aes_iv = sha256_b[:8] + sha256_a[8:24] + sha256_b[24:32]
@@ -39,40 +68,85 @@ def kdf(auth_key: bytes, msg_key: bytes, outgoing: bool) -> tuple:
 
 
 def pack(message: Message, salt: int, session_id: bytes, auth_key: bytes, auth_key_id: bytes) -> bytes:
-    data = Long(salt) + session_id + message.write()
-    padding = urandom(-(len(data) + 12) % 16 + 12)
+    if not isinstance(auth_key, AuthKey):
+        auth_key = AuthKey(auth_key)
+
+    # 32 = salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
+    padding = urandom(-(message.length + 32 + 12) % 16 + 12)
+
+    # Everything is serialized straight into a single buffer
+    data = bytearray(Long(salt))
+    data += session_id
+    message.write_into(data)
+    data += padding
 
     # 88 = 88 + 0 (outgoing message)
-    msg_key_large = sha256(auth_key[88: 88 + 32] + data + padding).digest()
-    msg_key = msg_key_large[8:24]
+    msg_key_large = auth_key.msg_key_outgoing.copy()
+    msg_key_large.update(data)
+    msg_key = msg_key_large.digest()[8:24]
     aes_key, aes_iv = kdf(auth_key, msg_key, True)
 
-    return auth_key_id + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+    return auth_key_id + msg_key + aes.ige256_encrypt(data, aes_key, aes_iv)
+
+
+# Below this size, copying the packet costs less than going through memoryviews and precomputed hash states
+SMALL_PACKET_SIZE = 16 * 1024
 
 
 def unpack(
-    b: BytesIO,
+    packet: Union[bytes, BytesIO],
     session_id: bytes,
     auth_key: bytes,
-    auth_key_id: bytes
+    auth_key_id: bytes,
+    update_ids: Optional[Container[int]] = None,
+    lazy: bool = False
 ) -> Message:
-    SecurityCheckMismatch.check(b.read(8) == auth_key_id, "b.read(8) == auth_key_id")
+    if isinstance(packet, BytesIO):
+        packet = packet.getbuffer()
+
+    SecurityCheckMismatch.check(packet[:8] == auth_key_id, "packet[:8] == auth_key_id")
+
+    msg_key = bytes(packet[8:24])
+
+    if len(packet) <= SMALL_PACKET_SIZE:
+        # Most packets are small: deriving the key right here costs less than the calls and hash state copies
+        # 44 = 8 + 36, 84 = 48 + 36 (incoming message)
+        sha256_a = sha256(msg_key + auth_key[8:44]).digest()
+        sha256_b = sha256(auth_key[48:84] + msg_key).digest()
+
+        aes_key = sha256_a[:8] + sha256_b[8:24] + sha256_a[24:32]
+        aes_iv = sha256_b[:8] + sha256_a[8:24] + sha256_b[24:32]
+
+        data = aes.ige256_decrypt(bytes(packet[24:]), aes_key, aes_iv)
+
+        # 96 = 88 + 8 (incoming message)
+        msg_key_large = sha256(auth_key[96:96 + 32] + data)
+    else:
+        if not isinstance(auth_key, AuthKey):
+            auth_key = AuthKey(auth_key)
+
+        aes_key, aes_iv = kdf(auth_key, msg_key, False)
+
+        # The ciphertext is decrypted straight from the packet, without being copied out of it first
+        data = aes.ige256_decrypt(memoryview(packet)[24:], aes_key, aes_iv)
 
-    msg_key = b.read(16)
-    aes_key, aes_iv = kdf(auth_key, msg_key, False)
-    data = BytesIO(aes.ige256_decrypt(b.read(), aes_key, aes_iv))
-    data.read(8)  # Salt
+        msg_key_large = auth_key.msg_key_incoming.copy()
+        msg_key_large.update(data)
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-session-id
-    SecurityCheckMismatch.check(data.read(8) == session_id, "data.read(8) == session_id")
+    # 8 = salt (8)
+    SecurityCheckMismatch.check(data[8:16] == session_id, "data[8:16] == session_id")
 
     try:
-        message = Message.read(data)
+        # 16 = salt (8) + session_id (8)
+        # Updates whose constructor is not in update_ids are skipped over instead of being decoded
+        read = Message.read_lazy if lazy else Message.read_from
+        message, _ = read(memoryview(data), 16, update_ids)
     except KeyError as e:
         if e.args[0] == 0:
             raise ConnectionError(f"Received empty data. Check your internet connection.")
 
-        left = data.read().hex()
+        left = data[16:].hex()
 
         left = [left[i:i + 64] for i in range(0, len(left), 64)]
         left = [[left[i:i + 8] for i in range(0, len(left), 8)] for left in left]
@@ -81,18 +155,17 @@ def unpack(
         raise ValueError(f"The server sent an unknown constructor: {hex(e.args[0])}\n{left}")
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-sha256-hash-value-of-msg-key
-    # 96 = 88 + 8 (incoming message)
     SecurityCheckMismatch.check(
-        msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24],
-        "msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24]"
+        msg_key == msg_key_large.digest()[8:24],
+        "msg_key == sha256(auth_key[96:96 + 32] + data).digest()[8:24]"
     )
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-message-length
-    data.seek(32)  # Get to the payload, skip salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
-    payload = data.read()
-    padding = payload[message.length:]
-    SecurityCheckMismatch.check(12 <= len(padding) <= 1024, "12 <= len(padding) <= 1024")
-    SecurityCheckMismatch.check(len(payload) % 4 == 0, "len(payload) % 4 == 0")
+    # 32 = salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
+    payload_length = len(data) - 32
+    padding_length = payload_length - message.length
+    SecurityCheckMismatch.check(12 <= padding_length <= 1024, "12 <= len(padding) <= 1024")
+    SecurityCheckMismatch.check(payload_length % 4 == 0, "len(payload) % 4 == 0")
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-msg-id
     SecurityCheckMismatch.check(message.msg_id % 2 != 0, "message.msg_id % 2 != 0")
@@ -0,0 +1,182 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""AES-256 in pure Python, for when no native implementation is available.
+
+Rounds work on 32-bit words through lookup tables, which merge SubBytes, ShiftRows and MixColumns,
+and whole buffers are converted from and to words at once rather than block by block.
+"""
+
+from struct import Struct
+from typing import List, Tuple
+
+
+def _tables():
+    # Powers of 3 generate the multiplicative group of GF(2^8)
+    exp, log = [0] * 510, [0] * 256
+    x = 1
+
+    for i in range(255):
+        exp[i] = exp[i + 255] = x
+        log[x] = i
+        x ^= ((x << 1) ^ (0x11b if x & 0x80 else 0)) & 0xff
+
+    def mul(a: int, b: int) -> int:
+        return exp[log[a] + log[b]] if a and b else 0
+
+    sbox, inv_sbox = [0] * 256, [0] * 256
+
+    for i in range(256):
+        b = exp[255 - log[i]] if i else 0
+        s = b
+
+        for _ in range(4):
+            b = ((b << 1) | (b >> 7)) & 0xff
+            s ^= b
+
+        sbox[i] = s ^ 0x63
+        inv_sbox[s ^ 0x63] = i
+
+    def rotate(t: List[int], n: int) -> List[int]:
+        return [((w >> n) | (w << (32 - n))) & 0xffffffff for w in t]
+
+    te = [(mul(s, 2) << 24) | (s << 16) | (s << 8) | mul(s, 3) for s in sbox]
+    td = [(mul(s, 14) << 24) | (mul(s, 9) << 16) | (mul(s, 13) << 8) | mul(s, 11) for s in inv_sbox]
+
+    return sbox, inv_sbox, (te, rotate(te, 8), rotate(te, 16), rotate(te, 24)), (td, rotate(td, 8), rotate(td, 16), rotate(td, 24))
+
+
+SBOX, INV_SBOX, TE, TD = _tables()
+ROUNDS = 14
+
+Block = Tuple[int, int, int, int]
+WORDS = Struct(">4I")
+
+
+class AES256:
+    """AES-256 block cipher, on blocks given as four big-endian 32-bit words."""
+
+    def __init__(self, key: bytes):
+        if len(key) != 32:
+            raise ValueError("AES-256 keys are 32 bytes long")
+
+        w = list(Struct(">8I").unpack(key))
+        rcon = 1
+
+        for i in range(8, 4 * (ROUNDS + 1)):
+            t = w[i - 1]
+
+            if i % 8 == 0:
+                t = ((t << 8) | (t >> 24)) & 0xffffffff
+                t = (SBOX[t >> 24] << 24 | SBOX[t >> 16 & 255] << 16 | SBOX[t >> 8 & 255] << 8 | SBOX[t & 255]) ^ (rcon << 24)
+                rcon = ((rcon << 1) ^ (0x11b if rcon & 0x80 else 0)) & 0xff
+            elif i % 8 == 4:
+                t = SBOX[t >> 24] << 24 | SBOX[t >> 16 & 255] << 16 | SBOX[t >> 8 & 255] << 8 | SBOX[t & 255]
+
+            w.append(w[i - 8] ^ t)
+
+        self.encryption_keys = [tuple(w[4 * r:4 * r + 4]) for r in range(ROUNDS + 1)]
+
+        # Equivalent inverse cipher: round keys in reverse, with InvMixColumns applied to the inner ones
+        td0, td1, td2, td3 = TD
+        self.decryption_keys = [self.encryption_keys[ROUNDS]] + [
+            tuple(
+                td0[SBOX[k >> 24]] ^ td1[SBOX[k >> 16 & 255]] ^ td2[SBOX[k >> 8 & 255]] ^ td3[SBOX[k & 255]]
+                for k in self.encryption_keys[r]
+            )
+            for r in range(ROUNDS - 1, 0, -1)
+        ] + [self.encryption_keys[0]]
+
+    def encrypt_block(self, s0: int, s1: int, s2: int, s3: int) -> Block:
+        te0, te1, te2, te3 = TE
+        keys = self.encryption_keys
+        k0, k1, k2, k3 = keys[0]
+        s0, s1, s2, s3 = s0 ^ k0, s1 ^ k1, s2 ^ k2, s3 ^ k3
+
+        for r in range(1, ROUNDS):
+            k0, k1, k2, k3 = keys[r]
+            s0, s1, s2, s3 = (
+                te0[s0 >> 24] ^ te1[s1 >> 16 & 255] ^ te2[s2 >> 8 & 255] ^ te3[s3 & 255] ^ k0,
+                te0[s1 >> 24] ^ te1[s2 >> 16 & 255] ^ te2[s3 >> 8 & 255] ^ te3[s0 & 255] ^ k1,
+                te0[s2 >> 24] ^ te1[s3 >> 16 & 255] ^ te2[s0 >> 8 & 255] ^ te3[s1 & 255] ^ k2,
+                te0[s3 >> 24] ^ te1[s0 >> 16 & 255] ^ te2[s1 >> 8 & 255] ^ te3[s2 & 255] ^ k3
+            )
+
+        s = SBOX
+        k0, k1, k2, k3 = keys[ROUNDS]
+
+        return (
+            (s[s0 >> 24] << 24 | s[s1 >> 16 & 255] << 16 | s[s2 >> 8 & 255] << 8 | s[s3 & 255]) ^ k0,
+            (s[s1 >> 24] << 24 | s[s2 >> 16 & 255] << 16 | s[s3 >> 8 & 255] << 8 | s[s0 & 255]) ^ k1,
+            (s[s2 >> 24] << 24 | s[s3 >> 16 & 255] << 16 | s[s0 >> 8 & 255] << 8 | s[s1 & 255]) ^ k2,
+            (s[s3 >> 24] << 24 | s[s0 >> 16 & 255] << 16 | s[s1 >> 8 & 255] << 8 | s[s2 & 255]) ^ k3
+        )
+
+    def decrypt_block(self, s0: int, s1: int, s2: int, s3: int) -> Block:
+        td0, td1, td2, td3 = TD
+        keys = self.decryption_keys
+        k0, k1, k2, k3 = keys[0]
+        s0, s1, s2, s3 = s0 ^ k0, s1 ^ k1, s2 ^ k2, s3 ^ k3
+
+        for r in range(1, ROUNDS):
+            k0, k1, k2, k3 = keys[r]
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24] ^ td1[s3 >> 16 & 255] ^ td2[s2 >> 8 & 255] ^ td3[s1 & 255] ^ k0,
+                td0[s1 >> 24] ^ td1[s0 >> 16 & 255] ^ td2[s3 >> 8 & 255] ^ td3[s2 & 255] ^ k1,
+                td0[s2 >> 24] ^ td1[s1 >> 16 & 255] ^ td2[s0 >> 8 & 255] ^ td3[s3 & 255] ^ k2,
+                td0[s3 >> 24] ^ td1[s2 >> 16 & 255] ^ td2[s1 >> 8 & 255] ^ td3[s0 & 255] ^ k3
+            )
+
+        s = INV_SBOX
+        k0, k1, k2, k3 = keys[ROUNDS]
+
+        return (
+            (s[s0 >> 24] << 24 | s[s3 >> 16 & 255] << 16 | s[s2 >> 8 & 255] << 8 | s[s1 & 255]) ^ k0,
+            (s[s1 >> 24] << 24 | s[s0 >> 16 & 255] << 16 | s[s3 >> 8 & 255] << 8 | s[s2 & 255]) ^ k1,
+            (s[s2 >> 24] << 24 | s[s1 >> 16 & 255] << 16 | s[s0 >> 8 & 255] << 8 | s[s3 & 255]) ^ k2,
+            (s[s3 >> 24] << 24 | s[s2 >> 16 & 255] << 16 | s[s1 >> 8 & 255] << 8 | s[s0 & 255]) ^ k3
+        )
+
+    def encrypt(self, block: bytes) -> bytes:
+        return WORDS.pack(*self.encrypt_block(*WORDS.unpack(block)))
+
+    def decrypt(self, block: bytes) -> bytes:
+        return WORDS.pack(*self.decrypt_block(*WORDS.unpack(block)))
+
+
+def ige256(data: bytes, key: bytes, iv: bytes, encrypt: bool) -> bytes:
+    if len(data) % 16:
+        raise ValueError("Data size must match a multiple of 16 bytes")
+
+    cipher = AES256(key)
+    function = cipher.encrypt_block if encrypt else cipher.decrypt_block
+
+    words = Struct(f">{len(data) // 4}I").unpack(data)
+    out = [0] * len(words)
+
+    # Encryption chains the previous ciphertext in and the previous plaintext out, decryption the reverse
+    a0, a1, a2, a3 = WORDS.unpack(iv[:16] if encrypt else iv[16:])
+    b0, b1, b2, b3 = WORDS.unpack(iv[16:] if encrypt else iv[:16])
+
+    for i in range(0, len(words), 4):
+        x0, x1, x2, x3 = words[i:i + 4]
+        y0, y1, y2, y3 = function(x0 ^ a0, x1 ^ a1, x2 ^ a2, x3 ^ a3)
+        a0, a1, a2, a3 = out[i:i + 4] = y0 ^ b0, y1 ^ b1, y2 ^ b2, y3 ^ b3
+        b0, b1, b2, b3 = x0, x1, x2, x3
+
+    return Struct(f">{len(out)}I").pack(*out)
@@ -0,0 +1,148 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+
+class CryptoScheduler:
+    """Run the encryption and decryption of packets, either inline or in a pool of worker threads.
+
+    Handing a packet over to a thread costs more than encrypting a small one, so packets up to
+    *inline_threshold* bytes (acks, pings, most updates) are processed right away on the event loop.
+    Bigger ones (file parts, long histories) go to the pool, so that they don't stall the loop.
+
+    Parameters:
+        workers (``int``, *optional*):
+            Number of worker threads. Pass 0 to process every packet inline.
+            Defaults to 1.
+
+        inline_threshold (``int``, *optional*):
+            Size in bytes up to which packets are processed inline.
+            Defaults to 16 KiB.
+
+        name (``str``, *optional*):
+            Prefix of the worker threads names.
+            Defaults to "CryptoWorker".
+    """
+
+    INLINE_THRESHOLD = 16 * 1024
+
+    def __init__(self, workers: int = 1, inline_threshold: int = INLINE_THRESHOLD, name: str = "CryptoWorker"):
+        self.workers = workers
+        self.inline_threshold = inline_threshold
+
+        self.executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(workers, thread_name_prefix=name)
+            if workers > 0 else None
+        )
+
+        self.inline_count = 0
+        self.pool_count = 0
+        self.queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    async def run(self, size: int, func: Callable, *args: Any) -> Any:
+        """Call *func* with *args*, inline or in the pool depending on the *size* of the packet."""
+        if self.executor is None or size <= self.inline_threshold:
+            self.inline_count += 1
+            return func(*args)
+
+        submitted = time.perf_counter()
+
+        def job():
+            # The time spent waiting for a free worker is measured here, in the worker itself
+            return time.perf_counter() - submitted, func(*args)
+
+        wait, result = await asyncio.get_running_loop().run_in_executor(self.executor, job)
+
+        self.pool_count += 1
+        self.queue_wait += wait
+        self.max_queue_wait = max(self.max_queue_wait, wait)
+
+        return result
+
+    def submit(self, size: int, func: Callable, *args: Any) -> asyncio.Future:
+        """Same as :meth:`run`, without waiting for the result.
+
+        Packets submitted one after the other are processed in parallel, the futures can be awaited in order.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if self.executor is None or size <= self.inline_threshold:
+            self.inline_count += 1
+
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+            return future
+
+        submitted = time.perf_counter()
+
+        def job():
+            return time.perf_counter() - submitted, func(*args)
+
+        def done(job_future: asyncio.Future):
+            if future.cancelled():
+                return
+
+            if job_future.cancelled():
+                future.cancel()
+                return
+
+            if job_future.exception() is not None:
+                future.set_exception(job_future.exception())
+                return
+
+            wait, result = job_future.result()
+
+            self.pool_count += 1
+            self.queue_wait += wait
+            self.max_queue_wait = max(self.max_queue_wait, wait)
+
+            future.set_result(result)
+
+        loop.run_in_executor(self.executor, job).add_done_callback(done)
+
+        return future
+
+    def stats(self) -> Dict[str, float]:
+        """Get the number of packets processed inline and in the pool, and how long they waited for a worker.
+
+        A growing average queue wait means the pool is the bottleneck, and more workers are needed.
+        """
+        return {
+            "inline": self.inline_count,
+            "pool": self.pool_count,
+            "avg_queue_wait": self.queue_wait / self.pool_count if self.pool_count else 0.0,
+            "max_queue_wait": self.max_queue_wait
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers. Packets still coming, if any, are processed inline from then on."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
@@ -20,6 +20,7 @@ import asyncio
 import inspect
 import logging
 from collections import OrderedDict
+from typing import FrozenSet, Optional
 
 import pyrogram
 from pyrogram import utils
@@ -151,6 +152,53 @@ class Dispatcher:
 
         self.update_parsers = {key: value for key_tuple, value in self.update_parsers.items() for key in key_tuple}
 
+        self.handler_updates = {
+            MessageHandler: Dispatcher.NEW_MESSAGE_UPDATES,
+            EditedMessageHandler: Dispatcher.EDIT_MESSAGE_UPDATES,
+            DeletedMessagesHandler: Dispatcher.DELETE_MESSAGES_UPDATES,
+            CallbackQueryHandler: Dispatcher.CALLBACK_QUERY_UPDATES,
+            UserStatusHandler: Dispatcher.USER_STATUS_UPDATES,
+            InlineQueryHandler: Dispatcher.BOT_INLINE_QUERY_UPDATES,
+            PollHandler: Dispatcher.POLL_UPDATES,
+            ChosenInlineResultHandler: Dispatcher.CHOSEN_INLINE_RESULT_UPDATES,
+            ChatMemberUpdatedHandler: Dispatcher.CHAT_MEMBER_UPDATES,
+            ChatJoinRequestHandler: Dispatcher.CHAT_JOIN_REQUEST_UPDATES,
+            GuardBotQueryHandler: Dispatcher.GUARD_BOT_QUERY_UPDATES,
+        }
+
+        # Constructor IDs of the updates worth decoding, None means all of them
+        self.update_ids: Optional[FrozenSet[int]] = None
+        self.refresh_update_ids()
+
+    def refresh_update_ids(self):
+        """Compute the constructor IDs of the updates the registered handlers can consume.
+
+        Updates coming from the server are skipped over without being decoded unless their ID is
+        listed here. Everything is decoded when updates are tracked (``skip_updates=False``), because
+        their pts must be stored, and when a :obj:`~pyrogram.handlers.RawUpdateHandler` is registered.
+        """
+        if self.client.no_updates:
+            self.update_ids = frozenset()
+            return
+
+        if not self.client.skip_updates:
+            self.update_ids = None
+            return
+
+        update_ids = set()
+
+        for group in self.groups.values():
+            for handler in group:
+                if isinstance(handler, RawUpdateHandler):
+                    self.update_ids = None
+                    return
+
+                for handler_type, updates in self.handler_updates.items():
+                    if isinstance(handler, handler_type):
+                        update_ids.update(update.ID for update in updates)
+
+        self.update_ids = frozenset(update_ids)
+
     async def start(self):
         if not self.client.no_updates:
             loop = asyncio.get_running_loop()
@@ -182,6 +230,7 @@ class Dispatcher:
 
             self.handler_worker_tasks.clear()
             self.groups.clear()
+            self.refresh_update_ids()
 
             log.info("Stopped %s HandlerTasks", self.client.workers)
 
@@ -194,6 +243,7 @@ class Dispatcher:
                 self.groups = OrderedDict(sorted(self.groups.items()))
 
             self.groups[group].append(handler)
+            self.refresh_update_ids()
             return
 
         async def fn():
@@ -206,6 +256,7 @@ class Dispatcher:
                     self.groups = OrderedDict(sorted(self.groups.items()))
 
                 self.groups[group].append(handler)
+                self.refresh_update_ids()
             finally:
                 for lock in self.locks_list:
                     lock.release()
@@ -218,6 +269,7 @@ class Dispatcher:
                 raise ValueError(f"Group {group} does not exist. Handler was not removed.")
 
             self.groups[group].remove(handler)
+            self.refresh_update_ids()
             return
 
         async def fn():
@@ -229,6 +281,7 @@ class Dispatcher:
                     raise ValueError(f"Group {group} does not exist. Handler was not removed.")
 
                 self.groups[group].remove(handler)
+                self.refresh_update_ids()
             finally:
                 for lock in self.locks_list:
                     lock.release()
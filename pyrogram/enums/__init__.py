@@ -28,6 +28,7 @@ from .messages_filter import MessagesFilter
 from .next_code_type import NextCodeType
 from .parse_mode import ParseMode
 from .poll_type import PollType
+from .request_priority import RequestPriority
 from .rich_block_type import RichBlockType
 from .rich_text_type import RichTextType
 from .sent_code_type import SentCodeType
@@ -46,6 +47,7 @@ __all__ = [
     'NextCodeType',
     'ParseMode',
     'PollType',
+    'RequestPriority',
     'RichBlockType',
     'RichTextType',
     'SentCodeType',
@@ -20,7 +20,7 @@ import logging
 from typing import TypeVar, overload
 
 import pyrogram
-from pyrogram import raw
+from pyrogram import enums, raw
 from pyrogram.raw.core import TLObject
 from pyrogram.session import Session
 
@@ -35,7 +35,8 @@ class Invoke:
         query: TLObject[ReturnType],
         retries: int = Session.MAX_RETRIES,
         timeout: float = Session.WAIT_TIMEOUT,
-        sleep_threshold: float = None
+        sleep_threshold: float = None,
+        priority: "enums.RequestPriority" = None
     ):
         """Invoke raw Telegram functions.
 
@@ -64,6 +65,11 @@ class Invoke:
             sleep_threshold (``float``):
                 Sleep threshold in seconds.
 
+            priority (:obj:`~pyrogram.enums.RequestPriority`, *optional*):
+                Decides which requests go first when more are waiting than can be sent at once.
+                Defaults to the priority of the kind of request: interactive for answers to queries, bulk for file
+                transfers and long lists, normal for the rest.
+
         Returns:
             ``RawType``: The raw type response generated by the query.
 
@@ -83,7 +89,8 @@ class Invoke:
             query, retries, timeout,
             (sleep_threshold
              if sleep_threshold is not None
-             else self.sleep_threshold)
+             else self.sleep_threshold),
+            priority
         )
 
         await self.fetch_peers(getattr(r, "users", []))
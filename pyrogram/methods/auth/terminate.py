@@ -46,10 +46,14 @@ class Terminate:
         await self.storage.save()
         await self.dispatcher.stop()
 
-        for media_session in self.media_sessions.values():
-            await media_session.stop()
+        await self.media_sessions.stop()
+        await self.stop_updates_worker()
 
-        self.media_sessions.clear()
+        # The pools of this client only, the shared one is left to the others
+        for scheduler in self.crypto_schedulers.values():
+            scheduler.shutdown()
+
+        self.crypto_schedulers.clear()
 
         self.updates_watchdog_event.set()
 
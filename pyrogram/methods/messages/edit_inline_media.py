@@ -197,8 +197,6 @@ class EditInlineMedia:
         unpacked = utils.unpack_inline_message_id(inline_message_id)
         dc_id = unpacked.dc_id
 
-        session = await get_session(self, dc_id)
-
         if is_uploaded_file:
             uploaded_media = await self.invoke(
                 raw.functions.messages.UploadMedia(
@@ -225,21 +223,22 @@ class EditInlineMedia:
         else:
             actual_media = media
 
-        for i in range(self.MAX_RETRIES):
-            try:
-                return await session.invoke(
-                    raw.functions.messages.EditInlineBotMessage(
-                        id=unpacked,
-                        media=actual_media,
-                        reply_markup=await reply_markup.write(self) if reply_markup else None,
-                        **await utils.parse_text_entities(self, caption, parse_mode, caption_entities)
-                    ),
-                    sleep_threshold=self.sleep_threshold
-                )
-            except RPCError as e:
-                if i == self.MAX_RETRIES - 1:
-                    raise
-
-                if isinstance(e, MediaEmpty):
-                    # Must wait due to a server race condition
-                    await asyncio.sleep(1)
+        async with get_session(self, dc_id) as session:
+            for i in range(self.MAX_RETRIES):
+                try:
+                    return await session.invoke(
+                        raw.functions.messages.EditInlineBotMessage(
+                            id=unpacked,
+                            media=actual_media,
+                            reply_markup=await reply_markup.write(self) if reply_markup else None,
+                            **await utils.parse_text_entities(self, caption, parse_mode, caption_entities)
+                        ),
+                        sleep_threshold=self.sleep_threshold
+                    )
+                except RPCError as e:
+                    if i == self.MAX_RETRIES - 1:
+                        raise
+
+                    if isinstance(e, MediaEmpty):
+                        # Must wait due to a server race condition
+                        await asyncio.sleep(1)
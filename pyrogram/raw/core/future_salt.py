@@ -17,7 +17,8 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import Any
+from struct import Struct
+from typing import Any, Tuple
 
 from .primitives.int import Int, Long
 from .tl_object import TLObject
@@ -30,6 +31,8 @@ class FutureSalt(TLObject):
 
     QUALNAME = "FutureSalt"
 
+    STRUCT = Struct("<iiq")
+
     def __init__(self, valid_since: int, valid_until: int, salt: int):
         self.valid_since = valid_since
         self.valid_until = valid_until
@@ -43,11 +46,12 @@ class FutureSalt(TLObject):
 
         return FutureSalt(valid_since, valid_until, salt)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    @staticmethod
+    def read_from(b: memoryview, offset: int, *args: Any) -> Tuple["FutureSalt", int]:
+        return FutureSalt(*FutureSalt.STRUCT.unpack_from(b, offset)), offset + FutureSalt.STRUCT.size
 
-        b.write(Int(self.valid_since))
-        b.write(Int(self.valid_until))
-        b.write(Long(self.salt))
+    def write_into(self, b: bytearray, *args: Any) -> None:
+        b += FutureSalt.STRUCT.pack(self.valid_since, self.valid_until, self.salt)
 
-        return b.getvalue()
+    def write(self, *args: Any) -> bytes:
+        return FutureSalt.STRUCT.pack(self.valid_since, self.valid_until, self.salt)
@@ -18,7 +18,7 @@
 
 from gzip import compress, decompress
 from io import BytesIO
-from typing import cast, Any
+from typing import cast, Any, Tuple
 
 from .primitives.bytes import Bytes
 from .primitives.int import Int
@@ -46,17 +46,25 @@ class GzipPacked(TLObject):
             )
         ))
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    @staticmethod
+    def read_from(b: memoryview, offset: int, *args: Any) -> Tuple["GzipPacked", int]:
+        start, end, offset = Bytes.span(b, offset)
 
-        b.write(Int(self.ID, False))
+        # Return the Object itself instead of a GzipPacked wrapping it
+        return TLObject.read_from(memoryview(decompress(b[start:end])), 0, *args)[0], offset
 
-        b.write(
-            Bytes(
-                compress(
-                    self.packed_data.write()
-                )
-            )
-        )
+    @staticmethod
+    def read_lazy(b: memoryview, offset: int, *args: Any) -> Tuple["GzipPacked", int]:
+        start, end, offset = Bytes.span(b, offset)
+
+        return TLObject.read_lazy(memoryview(decompress(b[start:end])), 0, *args)[0], offset
+
+    def write_into(self, b: bytearray, *args: Any) -> None:
+        Int.write_into(b, self.ID, False)
+        Bytes.write_into(b, compress(self.packed_data.write()))
+
+    def write(self, *args: Any) -> bytes:
+        b = bytearray()
+        self.write_into(b)
 
-        return b.getvalue()
+        return bytes(b)
@@ -17,7 +17,8 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import Any
+from struct import Struct
+from typing import Any, Optional, Tuple, Union
 
 from .primitives.int import Int, Long
 from .tl_object import TLObject
@@ -26,16 +27,28 @@ from .tl_object import TLObject
 class Message(TLObject):
     ID = 0x5BB8E511  # hex(crc32(b"message msg_id:long seqno:int bytes:int body:Object = Message"))
 
-    __slots__ = ["msg_id", "seq_no", "length", "body"]
+    HEADER = Struct("<qii")
+
+    __slots__ = ["msg_id", "seq_no", "length", "body", "_data"]
 
     QUALNAME = "Message"
 
-    def __init__(self, body: TLObject, msg_id: int, seq_no: int, length: int):
+    def __init__(
+        self,
+        body: TLObject,
+        msg_id: int,
+        seq_no: int,
+        length: int,
+        data: Optional[Union[bytes, bytearray]] = None
+    ):
         self.msg_id = msg_id
         self.seq_no = seq_no
         self.length = length
         self.body = body
 
+        # The already serialized body, reused instead of calling body.write() again
+        self._data = data
+
     @staticmethod
     def read(data: BytesIO, *args: Any) -> "Message":
         msg_id = Long.read(data)
@@ -45,12 +58,37 @@ class Message(TLObject):
 
         return Message(TLObject.read(BytesIO(body)), msg_id, seq_no, length)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    @staticmethod
+    def read_from(b: memoryview, offset: int, *args: Any) -> Tuple["Message", int]:
+        msg_id, seq_no, length = Message.HEADER.unpack_from(b, offset)
+        start = offset + 16
+        end = start + length
 
-        b.write(Long(self.msg_id))
-        b.write(Int(self.seq_no))
-        b.write(Int(self.length))
-        b.write(self.body.write())
+        # Bound the body, bare vectors guess their item size from the bytes left
+        body, _ = TLObject.read_from(b[:end], start, *args)
+
+        return Message(body, msg_id, seq_no, length), end
+
+    @staticmethod
+    def read_lazy(b: memoryview, offset: int, *args: Any) -> Tuple["Message", int]:
+        msg_id, seq_no, length = Message.HEADER.unpack_from(b, offset)
+        start = offset + 16
+        end = start + length
+
+        body, _ = TLObject.read_lazy(b[:end], start, *args)
+
+        return Message(body, msg_id, seq_no, length), end
+
+    def write_into(self, b: bytearray, *args: Any) -> None:
+        b += Message.HEADER.pack(self.msg_id, self.seq_no, self.length)
+
+        if self._data is not None:
+            b += self._data
+        else:
+            self.body.write_into(b)
+
+    def write(self, *args: Any) -> bytes:
+        b = bytearray()
+        self.write_into(b)
 
-        return b.getvalue()
+        return bytes(b)
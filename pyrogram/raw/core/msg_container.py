@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import List, Any
+from typing import List, Any, Tuple
 
 from .message import Message
 from .primitives.int import Int
@@ -39,15 +39,37 @@ class MsgContainer(TLObject):
         count = Int.read(data)
         return MsgContainer([Message.read(data) for _ in range(count)])
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    @staticmethod
+    def read_from(b: memoryview, offset: int, *args: Any) -> Tuple["MsgContainer", int]:
+        count, offset = Int.read_from(b, offset)
+        messages = []
+
+        for _ in range(count):
+            message, offset = Message.read_from(b, offset, *args)
+            messages.append(message)
 
-        b.write(Int(self.ID, False))
+        return MsgContainer(messages), offset
+
+    @staticmethod
+    def read_lazy(b: memoryview, offset: int, *args: Any) -> Tuple["MsgContainer", int]:
+        count, offset = Int.read_from(b, offset)
+        messages = []
 
-        count = len(self.messages)
-        b.write(Int(count))
+        for _ in range(count):
+            message, offset = Message.read_lazy(b, offset, *args)
+            messages.append(message)
+
+        return MsgContainer(messages), offset
+
+    def write_into(self, b: bytearray, *args: Any) -> None:
+        Int.write_into(b, self.ID, False)
+        Int.write_into(b, len(self.messages))
 
         for message in self.messages:
-            b.write(message.write())
+            message.write_into(b)
+
+    def write(self, *args: Any) -> bytes:
+        b = bytearray()
+        self.write_into(b)
 
-        return b.getvalue()
+        return bytes(b)
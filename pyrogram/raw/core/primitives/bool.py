@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import Any
+from typing import Any, Tuple
 
 from ..tl_object import TLObject
 
@@ -30,6 +30,14 @@ class BoolFalse(bytes, TLObject):
     def read(cls, *args: Any) -> bool:
         return cls.value
 
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, *args: Any) -> Tuple[bool, int]:
+        return cls.value, offset
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, *args: Any) -> int:
+        return offset
+
     def __new__(cls) -> bytes:  # type: ignore
         return cls.ID.to_bytes(4, "little")
 
@@ -44,5 +52,18 @@ class Bool(bytes, TLObject):
     def read(cls, data: BytesIO, *args: Any) -> bool:
         return int.from_bytes(data.read(4), "little") == BoolTrue.ID
 
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, *args: Any) -> Tuple[bool, int]:
+        end = offset + 4
+        return int.from_bytes(b[offset:end], "little") == BoolTrue.ID, end
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, *args: Any) -> int:
+        return offset + 4
+
+    @classmethod
+    def write_into(cls, b: bytearray, value: bool) -> None:  # type: ignore
+        b += BoolTrue() if value else BoolFalse()
+
     def __new__(cls, value: bool) -> bytes:  # type: ignore
         return BoolTrue() if value else BoolFalse()
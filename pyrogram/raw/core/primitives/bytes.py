@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import Any
+from typing import Any, Tuple
 
 from ..tl_object import TLObject
 
@@ -37,6 +37,45 @@ class Bytes(bytes, TLObject):
 
         return x
 
+    @staticmethod
+    def span(b: memoryview, offset: int) -> Tuple[int, int, int]:
+        """Get start and end of the value encoded at offset, and the offset past its padding"""
+        length = b[offset]
+
+        if length <= 253:
+            start = offset + 1
+            end = start + length
+            return start, end, end + (-(length + 1) % 4)
+        else:
+            length = int.from_bytes(b[offset + 1:offset + 4], "little")
+            start = offset + 4
+            end = start + length
+            return start, end, end + (-length % 4)
+
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, *args: Any) -> Tuple[bytes, int]:
+        start, end, offset = Bytes.span(b, offset)
+        return bytes(b[start:end]), offset
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, *args: Any) -> int:
+        return Bytes.span(b, offset)[2]
+
+    @classmethod
+    def write_into(cls, b: bytearray, value: bytes) -> None:  # type: ignore
+        length = len(value)
+
+        # Append the value in place instead of building the padded copy __new__ returns
+        if length <= 253:
+            b.append(length)
+            b += value
+            b += bytes(-(length + 1) % 4)
+        else:
+            b.append(254)
+            b += length.to_bytes(3, "little")
+            b += value
+            b += bytes(-length % 4)
+
     def __new__(cls, value: bytes) -> bytes:  # type: ignore
         length = len(value)
 
@@ -17,16 +17,30 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from struct import unpack, pack
-from typing import cast, Any
+from struct import unpack, pack, Struct
+from typing import cast, Any, Tuple
 
 from ..tl_object import TLObject
 
 
 class Double(bytes, TLObject):
+    STRUCT = Struct("d")
+
     @classmethod
     def read(cls, data: BytesIO, *args: Any) -> float:
         return cast(float, unpack("d", data.read(8))[0])
 
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, *args: Any) -> Tuple[float, int]:
+        return cls.STRUCT.unpack_from(b, offset)[0], offset + 8
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, *args: Any) -> int:
+        return offset + 8
+
+    @classmethod
+    def write_into(cls, b: bytearray, value: float) -> None:  # type: ignore
+        b += cls.STRUCT.pack(value)
+
     def __new__(cls, value: float) -> bytes:  # type: ignore
         return pack("d", value)
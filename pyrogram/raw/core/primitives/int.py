@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import Any
+from typing import Any, Tuple
 
 from ..tl_object import TLObject
 
@@ -29,6 +29,19 @@ class Int(bytes, TLObject):
     def read(cls, data: BytesIO, signed: bool = True, *args: Any) -> int:
         return int.from_bytes(data.read(cls.SIZE), "little", signed=signed)
 
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, signed: bool = True, *args: Any) -> Tuple[int, int]:
+        end = offset + cls.SIZE
+        return int.from_bytes(b[offset:end], "little", signed=signed), end
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, *args: Any) -> int:
+        return offset + cls.SIZE
+
+    @classmethod
+    def write_into(cls, b: bytearray, value: int, signed: bool = True) -> None:  # type: ignore
+        b += value.to_bytes(cls.SIZE, "little", signed=signed)
+
     def __new__(cls, value: int, signed: bool = True) -> bytes:  # type: ignore
         return value.to_bytes(cls.SIZE, "little", signed=signed)
 
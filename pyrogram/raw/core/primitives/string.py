@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import cast
+from typing import cast, Any, Tuple
 
 from .bytes import Bytes
 
@@ -27,5 +27,14 @@ class String(Bytes):
     def read(cls, data: BytesIO, *args) -> str:  # type: ignore
         return cast(bytes, super(String, String).read(data)).decode(errors="replace")
 
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, *args: Any) -> Tuple[str, int]:  # type: ignore
+        start, end, offset = Bytes.span(b, offset)
+        return str(b[start:end], "utf-8", "replace"), offset
+
+    @classmethod
+    def write_into(cls, b: bytearray, value: str) -> None:  # type: ignore
+        Bytes.write_into(b, value.encode())
+
     def __new__(cls, value: str) -> bytes:  # type: ignore
         return super().__new__(cls, value.encode())
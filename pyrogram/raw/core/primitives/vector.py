@@ -17,17 +17,20 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import cast, Union, Any
+from struct import Struct, pack
+from typing import Callable, Container, Optional, Union, Any, Tuple
 
 from .bool import BoolFalse, BoolTrue, Bool
-from .int import Int, Long
+from .int import Int, Long, Int128, Int256
 from ..list import List
-from ..tl_object import TLObject
+from ..tl_object import TLObject, CONSTRUCTOR_ID
 
 
 class Vector(bytes, TLObject):
     ID = 0x1CB5C415
 
+    HEADER = Struct("<Ii")
+
     # Method added to handle the special case when a query returns a bare Vector (of Ints);
     # i.e., RpcResult body starts with 0x1cb5c415 (Vector Id) - e.g., messages.GetMessagesViews.
     @staticmethod
@@ -58,18 +61,133 @@ class Vector(bytes, TLObject):
     @classmethod
     def read(cls, data: BytesIO, t: Any = None, *args: Any) -> List:
         count = Int.read(data)
-        left = len(data.read())
+
+        if t:
+            return List(t.read(data) for _ in range(count))
+
+        # Item type unknown (e.g. a bare Vector inside an RpcResult): guess the item size from the bytes left.
+        # Seek to the end instead of reading, in order not to copy the whole remaining buffer for each vector.
+        position = data.tell()
+        left = data.seek(0, 2) - position
+        data.seek(position)
         size = (left / count) if count else 0
-        data.seek(-left, 1)
 
-        return List(
-            t.read(data) if t
-            else Vector.read_bare(data, size)
-            for _ in range(count)
-        )
+        return List(Vector.read_bare(data, size) for _ in range(count))
+
+    @staticmethod
+    def read_bare_from(b: memoryview, offset: int, size: float) -> Tuple[Any, int]:
+        if size == 4:
+            if int.from_bytes(b[offset:offset + 4], "little") in [BoolFalse.ID, BoolTrue.ID]:
+                return Bool.read_from(b, offset)
+
+            return Int.read_from(b, offset)
+
+        if size == 8:
+            return Long.read_from(b, offset)
+
+        return TLObject.read_from(b, offset)
+
+    @classmethod
+    def read_from(
+        cls,
+        b: memoryview,
+        offset: int,
+        t: Any = None,
+        accept: Optional[Container[int]] = None,
+        *args: Any
+    ) -> Tuple[List, int]:
+        count = int.from_bytes(b[offset:offset + 4], "little", signed=True)
+        offset += 4
+
+        if t is Int or t is Long:
+            # Vectors of plain integers (ids, mostly) are decoded in one go
+            items = Struct(f"<{count}{'i' if t is Int else 'q'}")
+            return List(items.unpack_from(b, offset)), offset + items.size
+
+        if t:
+            return Vector.read_items(b, offset, count, t.read_from, accept)
+
+        items = List()
+        size = ((len(b) - offset) / count) if count else 0
+
+        for _ in range(count):
+            item, offset = Vector.read_bare_from(b, offset, size)
+            items.append(item)
+
+        return items, offset
+
+    @classmethod
+    def read_lazy(
+        cls,
+        b: memoryview,
+        offset: int,
+        t: Any = None,
+        accept: Optional[Container[int]] = None,
+        *args: Any
+    ) -> Tuple[List, int]:
+        if t is not TLObject:
+            return Vector.read_from(b, offset, t, accept)
+
+        count = int.from_bytes(b[offset:offset + 4], "little", signed=True)
+
+        return Vector.read_items(b, offset + 4, count, TLObject.read_lazy, accept)
+
+    @staticmethod
+    def read_items(
+        b: memoryview,
+        offset: int,
+        count: int,
+        read: Callable[[memoryview, int], Tuple[Any, int]],
+        accept: Optional[Container[int]] = None
+    ) -> Tuple[List, int]:
+        items = List()
+
+        if accept is not None:
+            # Only objects with an accepted constructor ID are decoded, the others are skipped over
+            for _ in range(count):
+                if CONSTRUCTOR_ID.unpack_from(b, offset)[0] in accept:
+                    item, offset = read(b, offset)
+                    items.append(item)
+                else:
+                    offset = TLObject.skip(b, offset)
+        else:
+            for _ in range(count):
+                item, offset = read(b, offset)
+                items.append(item)
+
+        return items, offset
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, t: Any = None, *args: Any) -> int:
+        if t is None:
+            return Vector.read_from(b, offset)[1]
+
+        count = int.from_bytes(b[offset:offset + 4], "little", signed=True)
+        offset += 4
+
+        if t in (Int, Long, Int128, Int256):
+            return offset + count * t.SIZE
+
+        for _ in range(count):
+            offset = t.skip(b, offset)
+
+        return offset
+
+    @classmethod
+    def write_into(cls, b: bytearray, value: list, t: Any = None) -> None:  # type: ignore
+        b += cls.HEADER.pack(cls.ID, len(value))
+
+        if t is Int or t is Long:
+            b += pack(f"<{len(value)}{'i' if t is Int else 'q'}", *value)
+        elif t:
+            for i in value:
+                t.write_into(b, i)
+        else:
+            for i in value:
+                i.write_into(b)
 
     def __new__(cls, value: list, t: Any = None) -> bytes:  # type: ignore
-        return b"".join(
-            [Int(cls.ID, False), Int(len(value))]
-            + [cast(bytes, t(i)) if t else i.write() for i in value]
-        )
+        b = bytearray()
+        Vector.write_into(b, value, t)
+
+        return bytes(b)
@@ -18,12 +18,15 @@
 
 from io import BytesIO
 from json import dumps
-from typing import cast, List, Any, Union, Dict, TypeVar, Generic
+from struct import Struct
+from typing import cast, List, Any, Union, Dict, Tuple, TypeVar, Generic
 
 from ..all import objects
 
 ReturnType = TypeVar("ReturnType")
 
+CONSTRUCTOR_ID = Struct("<I")
+
 
 class TLObject(Generic[ReturnType]):
     __slots__: List[str] = []
@@ -32,11 +35,81 @@ class TLObject(Generic[ReturnType]):
 
     @classmethod
     def read(cls, b: BytesIO, *args: Any) -> Any:
-        return cast(TLObject, objects[int.from_bytes(b.read(4), "little")]).read(b, *args)
+        if not isinstance(b, BytesIO):
+            return cast(TLObject, objects[int.from_bytes(b.read(4), "little")]).read(b, *args)
+
+        # Decode straight from the underlying buffer and move the stream past the object
+        view = b.getbuffer()
+
+        try:
+            obj, offset = TLObject.read_from(view, b.tell(), *args)
+        finally:
+            view.release()
+
+        b.seek(offset)
+
+        return obj
+
+    @classmethod
+    def read_from(cls, b: memoryview, offset: int, *args: Any) -> Tuple[Any, int]:
+        """Decode an object from a buffer, starting at the given offset.
+
+        Returns the object along with the offset right past it.
+        """
+        return objects[CONSTRUCTOR_ID.unpack_from(b, offset)[0]].read_from(b, offset + 4, *args)
+
+    @classmethod
+    def read_lazy(cls, b: memoryview, offset: int, *args: Any) -> Tuple[Any, int]:
+        """Decode an object from a buffer, deferring the decoding of the vectors of TL objects it contains.
+
+        Vector fields (entities, ...) are only decoded once first accessed, see :meth:`__getattr__`, except
+        for the vectors of updates, users and chats. Single nested objects are decoded right away, in the
+        same way. The buffer must therefore stay valid for as long as the object is alive.
+        """
+        if cls is not TLObject:
+            # Types without fields holding TL objects have nothing to defer
+            return cls.read_from(b, offset, *args)
+
+        return objects[CONSTRUCTOR_ID.unpack_from(b, offset)[0]].read_lazy(b, offset + 4, *args)
+
+    @classmethod
+    def skip(cls, b: memoryview, offset: int, *args: Any) -> int:
+        """Get the offset right past the object at the given offset, without decoding it."""
+        if cls is not TLObject:
+            # Types without a dedicated skip method are decoded and thrown away
+            return cls.read_from(b, offset, *args)[1]
+
+        return objects[CONSTRUCTOR_ID.unpack_from(b, offset)[0]].skip(b, offset + 4, *args)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for unset slots: the fields of lazily decoded objects which are not decoded yet
+        if name != "_lazy":
+            try:
+                b, fields = self._lazy
+                offset, args = fields[name]
+            except (AttributeError, KeyError):
+                pass
+            else:
+                value, _ = TLObject.read_lazy(b, offset, *args)
+                setattr(self, name, value)
+
+                fields.pop(name, None)
+
+                # Let go of the buffer once every field has been decoded
+                if not fields:
+                    del self._lazy
+
+                return value
+
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
     def write(self, *args: Any) -> bytes:
         pass
 
+    def write_into(self, b: bytearray, *args: Any) -> None:
+        """Serialize the object at the end of the given buffer"""
+        b += self.write(*args)
+
     @staticmethod
     def default(obj: "TLObject") -> Union[str, Dict[str, str]]:
         if isinstance(obj, bytes):
@@ -47,7 +120,7 @@ class TLObject(Generic[ReturnType]):
             **{
                 attr: getattr(obj, attr)
                 for attr in obj.__slots__
-                if getattr(obj, attr) is not None
+                if not attr.startswith("_") and getattr(obj, attr) is not None
             }
         }
 
@@ -63,12 +136,16 @@ class TLObject(Generic[ReturnType]):
             ", ".join(
                 f"{attr}={repr(getattr(self, attr))}"
                 for attr in self.__slots__
-                if getattr(self, attr) is not None
+                if not attr.startswith("_") and getattr(self, attr) is not None
             )
         )
 
     def __eq__(self, other: Any) -> bool:
         for attr in self.__slots__:
+            # Underscored slots hold private caches, not fields
+            if attr.startswith("_"):
+                continue
+
             try:
                 if getattr(self, attr) != getattr(other, attr):
                     return False
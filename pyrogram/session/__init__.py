@@ -17,4 +17,5 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .auth import Auth
+from .media_sessions import MediaSessions
 from .session import Session
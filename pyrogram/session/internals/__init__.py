@@ -17,5 +17,9 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .data_center import DataCenter
+from .deadline_wheel import DeadlineWheel
 from .msg_factory import MsgFactory
 from .msg_id import MsgId
+from .rate_limiter import RateLimiter
+from .replay_window import ReplayWindow
+from .request_scheduler import RequestScheduler
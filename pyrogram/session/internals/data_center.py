@@ -16,10 +16,18 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Tuple
+from itertools import zip_longest
+from typing import Tuple, Dict, List, Iterable
 
 
 class DataCenter:
+    # Connect time used to rank the endpoints never tried, and the one given to endpoints which failed
+    UNKNOWN_LATENCY = 1.0
+    FAILURE_LATENCY = 10.0
+
+    # Weight of the latest measure in the smoothed connect time of an endpoint
+    LATENCY_WEIGHT = 0.3
+
     TEST = {
         1: "149.154.175.10",
         2: "149.154.167.40",
@@ -60,6 +68,12 @@ class DataCenter:
         4: "2001:067c:04e8:f004:0000:0000:0000:000b"
     }
 
+    # More addresses, as advertised by help.GetConfig, keyed by (dc_id, test_mode, ipv6, media)
+    options: Dict[Tuple[int, bool, bool, bool], List[Tuple[str, int]]] = {}
+
+    # Smoothed connect time of the endpoints tried so far
+    latency: Dict[Tuple[str, int], float] = {}
+
     def __new__(cls, dc_id: int, test_mode: bool, ipv6: bool, media: bool) -> Tuple[str, int]:
         if test_mode:
             if ipv6:
@@ -81,3 +95,68 @@ class DataCenter:
                     ip = cls.PROD[dc_id]
 
             return ip, 443
+
+    @classmethod
+    def endpoints(cls, dc_id: int, test_mode: bool, ipv6: bool, media: bool) -> List[Tuple[str, int]]:
+        """Get every known address of a data center, the most likely to connect fast first.
+
+        IPv6 addresses, which are only used when *ipv6* is enabled, alternate with IPv4 ones so that
+        a broken family doesn't hold the connection back.
+        """
+        families = []
+
+        for v6 in ((True, False) if ipv6 else (False,)):
+            try:
+                addresses = [cls(dc_id, test_mode, v6, media)]
+            except KeyError:
+                addresses = []
+
+            if media:
+                addresses += cls.options.get((dc_id, test_mode, v6, True), [])
+
+            addresses += cls.options.get((dc_id, test_mode, v6, False), [])
+            families.append(addresses)
+
+        endpoints = []
+
+        for address in (a for group in zip_longest(*families) for a in group if a is not None):
+            if address not in endpoints:
+                endpoints.append(address)
+
+        # Sorting is stable: endpoints never tried keep their order, between the fast and the failing ones
+        return sorted(endpoints, key=lambda a: cls.latency.get(a, cls.UNKNOWN_LATENCY))
+
+    @classmethod
+    def update(cls, dc_options: Iterable[Tuple[int, str, int, bool, bool, bool, bool]], test_mode: bool) -> None:
+        """Learn the addresses of the data centers from the DC options of a help.GetConfig result.
+
+        Options are tuples as kept by :meth:`~pyrogram.storage.Storage.dc_options`. The addresses are shared by all
+        the clients, so they're added to the ones already known rather than replacing them: a client starting with
+        an empty storage doesn't make the others forget theirs.
+        """
+        for dc_id, ip_address, port, ipv6, media_only, cdn, tcpo_only in dc_options:
+            # Obfuscated only endpoints need a secret, which plain connections don't have
+            if tcpo_only:
+                continue
+
+            # CDN data centers only ever serve media
+            key = (dc_id, test_mode, ipv6, media_only or cdn)
+            address = (ip_address, port)
+
+            if address not in cls.options.setdefault(key, []):
+                cls.options[key].append(address)
+
+    @classmethod
+    def record(cls, address: Tuple[str, int], elapsed: float) -> None:
+        """Account for a successful connection to an address, which took *elapsed* seconds."""
+        latency = cls.latency.get(address)
+
+        if latency is None or latency >= cls.FAILURE_LATENCY:
+            cls.latency[address] = elapsed
+        else:
+            cls.latency[address] = latency + (elapsed - latency) * cls.LATENCY_WEIGHT
+
+    @classmethod
+    def record_failure(cls, address: Tuple[str, int]) -> None:
+        """Account for a failed connection to an address, which goes last until it works again."""
+        cls.latency[address] = cls.FAILURE_LATENCY
@@ -0,0 +1,92 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import heapq
+import math
+from typing import Dict, List, Optional, Set
+
+
+class DeadlineWheel:
+    """Fail futures with a :class:`TimeoutError` once their deadline passes.
+
+    Deadlines are rounded up to the next tick of *resolution* seconds, and all the futures of a tick are expired
+    together by a single timer, instead of one timer for each future. Futures leave the wheel as soon as they're
+    done, so the results they hold aren't kept alive until their deadline.
+    """
+
+    RESOLUTION = 0.1
+
+    def __init__(self, resolution: float = RESOLUTION):
+        self.resolution = resolution
+
+        self.slots: Dict[int, Set[asyncio.Future]] = {}
+        self.ticks: List[int] = []
+
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.handle_tick = 0
+
+    def __len__(self) -> int:
+        return sum(len(slot) for slot in self.slots.values())
+
+    def add(self, future: asyncio.Future, timeout: float):
+        if future.done():
+            return
+
+        loop = future.get_loop()
+        tick = math.ceil((loop.time() + timeout) / self.resolution)
+
+        slot = self.slots.get(tick)
+
+        if slot is None:
+            slot = self.slots[tick] = set()
+            heapq.heappush(self.ticks, tick)
+
+        slot.add(future)
+        future.add_done_callback(slot.discard)
+
+        if self.handle is None or tick < self.handle_tick:
+            self.schedule(loop)
+
+    def schedule(self, loop: asyncio.AbstractEventLoop):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+        if self.ticks:
+            self.handle_tick = self.ticks[0]
+            self.handle = loop.call_at(self.handle_tick * self.resolution, self.expire, loop)
+
+    def expire(self, loop: asyncio.AbstractEventLoop):
+        self.handle = None
+        now = loop.time()
+
+        while self.ticks and self.ticks[0] * self.resolution <= now:
+            for future in self.slots.pop(heapq.heappop(self.ticks)):
+                if not future.done():
+                    future.set_exception(TimeoutError("Request timed out"))
+
+        self.schedule(loop)
+
+    def clear(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+        self.slots.clear()
+        self.ticks.clear()
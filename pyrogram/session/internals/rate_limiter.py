@@ -0,0 +1,239 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pyrogram import raw, utils
+from pyrogram.errors import FloodWait
+from pyrogram.raw.core import TLObject
+
+log = logging.getLogger(__name__)
+
+SEND_QUERIES = {
+    query.QUALNAME for query in (
+        raw.functions.messages.SendMessage,
+        raw.functions.messages.SendMedia,
+        raw.functions.messages.SendMultiMedia,
+        raw.functions.messages.ForwardMessages,
+        raw.functions.messages.SendInlineBotResult
+    )
+}
+
+# The send requests share their buckets, the limits are on the messages whichever way they're sent
+SEND_KEY = "send"
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated", "until", "ceiling")
+
+    def __init__(self, rate: float, burst: float, ceiling: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.until = 0.0
+        # The rate the bucket grows back to after a flood wait
+        self.ceiling = ceiling
+
+    @property
+    def learned(self) -> bool:
+        return self.rate < self.ceiling
+
+    def delay(self, now: float) -> float:
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.burst)
+        self.updated = now
+
+        if now < self.until:
+            return self.until - now
+
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets holding requests back before the server makes them wait with a flood wait.
+
+    Buckets limit a kind of request, or a kind of request to a given chat. The known limits are there from the
+    start: messages, whichever method sends them, can go to users about once a second and to groups twenty times a
+    minute, thirty a second in total. The rest are learned from the flood waits: the bucket waits as long as told,
+    and its rate halves (or starts at one request per wait for a new one). It then grows back by :attr:`RECOVERY`
+    with each request, and the bucket is let go once back to where it was.
+
+    The learned limits are what gets stored, see :meth:`learned`.
+    """
+
+    SEND_DEFAULT = (30.0, 30.0)
+    USER_DEFAULT = (1.0, 3.0)
+    GROUP_DEFAULT = (20 / 60, 20.0)
+
+    MIN_RATE = 1 / 60
+    MAX_RATE = 30.0
+    RECOVERY = 1.01
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, int], TokenBucket] = {}
+        # Kinds of request limited by chat, beside the send ones
+        self.peer_queries = {SEND_KEY}
+
+    @staticmethod
+    def peer_id(query: TLObject) -> int:
+        peer = getattr(query, "peer", None) or getattr(query, "to_peer", None) or getattr(query, "channel", None)
+
+        if isinstance(peer, (raw.types.InputPeerUser, raw.types.InputUser)):
+            return peer.user_id
+
+        if isinstance(peer, raw.types.InputPeerChat):
+            return -peer.chat_id
+
+        if isinstance(peer, (raw.types.InputPeerChannel, raw.types.InputChannel)):
+            return utils.MAX_CHANNEL_ID - peer.channel_id
+
+        return 0
+
+    @staticmethod
+    def name(query: TLObject) -> str:
+        return SEND_KEY if query.QUALNAME in SEND_QUERIES else query.QUALNAME
+
+    def keys(self, query: TLObject) -> List[Tuple[str, int]]:
+        name = self.name(query)
+        keys = [(name, 0)]
+
+        if name in self.peer_queries:
+            peer_id = self.peer_id(query)
+
+            if peer_id:
+                keys.append((name, peer_id))
+
+        return keys
+
+    def seed(self, key: Tuple[str, int]) -> Optional[Tuple[float, float]]:
+        if key[0] != SEND_KEY:
+            return None
+
+        return self.USER_DEFAULT if key[1] > 0 else self.GROUP_DEFAULT if key[1] else self.SEND_DEFAULT
+
+    def bucket(self, key: Tuple[str, int]) -> Optional[TokenBucket]:
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            seed = self.seed(key)
+
+            if seed is not None:
+                bucket = self.add(key, TokenBucket(seed[0], seed[1], seed[0]))
+
+        return bucket
+
+    def add(self, key: Tuple[str, int], bucket: TokenBucket) -> TokenBucket:
+        if len(self.buckets) >= self.MAX_BUCKETS:
+            now = time.monotonic()
+
+            # Full buckets which learned nothing are as good as new ones
+            for k, b in list(self.buckets.items()):
+                if not b.learned and b.delay(now) == 0 and b.tokens >= b.burst:
+                    del self.buckets[k]
+
+        self.buckets[key] = bucket
+
+        return bucket
+
+    async def acquire(self, query: TLObject, sleep_threshold: float = -1):
+        """Wait until the request can be sent, and take a token from every bucket it goes through.
+
+        A :class:`~pyrogram.errors.FloodWait` is raised instead of waiting longer than *sleep_threshold* seconds,
+        just like the server's would be. Negative values mean no threshold.
+        """
+        keys = self.keys(query)
+
+        while True:
+            buckets = [(key, bucket) for key in keys if (bucket := self.bucket(key)) is not None]
+
+            if not buckets:
+                return
+
+            now = time.monotonic()
+            delay = max(bucket.delay(now) for _, bucket in buckets)
+
+            if delay <= 0:
+                break
+
+            if delay > sleep_threshold >= 0:
+                raise FloodWait(value=math.ceil(delay), rpc_name=".".join(query.QUALNAME.split(".")[1:]))
+
+            # The requests of other kinds or to other chats go out meanwhile
+            await asyncio.sleep(delay)
+
+        for key, bucket in buckets:
+            bucket.tokens -= 1
+
+            if bucket.learned:
+                bucket.rate = min(bucket.rate * self.RECOVERY, bucket.ceiling)
+
+                if not bucket.learned and self.seed(key) is None:
+                    del self.buckets[key]
+
+    def flood(self, query: TLObject, value: float):
+        """Learn from a flood wait of *value* seconds."""
+        # Waits for a kind of request to a given chat are most likely about that chat only
+        key = (self.name(query), self.peer_id(query))
+
+        if key[1]:
+            self.peer_queries.add(key[0])
+
+        bucket = self.bucket(key)
+
+        if bucket is None:
+            bucket = self.add(key, TokenBucket(max(1 / max(value, 1), self.MIN_RATE), 1.0, self.MAX_RATE))
+        else:
+            bucket.rate = max(bucket.rate / 2, self.MIN_RATE)
+
+        # One request can go out again right after the wait
+        bucket.tokens = 1 - value * bucket.rate
+        bucket.until = time.monotonic() + value
+
+        log.info("Learned a rate of %.3f requests per second for %s (peer %s)", bucket.rate, *key)
+
+    def learned(self) -> List[Tuple[str, int, float, float]]:
+        """Get the limits learned, as (query name, peer id or 0, rate, unix time until which to wait) tuples.
+
+        The send requests share the "send" name.
+        """
+        offset = time.time() - time.monotonic()
+
+        return [
+            (name, peer_id, bucket.rate, bucket.until + offset if bucket.until else 0.0)
+            for (name, peer_id), bucket in self.buckets.items()
+            if bucket.learned
+        ]
+
+    def load(self, learned: List[Tuple[str, int, float, float]]):
+        offset = time.time() - time.monotonic()
+
+        for name, peer_id, rate, until in learned:
+            seed = self.seed((name, peer_id))
+            burst, ceiling = (seed[1], seed[0]) if seed else (1.0, self.MAX_RATE)
+
+            bucket = self.add((name, peer_id), TokenBucket(rate, burst, ceiling))
+            bucket.tokens = 0.0
+            bucket.until = until - offset if until else 0.0
+
+            if peer_id:
+                self.peer_queries.add(name)
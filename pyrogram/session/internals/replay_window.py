@@ -0,0 +1,59 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+from typing import List, Optional, Set
+
+
+class ReplayWindow:
+    """The msg_ids received lately, to tell apart the messages replayed.
+
+    Once more than *size* are stored, the oldest half is forgotten. Lookups take constant time, additions
+    logarithmic time (amortized, forgetting included).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.ids: Set[int] = set()
+        self.heap: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, msg_id: int) -> bool:
+        return msg_id in self.ids
+
+    @property
+    def floor(self) -> Optional[int]:
+        """The lowest msg_id stored, anything below is too old to be told apart from a replay."""
+        return self.heap[0] if self.heap else None
+
+    def add(self, msg_id: int):
+        if msg_id in self.ids:
+            return
+
+        self.ids.add(msg_id)
+        heapq.heappush(self.heap, msg_id)
+
+        if len(self.heap) > self.size:
+            for _ in range(self.size // 2):
+                self.ids.discard(heapq.heappop(self.heap))
+
+    def clear(self):
+        self.ids.clear()
+        self.heap.clear()
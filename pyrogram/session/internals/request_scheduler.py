@@ -0,0 +1,172 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from pyrogram import raw
+from pyrogram.enums import RequestPriority
+from pyrogram.raw.core import TLObject
+
+log = logging.getLogger(__name__)
+
+INTERACTIVE_QUERIES = {
+    raw.functions.messages.SetBotCallbackAnswer,
+    raw.functions.messages.SetInlineBotResults,
+    raw.functions.messages.SetBotPrecheckoutResults,
+    raw.functions.messages.SetBotShippingResults,
+    raw.functions.messages.SendWebViewResultMessage,
+    raw.functions.messages.SetTyping,
+    raw.functions.bots.AnswerWebhookJSONQuery
+}
+
+BULK_QUERIES = {
+    raw.functions.upload.SaveFilePart,
+    raw.functions.upload.SaveBigFilePart,
+    raw.functions.upload.GetFile,
+    raw.functions.upload.GetWebFile,
+    raw.functions.upload.GetCdnFile,
+    raw.functions.upload.GetCdnFileHashes,
+    raw.functions.upload.GetFileHashes,
+    raw.functions.messages.GetHistory,
+    raw.functions.messages.GetReplies,
+    raw.functions.messages.GetSavedHistory,
+    raw.functions.messages.GetDialogs,
+    raw.functions.messages.GetSavedDialogs,
+    raw.functions.messages.Search,
+    raw.functions.messages.SearchGlobal,
+    raw.functions.messages.GetChatInviteImporters,
+    raw.functions.messages.GetExportedChatInvites,
+    raw.functions.channels.GetParticipants,
+    raw.functions.contacts.GetContacts,
+    raw.functions.photos.GetUserPhotos,
+    raw.functions.stories.GetPinnedStories
+}
+
+
+class RequestScheduler:
+    """Let out the requests of a session a *window* at a time, by priority.
+
+    The requests waiting for their turn are taken in turns from each priority, in proportion to its weight
+    (smooth weighted round-robin), and in order within the same priority.
+
+    The window halves each time the server complains about a transport flood, then grows back by about one
+    request every window's worth of requests completed.
+    """
+
+    WEIGHTS = {
+        RequestPriority.INTERACTIVE: 16,
+        RequestPriority.NORMAL: 4,
+        RequestPriority.BULK: 1
+    }
+
+    def __init__(self, window: int):
+        self.window = window
+        self.limit = float(window)
+        self.in_flight = 0
+
+        self.queues: Dict[RequestPriority, Deque[asyncio.Future]] = {p: deque() for p in RequestPriority}
+        self.current: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+
+    @staticmethod
+    def priority(query: TLObject) -> RequestPriority:
+        if type(query) in INTERACTIVE_QUERIES:
+            return RequestPriority.INTERACTIVE
+
+        if type(query) in BULK_QUERIES:
+            return RequestPriority.BULK
+
+        return RequestPriority.NORMAL
+
+    @property
+    def full(self) -> bool:
+        return self.in_flight >= max(int(self.limit), 1)
+
+    async def acquire(self, priority: RequestPriority):
+        if not self.full and not any(self.queues.values()):
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.queues[priority].append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled right after its turn came: pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+
+            raise
+
+    def release(self, completed: bool = True):
+        self.in_flight -= 1
+
+        if completed and self.limit < self.window:
+            self.limit = min(self.limit + 1 / self.limit, self.window)
+
+        self.wake()
+
+    def flood(self):
+        self.limit = max(self.limit / 2, 1)
+        log.warning("Transport flood, letting out %s requests at once", int(self.limit))
+
+    def pick(self) -> Optional[RequestPriority]:
+        ready = []
+
+        for priority, queue in self.queues.items():
+            while queue and queue[0].done():
+                queue.popleft()
+
+            if queue:
+                ready.append(priority)
+
+            else:
+                # Credit doesn't build up while there's nothing to send
+                self.current[priority] = 0
+
+        if not ready:
+            return None
+
+        for priority in ready:
+            self.current[priority] += self.WEIGHTS[priority]
+
+        best = max(ready, key=self.current.__getitem__)
+        self.current[best] -= sum(self.WEIGHTS[p] for p in ready)
+
+        return best
+
+    def wake(self):
+        while not self.full:
+            priority = self.pick()
+
+            if priority is None:
+                break
+
+            self.in_flight += 1
+            self.queues[priority].popleft().set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of requests in flight, the window currently allowed and the requests waiting by priority."""
+        return {
+            "in_flight": self.in_flight,
+            "window": max(int(self.limit), 1),
+            **{p.value: sum(not f.done() for f in q) for p, q in self.queues.items()}
+        }
@@ -0,0 +1,230 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+import pyrogram
+from pyrogram import raw
+from pyrogram.errors import AuthBytesInvalid
+from .auth import Auth
+from .session import Session
+
+log = logging.getLogger(__name__)
+
+
+class MediaSessions:
+    """The sessions transferring files with the data centers, the main one's included, and with the CDNs.
+
+    Sessions are opened on demand and stopped once they've been idle for *idle_timeout* seconds, or when more than
+    *max_sessions* are open, starting from the least recently used one. Sessions in use are never stopped.
+
+    The auth keys outlive their sessions: the authorization imported with a key stays valid, so opening a session
+    with the same data center again only costs a connection.
+    """
+
+    IDLE_TIMEOUT = 300
+    MAX_SESSIONS = 5
+
+    def __init__(
+        self,
+        client: "pyrogram.Client",
+        idle_timeout: float = IDLE_TIMEOUT,
+        max_sessions: int = MAX_SESSIONS
+    ):
+        self.client = client
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+
+        # Keyed by (dc_id, is_cdn), from the least to the most recently used
+        self.sessions: "OrderedDict[Tuple[int, bool], Session]" = OrderedDict()
+        self.last_used: Dict[Tuple[int, bool], float] = {}
+        self.users: Dict[Tuple[int, bool], int] = {}
+        self.locks: Dict[Tuple[int, bool], asyncio.Lock] = {}
+
+        self.auth_keys: Dict[Tuple[int, bool], bytes] = {}
+        # Data centers whose auth key carries an imported authorization
+        self.authorized: Set[int] = set()
+
+        self.reaper_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, key: Tuple[int, bool]) -> bool:
+        return key in self.sessions
+
+    @asynccontextmanager
+    async def get(self, dc_id: int, cdn: bool = False) -> AsyncIterator[Session]:
+        """Get the session with a data center, opening it if needed, and keep it open until the block is left."""
+        session = await self.acquire(dc_id, cdn)
+
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    async def acquire(self, dc_id: int, cdn: bool = False) -> Session:
+        """Get the session with a data center and keep it open until :meth:`release` is called."""
+        key = (dc_id, cdn)
+
+        async with self.locks.setdefault(key, asyncio.Lock()):
+            session = self.sessions.get(key)
+
+            if session is None:
+                session = await self.open(dc_id, cdn)
+                self.sessions[key] = session
+
+            self.sessions.move_to_end(key)
+            self.users[key] = self.users.get(key, 0) + 1
+
+        await self.evict()
+
+        if self.reaper_task is None and self.idle_timeout:
+            self.reaper_task = asyncio.get_running_loop().create_task(self.reaper())
+
+        return session
+
+    def release(self, session: Session):
+        key = (session.dc_id, session.is_cdn)
+
+        if self.sessions.get(key) is not session:
+            return
+
+        self.users[key] -= 1
+        self.last_used[key] = asyncio.get_running_loop().time()
+
+    async def open(self, dc_id: int, cdn: bool) -> Session:
+        key = (dc_id, cdn)
+        test_mode = await self.client.storage.test_mode()
+        is_home = not cdn and dc_id == await self.client.storage.dc_id()
+
+        if is_home:
+            auth_key = await self.client.storage.auth_key()
+        else:
+            auth_key = self.auth_keys.get(key)
+
+            if auth_key is None:
+                auth_key = self.auth_keys[key] = await Auth(self.client, dc_id, test_mode).create()
+
+        session = Session(self.client, dc_id, auth_key, test_mode, is_media=True, is_cdn=cdn)
+        await session.start()
+
+        if is_home or cdn or dc_id in self.authorized:
+            return session
+
+        try:
+            for _ in range(3):
+                exported_auth = await self.client.invoke(
+                    raw.functions.auth.ExportAuthorization(
+                        dc_id=dc_id
+                    )
+                )
+
+                try:
+                    await session.invoke(
+                        raw.functions.auth.ImportAuthorization(
+                            id=exported_auth.id,
+                            bytes=exported_auth.bytes
+                        )
+                    )
+                except AuthBytesInvalid:
+                    continue
+                else:
+                    break
+            else:
+                raise AuthBytesInvalid
+        except BaseException:
+            # Start over with a new auth key next time
+            self.auth_keys.pop(key, None)
+            await session.stop()
+            raise
+
+        self.authorized.add(dc_id)
+
+        return session
+
+    def is_idle(self, key: Tuple[int, bool]) -> bool:
+        return not self.users.get(key) and not self.sessions[key].results
+
+    async def close(self, key: Tuple[int, bool]):
+        session = self.sessions.pop(key)
+        self.last_used.pop(key, None)
+        self.users.pop(key, None)
+
+        await session.stop()
+
+    async def evict(self):
+        if not self.max_sessions:
+            return
+
+        excess = len(self.sessions) - self.max_sessions
+
+        if excess <= 0:
+            return
+
+        # Least recently used first, the sessions in use are let be even if that means going over the limit
+        for key in [k for k in self.sessions if self.is_idle(k)][:excess]:
+            log.debug("Closing the media session with DC%s, too many are open", key[0])
+            await self.close(key)
+
+    async def reaper(self):
+        loop = asyncio.get_running_loop()
+
+        try:
+            while self.sessions:
+                now = loop.time()
+                wake_up = now + self.idle_timeout
+
+                for key in list(self.sessions):
+                    if key not in self.sessions or not self.is_idle(key):
+                        continue
+
+                    expires = self.last_used.get(key, now) + self.idle_timeout
+
+                    if expires <= now:
+                        log.debug("Closing the media session with DC%s, idle for %ss", key[0], self.idle_timeout)
+                        await self.close(key)
+                    else:
+                        wake_up = min(wake_up, expires)
+
+                await asyncio.sleep(max(wake_up - loop.time(), 0))
+        finally:
+            if self.reaper_task is asyncio.current_task():
+                self.reaper_task = None
+
+    async def stop(self):
+        """Stop all the sessions and forget the auth keys, which belong to the authorization being terminated."""
+        if self.reaper_task is not None:
+            self.reaper_task.cancel()
+
+            try:
+                await self.reaper_task
+            except asyncio.CancelledError:
+                pass
+
+            self.reaper_task = None
+
+        for key in list(self.sessions):
+            await self.close(key)
+
+        self.auth_keys.clear()
+        self.authorized.clear()
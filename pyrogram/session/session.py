@@ -17,18 +17,19 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import bisect
 import logging
 import os
+import time
 from datetime import datetime, timedelta
 from enum import Enum, auto
-from hashlib import sha1
 from io import BytesIO
-from typing import Optional
+from typing import Dict, Optional, List, Tuple
 
 import pyrogram
 from pyrogram import raw
+from pyrogram.enums import RequestPriority
 from pyrogram.connection import Connection
+from pyrogram.connection.transport import TCP
 from pyrogram.crypto import mtproto
 from pyrogram.errors import (
     RPCError, InternalServerError, AuthKeyDuplicated, FloodWait, FloodPremiumWait, ServiceUnavailable,
@@ -36,8 +37,8 @@ from pyrogram.errors import (
     SecurityCheckMismatch, Unauthorized
 )
 from pyrogram.raw.all import layer
-from pyrogram.raw.core import TLObject, MsgContainer, Int, FutureSalts
-from .internals import MsgId, MsgFactory
+from pyrogram.raw.core import TLObject, Message, MsgContainer, Int, FutureSalts
+from .internals import MsgId, MsgFactory, DataCenter, DeadlineWheel, ReplayWindow, RequestScheduler
 
 log = logging.getLogger(__name__)
 
@@ -49,12 +50,6 @@ class SessionState(Enum):
     STOPPED = auto()
 
 
-class Result:
-    def __init__(self):
-        self.value = None
-        self.event = asyncio.Event()
-
-
 class Session:
     START_TIMEOUT = 2
     WAIT_TIMEOUT = 15
@@ -62,9 +57,22 @@ class Session:
     MAX_RETRIES = 10
     ACKS_THRESHOLD = 10
     PING_INTERVAL = 5
+    MEDIA_PING_INTERVAL = 30
+    # Even with traffic flowing, a ping goes out at least every this many intervals
+    PING_SKIP_LIMIT = 4
     STORED_MSG_IDS_MAX_SIZE = 1000 * 2
+    # Packets received and being decrypted or handled, past which the socket isn't read from
+    MAX_PENDING_PACKETS = 64
+    # Requests waiting for a response at once, past which they wait for their turn by priority
+    MAX_REQUESTS_IN_FLIGHT = 100
     RECONNECT_THRESHOLD = timedelta(seconds=10)
 
+    # Outgoing messages issued within this window are packed together in a single MsgContainer
+    SEND_BATCH_DELAY = 0.001
+    # https://core.telegram.org/mtproto/service_messages#simple-container
+    MAX_CONTAINER_SIZE = 1020
+    MAX_CONTAINER_LENGTH = 1024 * 1024 // 2
+
     TRANSPORT_ERRORS = {
         404: "auth key not found",
         429: "transport flood",
@@ -83,14 +91,15 @@ class Session:
         self.last_reconnect_attempt = None
         self.client = client
         self.dc_id = dc_id
-        self.auth_key = auth_key
+        self.auth_key = mtproto.AuthKey(auth_key)
         self.test_mode = test_mode
         self.is_media = is_media
         self.is_cdn = is_cdn
 
         self.connection: Optional[Connection] = None
 
-        self.auth_key_id = sha1(auth_key).digest()[-8:]
+        self.auth_key_id = self.auth_key.id
+        self.crypto_scheduler = client.get_crypto_scheduler(dc_id)
 
         self.session_id = os.urandom(8)
         self.msg_factory = MsgFactory()
@@ -99,14 +108,30 @@ class Session:
 
         self.pending_acks = set()
 
-        self.results = {}
+        # Futures of the requests waiting for a response, failed by the wheel once their timeout passes
+        self.results: Dict[int, asyncio.Future] = {}
+        self.deadlines = DeadlineWheel()
+        self.scheduler = RequestScheduler(client.max_requests_in_flight)
+
+        self.send_queue: List[Tuple[Message, asyncio.Future]] = []
+        self.send_queue_length = 0
+        self.send_queue_handle = None
+        self.send_lock = asyncio.Lock()
+        self.containers = {}
 
-        self.stored_msg_ids = []
+        self.stored_msg_ids = ReplayWindow(self.STORED_MSG_IDS_MAX_SIZE)
 
         self.ping_task = None
         self.ping_task_event = asyncio.Event()
+        self.ping_interval = client.media_ping_interval if is_media else client.ping_interval
+
+        # When the help.GetConfig result stored expires, 0 until there's one
+        self.config_expires = 0
+        self.config_task = None
 
         self.recv_task = None
+        self.process_task = None
+        self.packets: Optional[asyncio.Queue] = None
 
         self.is_started = asyncio.Event()
 
@@ -181,21 +206,25 @@ class Session:
             ipv6=self.client.ipv6,
             proxy=self.client.proxy,
             media=self.is_media,
-            protocol_factory=self.client.protocol_factory
+            protocol_factory=self.client.protocol_factory,
+            crypto_scheduler=self.crypto_scheduler
         )
 
         try:
             await self.connection.connect()
 
+            self.packets = asyncio.Queue(self.MAX_PENDING_PACKETS)
             self.recv_task = loop.create_task(self.recv_worker())
+            self.process_task = loop.create_task(self.process_worker())
 
-            if hasattr(self.recv_task, "_log_destroy_pending"):
-                self.recv_task._log_destroy_pending = False
+            for task in (self.recv_task, self.process_task):
+                if hasattr(task, "_log_destroy_pending"):
+                    task._log_destroy_pending = False
 
             await self.send(raw.functions.Ping(ping_id=0), timeout=self.START_TIMEOUT)
 
             if not self.is_cdn:
-                await self.send(
+                config = await self.send(
                     raw.functions.InvokeWithLayer(
                         layer=layer,
                         query=raw.functions.InitConnection(
@@ -212,6 +241,9 @@ class Session:
                     timeout=self.START_TIMEOUT
                 )
 
+                if isinstance(config, raw.types.Config):
+                    await self.update_config(config)
+
             self.ping_task = loop.create_task(self.ping_worker())
 
             if hasattr(self.ping_task, "_log_destroy_pending"):
@@ -248,6 +280,8 @@ class Session:
 
         self.stored_msg_ids.clear()
 
+        self._cancel_send_queue()
+
         self.ping_task_event.set()
 
         if self.ping_task is not None:
@@ -259,18 +293,45 @@ class Session:
 
         self.ping_task_event.clear()
 
+        # A refresh waits for its answer, which isn't worth holding the stop for
+        if self.config_task is not None:
+            self.config_task.cancel()
+
+            try:
+                await self.config_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                log.warning("Error awaiting config task: %s", e)
+            self.config_task = None
+
         if self.connection is not None:
             try:
                 await self.connection.close()
             except Exception as e:
                 log.warning("Error closing connection: %s", e)
 
-        if self.recv_task:
-            try:
-                await self.recv_task
-            except Exception as e:
-                log.warning("Error awaiting recv task: %s", e)
-            self.recv_task = None
+        # The receiving end may be waiting for room in the queue of packets, which won't be handled anymore
+        for task in (self.recv_task, self.process_task):
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    log.warning("Error awaiting network task: %s", e)
+
+        self.recv_task = None
+        self.process_task = None
+
+        # Nothing will answer the requests still waiting, they're retried once the session is back
+        for future in self.results.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Session stopped"))
+
+        self.deadlines.clear()
 
         await self._set_state(SessionState.STOPPED)
 
@@ -284,6 +345,21 @@ class Session:
 
         self.loop = None
 
+    async def update_config(self, config: "raw.types.Config"):
+        # Later connections can race every address the data centers are reachable at
+        dc_options = [
+            (o.id, o.ip_address, o.port, bool(o.ipv6), bool(o.media_only), bool(o.cdn), bool(o.tcpo_only))
+            for o in config.dc_options
+        ]
+
+        DataCenter.update(dc_options, self.test_mode)
+
+        # The main session keeps it for the next startups, and refreshes it when it expires
+        if not self.is_media:
+            self.config_expires = config.expires
+
+            await self.client.storage.dc_options(dc_options)
+
     async def restart(self):
         async with self.restart_lock:
             now = datetime.now()
@@ -297,18 +373,22 @@ class Session:
             await self.stop()
             await self.start()
 
-    async def handle_packet(self, packet):
+    def unpack(self, packet: bytes) -> asyncio.Future:
+        # Big packets are decrypted in parallel while the ones before them are being handled
+        return self.crypto_scheduler.submit(
+            len(packet),
+            mtproto.unpack,
+            packet,
+            self.session_id,
+            self.auth_key,
+            self.auth_key_id,
+            self.client.dispatcher.update_ids,
+            self.client.lazy_decoding
+        )
+
+    async def handle_packet(self, unpacked: asyncio.Future):
         try:
-            loop = self.loop or asyncio.get_running_loop()
-
-            data = await loop.run_in_executor(
-                pyrogram.crypto_executor,
-                mtproto.unpack,
-                BytesIO(packet),
-                self.session_id,
-                self.auth_key,
-                self.auth_key_id
-            )
+            data = await unpacked
         except ValueError as e:
             log.debug(e)
             self._schedule_restart()
@@ -330,11 +410,8 @@ class Session:
                     self.pending_acks.add(msg.msg_id)
 
             try:
-                if len(self.stored_msg_ids) > Session.STORED_MSG_IDS_MAX_SIZE:
-                    del self.stored_msg_ids[:Session.STORED_MSG_IDS_MAX_SIZE // 2]
-
                 if self.stored_msg_ids:
-                    if msg.msg_id < self.stored_msg_ids[0]:
+                    if msg.msg_id < self.stored_msg_ids.floor:
                         raise SecurityCheckMismatch("The msg_id is lower than all the stored values")
 
                     if msg.msg_id in self.stored_msg_ids:
@@ -354,7 +431,7 @@ class Session:
                 await self.connection.close()
                 return
             else:
-                bisect.insort(self.stored_msg_ids, msg.msg_id)
+                self.stored_msg_ids.add(msg.msg_id)
 
             if isinstance(msg.body, (raw.types.MsgDetailedInfo, raw.types.MsgNewDetailedInfo)):
                 self.pending_acks.add(msg.body.answer_msg_id)
@@ -373,37 +450,67 @@ class Session:
                 msg_id = msg.body.msg_id
             else:
                 if self.client is not None:
-                    self._create_task(self.client.handle_updates(msg.body))
+                    # Holds the next packets back while too many updates wait to be handled
+                    await self.client.put_updates(msg.body)
 
-            if msg_id in self.results:
-                self.results[msg_id].value = getattr(msg.body, "result", msg.body)
-                self.results[msg_id].event.set()
+            # Service notifications about a container refer to all the messages packed inside it
+            for msg_id in self.containers.pop(msg_id, (msg_id,)):
+                future = self.results.get(msg_id)
+
+                if future is not None and not future.done():
+                    future.set_result(getattr(msg.body, "result", msg.body))
 
         if len(self.pending_acks) >= self.ACKS_THRESHOLD:
             log.debug("Sending %s acks", len(self.pending_acks))
 
-            try:
-                await self.send(raw.types.MsgsAck(msg_ids=list(self.pending_acks)), False)
-            except OSError:
-                pass
-            else:
-                self.pending_acks.clear()
+            msg_ids = list(self.pending_acks)
+            self.pending_acks.clear()
+
+            def sent(future: asyncio.Future):
+                # Not waited for, the next packets are handled meanwhile. Acks which didn't go out are sent again later
+                if not future.cancelled() and future.exception() is not None:
+                    self.pending_acks.update(msg_ids)
+
+            self._queue(self.msg_factory(raw.types.MsgsAck(msg_ids=msg_ids))).add_done_callback(sent)
 
     async def ping_worker(self):
         log.info("PingTask started")
 
+        loop = asyncio.get_running_loop()
+        interval = self.ping_interval
+        last_ping = loop.time()
+
+        def next_ping() -> float:
+            # Anything received proves the connection alive, pings are only needed once it's been quiet
+            # for a whole interval. The server still drops connections which stop pinging, hence the limit.
+            return min(
+                max(self.connection.last_received, last_ping) + interval,
+                last_ping + interval * self.PING_SKIP_LIMIT
+            )
+
         while True:
             try:
-                await asyncio.wait_for(self.ping_task_event.wait(), self.PING_INTERVAL)
+                await asyncio.wait_for(self.ping_task_event.wait(), max(next_ping() - loop.time(), 0))
             except asyncio.TimeoutError:
                 pass
             else:
                 break
 
+            if (
+                self.config_expires and time.time() >= self.config_expires
+                and (self.config_task is None or self.config_task.done())
+            ):
+                self.config_task = loop.create_task(self.config_worker())
+
+            if loop.time() < next_ping():
+                continue
+
+            last_ping = loop.time()
+
             try:
                 await self.send(
                     raw.functions.PingDelayDisconnect(
-                        ping_id=0, disconnect_delay=self.WAIT_TIMEOUT + 10
+                        ping_id=0, disconnect_delay=int(interval * self.PING_SKIP_LIMIT) + self.WAIT_TIMEOUT
                     ), False
                 )
             except OSError:
@@ -414,16 +521,26 @@ class Session:
 
         log.info("PingTask stopped")
 
+    async def config_worker(self):
+        try:
+            await self.update_config(await self.send(raw.functions.help.GetConfig()))
+        except (OSError, RPCError, TimeoutError) as e:
+            log.info("Unable to refresh the config: %s %s", type(e).__name__, e)
+
     async def recv_worker(self):
         log.info("NetworkTask started")
 
         while True:
-            packet = await self.connection.recv()
+            # Pongs come back within an interval at most, on an idle connection
+            packet = await self.connection.recv(max(self.ping_interval * 2, TCP.TIMEOUT))
 
             if packet is None or len(packet) == 4:
                 if packet:
                     error_code = -Int.read(BytesIO(packet))
 
+                    if error_code == 429:
+                        self.scheduler.flood()
+
                     if error_code == 404:
                         raise Unauthorized(
                             "Auth key not found in the system. You must delete your session file "
@@ -440,33 +557,133 @@ class Session:
 
                 break
 
-            self._create_task(self.handle_packet(packet))
+            # Waits for room when the packets come faster than they're handled, which stops reading from the socket
+            await self.packets.put(self.unpack(packet))
 
         log.info("NetworkTask stopped")
 
+    async def process_worker(self):
+        # Packets are handled one at a time, in the order they were received
+        while True:
+            unpacked = await self.packets.get()
+
+            try:
+                await self.handle_packet(unpacked)
+            except Exception as e:
+                log.exception(e)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of packets waiting at each stage: received and not read yet (``frames``), being decrypted
+        or waiting to be handled (``packets``)."""
+        return {
+            "frames": self.connection.pending if self.connection is not None else 0,
+            "packets": self.packets.qsize() if self.packets is not None else 0
+        }
+
+    def _cancel_send_queue(self):
+        if self.send_queue_handle is not None:
+            self.send_queue_handle.cancel()
+            self.send_queue_handle = None
+
+        for _, future in self.send_queue:
+            if not future.done():
+                future.set_exception(ConnectionError("Session stopped"))
+
+        self.send_queue.clear()
+        self.send_queue_length = 0
+        self.containers.clear()
+
+    def _flush_send_queue(self):
+        if self.send_queue_handle is not None:
+            self.send_queue_handle.cancel()
+            self.send_queue_handle = None
+
+        if not self.send_queue:
+            return
+
+        batch = self.send_queue
+        self.send_queue = []
+        self.send_queue_length = 0
+
+        self._create_task(self._send_batch(batch))
+
+    async def _send_batch(self, batch: List[Tuple[Message, asyncio.Future]]):
+        # The lock keeps batches on the wire in the same order their messages were created
+        async with self.send_lock:
+            if len(batch) == 1:
+                message = batch[0][0]
+            else:
+                message = self.msg_factory(MsgContainer([m for m, _ in batch]))
+                msg_ids = tuple(m.msg_id for m, _ in batch)
+
+                if any(i in self.results for i in msg_ids):
+                    self.containers[message.msg_id] = msg_ids
+
+            try:
+                payload = await self.crypto_scheduler.run(
+                    message.length,
+                    mtproto.pack,
+                    message,
+                    self.salt,
+                    self.session_id,
+                    self.auth_key,
+                    self.auth_key_id
+                )
+
+                await self.connection.send(payload)
+            except Exception as e:
+                self.containers.pop(message.msg_id, None)
+
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e if isinstance(e, OSError) else OSError(e))
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(message.msg_id)
+
+    def _release_container(self, container_id: int):
+        msg_ids = self.containers.get(container_id)
+
+        if msg_ids is not None and not any(i in self.results for i in msg_ids):
+            del self.containers[container_id]
+
+    def _queue(self, message: Message) -> asyncio.Future:
+        loop = self._get_loop()
+        future = loop.create_future()
+        length = message.length + 16  # msg_id (8) + seq_no (4) + length (4)
+
+        if self.send_queue and self.send_queue_length + length > self.MAX_CONTAINER_LENGTH:
+            self._flush_send_queue()
+
+        self.send_queue.append((message, future))
+        self.send_queue_length += length
+
+        if (
+            len(self.send_queue) >= self.MAX_CONTAINER_SIZE
+            or self.send_queue_length >= self.MAX_CONTAINER_LENGTH
+        ):
+            self._flush_send_queue()
+        elif self.send_queue_handle is None:
+            self.send_queue_handle = loop.call_later(self.SEND_BATCH_DELAY, self._flush_send_queue)
+
+        # Resolves to the msg_id of the message actually written, which is the container's when batched
+        return future
+
+    async def _enqueue(self, message: Message) -> int:
+        return await self._queue(message)
+
     async def send(self, data: TLObject, wait_response: bool = True, timeout: float = WAIT_TIMEOUT):
         message = self.msg_factory(data)
         msg_id = message.msg_id
 
         if wait_response:
-            self.results[msg_id] = Result()
+            self.results[msg_id] = self._get_loop().create_future()
 
         log.debug("Sent: %s", message)
 
-        loop = self.loop or asyncio.get_running_loop()
-
-        payload = await loop.run_in_executor(
-            pyrogram.crypto_executor,
-            mtproto.pack,
-            message,
-            self.salt,
-            self.session_id,
-            self.auth_key,
-            self.auth_key_id
-        )
-
         try:
-            await self.connection.send(payload)
+            container_id = await self._enqueue(message)
         except OSError as e:
             self.results.pop(msg_id, None)
             if self.is_started.is_set():
@@ -474,15 +691,14 @@ class Session:
             raise e
 
         if wait_response:
-            try:
-                await asyncio.wait_for(self.results[msg_id].event.wait(), timeout)
-            except asyncio.TimeoutError:
-                pass
-
-            result = self.results.pop(msg_id).value
+            future = self.results[msg_id]
+            self.deadlines.add(future, timeout)
 
-            if result is None:
-                raise TimeoutError("Request timed out")
+            try:
+                result = await future
+            finally:
+                self.results.pop(msg_id, None)
+                self._release_container(container_id)
 
             if isinstance(result, raw.types.RpcError):
                 if isinstance(data, (raw.functions.InvokeWithoutUpdates, raw.functions.InvokeWithTakeout)):
@@ -499,17 +715,32 @@ class Session:
 
             return result
 
+    async def send_scheduled(self, query: TLObject, timeout: float, priority: RequestPriority):
+        await self.scheduler.acquire(priority)
+        failed = False
+
+        try:
+            return await self.send(query, timeout=timeout)
+        except OSError:
+            failed = True
+            raise
+        finally:
+            # Only the requests answered let the window grow back after a flood
+            self.scheduler.release(not failed)
+
     async def invoke(
         self,
         query: TLObject,
         retries: int = MAX_RETRIES,
         timeout: float = WAIT_TIMEOUT,
-        sleep_threshold: float = SLEEP_THRESHOLD
+        sleep_threshold: float = SLEEP_THRESHOLD,
+        priority: Optional[RequestPriority] = None
     ):
-        try:
-            await asyncio.wait_for(self.is_started.wait(), self.WAIT_TIMEOUT)
-        except asyncio.TimeoutError:
-            pass
+        if not self.is_started.is_set():
+            try:
+                await asyncio.wait_for(self.is_started.wait(), self.WAIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
 
         if isinstance(query, (raw.functions.InvokeWithoutUpdates, raw.functions.InvokeWithTakeout)):
             inner_query = query.query
@@ -517,20 +748,27 @@ class Session:
             inner_query = query
 
         query_name = ".".join(inner_query.QUALNAME.split(".")[1:])
+        priority = priority or self.scheduler.priority(inner_query)
 
         while retries > 0:
+            # Held back if the server is known to make requests like this one wait. The waits raised here are the
+            # client's own, only the server's are learned from below
+            await self.client.rate_limiter.acquire(inner_query, sleep_threshold)
+
             try:
-                return await self.send(query, timeout=timeout)
+                return await self.send_scheduled(query, timeout, priority)
             except (FloodWait, FloodPremiumWait) as e:
                 amount = e.value
 
+                self.client.rate_limiter.flood(inner_query, amount)
+                await self.client.storage.rate_limits(self.client.rate_limiter.learned())
+
                 if amount > sleep_threshold >= 0:
                     raise
 
+                # The rate limiter waits before the request is sent again
                 log.warning('[%s] Waiting for %s seconds before continuing (required by "%s")',
                             self.client.name, amount, query_name)
-
-                await asyncio.sleep(amount)
             except (OSError, InternalServerError, ServiceUnavailable) as e:
                 retries -= 1
                 if retries == 0:
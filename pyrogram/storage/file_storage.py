@@ -38,6 +38,32 @@ CREATE TABLE update_state
 """
 
 
+DC_OPTIONS_SCHEMA = """
+CREATE TABLE dc_options
+(
+    id         INTEGER,
+    ip_address TEXT,
+    port       INTEGER,
+    ipv6       INTEGER,
+    media_only INTEGER,
+    cdn        INTEGER,
+    tcpo_only  INTEGER
+);
+"""
+
+
+RATE_LIMITS_SCHEMA = """
+CREATE TABLE rate_limits
+(
+    query   TEXT,
+    peer_id INTEGER,
+    rate    REAL,
+    until   REAL,
+    PRIMARY KEY (query, peer_id)
+);
+"""
+
+
 class FileStorage(SQLiteStorage):
     FILE_EXTENSION = ".session"
 
@@ -67,6 +93,18 @@ class FileStorage(SQLiteStorage):
 
             version += 1
 
+        if version == 4:
+            with self.conn:
+                self.conn.executescript(DC_OPTIONS_SCHEMA)
+
+            version += 1
+
+        if version == 5:
+            with self.conn:
+                self.conn.executescript(RATE_LIMITS_SCHEMA)
+
+            version += 1
+
         self.version(version)
 
     async def open(self):
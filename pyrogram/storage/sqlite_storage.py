@@ -57,6 +57,26 @@ CREATE TABLE update_state
     seq  INTEGER
 );
 
+CREATE TABLE dc_options
+(
+    id         INTEGER,
+    ip_address TEXT,
+    port       INTEGER,
+    ipv6       INTEGER,
+    media_only INTEGER,
+    cdn        INTEGER,
+    tcpo_only  INTEGER
+);
+
+CREATE TABLE rate_limits
+(
+    query   TEXT,
+    peer_id INTEGER,
+    rate    REAL,
+    until   REAL,
+    PRIMARY KEY (query, peer_id)
+);
+
 CREATE TABLE version
 (
     number INTEGER PRIMARY KEY
@@ -99,7 +119,7 @@ def get_input_peer(peer_id: int, access_hash: int, peer_type: str):
 
 
 class SQLiteStorage(Storage):
-    VERSION = 4
+    VERSION = 6
     USERNAME_TTL = 8 * 60 * 60
 
     def __init__(self, name: str):
@@ -159,6 +179,43 @@ class SQLiteStorage(Storage):
                     value
                 )
 
+    async def dc_options(self, value: List[Tuple[int, str, int, bool, bool, bool, bool]] = object):
+        if value == object:
+            return [
+                (i, ip_address, port, bool(ipv6), bool(media_only), bool(cdn), bool(tcpo_only))
+                for i, ip_address, port, ipv6, media_only, cdn, tcpo_only in self.conn.execute(
+                    "SELECT id, ip_address, port, ipv6, media_only, cdn, tcpo_only FROM dc_options"
+                )
+            ]
+        else:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM dc_options"
+                )
+
+                self.conn.executemany(
+                    "INSERT INTO dc_options (id, ip_address, port, ipv6, media_only, cdn, tcpo_only)"
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    value
+                )
+
+    async def rate_limits(self, value: List[Tuple[str, int, float, float]] = object):
+        if value == object:
+            return self.conn.execute(
+                "SELECT query, peer_id, rate, until FROM rate_limits"
+            ).fetchall()
+        else:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM rate_limits"
+                )
+
+                self.conn.executemany(
+                    "INSERT INTO rate_limits (query, peer_id, rate, until)"
+                    "VALUES (?, ?, ?, ?)",
+                    value
+                )
+
     async def get_peer_by_id(self, peer_id: int):
         r = self.conn.execute(
             "SELECT id, access_hash, type FROM peers WHERE id = ?",
@@ -61,6 +61,41 @@ class Storage:
         """
         raise NotImplementedError
 
+    async def dc_options(self, value: List[Tuple[int, str, int, bool, bool, bool, bool]] = object):
+        """Get or set the data center options, as given by the last help.GetConfig.
+
+        Parameters:
+            value (``List[Tuple[int, str, int, bool, bool, bool, bool]]``): A list of tuples to set.
+                Each tuple must contain the following information:
+                - ``int``: The data center id.
+                - ``str``: The ip address.
+                - ``int``: The port.
+                - ``bool``: Whether the address is IPv6.
+                - ``bool``: Whether the address is for media only.
+                - ``bool``: Whether the address is a CDN.
+                - ``bool``: Whether the address only accepts obfuscated connections.
+
+        Storages which don't keep them get none back, the built-in options are used then.
+        """
+        if value is object:
+            return []
+
+    async def rate_limits(self, value: List[Tuple[str, int, float, float]] = object):
+        """Get or set the request rate limits learned from flood waits.
+
+        Parameters:
+            value (``List[Tuple[str, int, float, float]]``): A list of tuples to set.
+                Each tuple must contain the following information:
+                - ``str``: The name of the request.
+                - ``int``: The id of the chat the limit is about, 0 for all of them.
+                - ``float``: The requests allowed per second.
+                - ``float``: The unix time until which no request is allowed, 0 if none.
+
+        Storages which don't keep them get none back, the limits are learned again then.
+        """
+        if value is object:
+            return []
+
     async def get_peer_by_id(self, peer_id: int):
         raise NotImplementedError
 
@@ -0,0 +1,155 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import pytest
+
+from pyrogram.connection import Connection
+from pyrogram.connection.transport import TCPAbridged
+from pyrogram.session.internals import DataCenter
+
+
+@pytest.fixture(autouse=True)
+def tables(monkeypatch):
+    monkeypatch.setattr(DataCenter, "options", {})
+    monkeypatch.setattr(DataCenter, "latency", {})
+
+
+class FakeTCP(TCPAbridged):
+    # Time it takes to connect to an address, or the error raised
+    routes = {}
+    closed = []
+
+    async def connect(self, address):
+        route = FakeTCP.routes[address]
+
+        if isinstance(route, Exception):
+            raise route
+
+        await asyncio.sleep(route)
+
+    async def close(self):
+        FakeTCP.closed.append(self)
+
+
+def connection(routes: dict) -> Connection:
+    FakeTCP.routes = routes
+    FakeTCP.closed = []
+
+    return Connection(2, False, True, None, protocol_factory=FakeTCP)
+
+
+def test_endpoints():
+    DataCenter.update([
+        (2, "10.0.0.2", 443, False, False, False, False),
+        (2, "10.0.0.2", 443, False, False, False, False),
+        (2, "10.0.0.3", 5222, False, False, False, False),
+        (2, "::2", 443, True, False, False, False),
+        (2, "10.0.0.4", 443, False, True, False, False),
+        (2, "10.0.0.5", 443, False, False, False, True),
+        (201, "10.0.0.6", 443, False, False, True, False),
+    ], test_mode=False)
+
+    v4, v6 = DataCenter(2, False, False, False), DataCenter(2, False, True, False)
+
+    assert DataCenter.endpoints(2, False, False, False) == [v4, ("10.0.0.2", 443), ("10.0.0.3", 5222)]
+    assert DataCenter.endpoints(2, False, True, False) == [
+        v6, v4, ("::2", 443), ("10.0.0.2", 443), ("10.0.0.3", 5222)
+    ]
+    assert DataCenter.endpoints(2, False, False, True)[:2] == [DataCenter(2, False, False, True), ("10.0.0.4", 443)]
+    assert DataCenter.endpoints(201, False, False, True) == [("10.0.0.6", 443)]
+    assert DataCenter.endpoints(201, False, False, False) == []
+
+    DataCenter.record(("10.0.0.3", 5222), 0.05)
+    DataCenter.record_failure(v6)
+
+    assert DataCenter.endpoints(2, False, True, False) == [
+        ("10.0.0.3", 5222), v4, ("::2", 443), ("10.0.0.2", 443), v6
+    ]
+
+    DataCenter.record(v6, 0.2)
+    DataCenter.record(v6, 0.1)
+
+    assert DataCenter.latency[v6] == pytest.approx(0.17)
+
+
+def test_endpoints_shared():
+    DataCenter.update([(2, "10.0.0.2", 443, False, False, False, False)], test_mode=False)
+
+    # Another client starting with an empty storage, then learning one more address
+    DataCenter.update([], test_mode=False)
+    DataCenter.update([(2, "10.0.0.3", 443, False, False, False, False)], test_mode=False)
+
+    assert DataCenter.endpoints(2, False, False, False)[1:] == [("10.0.0.2", 443), ("10.0.0.3", 443)]
+
+
+@pytest.mark.asyncio
+async def test_race_fastest():
+    c = connection({("a", 1): 0.5, ("b", 1): 0.01})
+
+    protocol = await c.race([("a", 1), ("b", 1)])
+
+    assert c.address == ("b", 1)
+    # The slower attempt was given up
+    assert len(FakeTCP.closed) == 1 and protocol not in FakeTCP.closed
+    assert DataCenter.latency[("b", 1)] < 0.1
+    assert ("a", 1) not in DataCenter.latency
+
+
+@pytest.mark.asyncio
+async def test_race_failure_starts_next():
+    c = connection({("a", 1): ConnectionRefusedError(), ("b", 1): 0})
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    await c.race([("a", 1), ("b", 1)])
+
+    # The second endpoint didn't have to wait for the head start of the first
+    assert loop.time() - start < Connection.RACE_DELAY
+    assert c.address == ("b", 1)
+    assert DataCenter.latency[("a", 1)] == DataCenter.FAILURE_LATENCY
+
+
+@pytest.mark.asyncio
+async def test_race_all_failed():
+    c = connection({("a", 1): ConnectionRefusedError(), ("b", 1): TimeoutError()})
+
+    assert await c.race([("a", 1), ("b", 1)]) is None
+
+
+@pytest.mark.asyncio
+async def test_close_not_connected():
+    c = connection({("a", 1): 0})
+
+    # Closing after every attempt failed, or twice, is fine
+    await c.close()
+
+    with pytest.raises(ConnectionResetError):
+        await c.send(b"")
+
+    assert await c.recv() is None
+
+
+@pytest.mark.asyncio
+async def test_race_error():
+    c = connection({("a", 1): ValueError("Unknown proxy type")})
+
+    with pytest.raises(ValueError):
+        await c.race([("a", 1)])
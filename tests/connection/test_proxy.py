@@ -0,0 +1,143 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import base64
+import ipaddress
+from struct import pack, unpack
+
+import pytest
+
+from pyrogram.connection.transport import TCPIntermediate
+from pyrogram.connection.transport.tcp.proxy import ProxyError
+
+
+async def socks4(reader, writer):
+    version, command, port = unpack(">BBH", await reader.readexactly(4))
+    ip = await reader.readexactly(4)
+    user = (await reader.readuntil(b"\x00"))[:-1]
+    host = (await reader.readuntil(b"\x00"))[:-1].decode() if ip.startswith(b"\x00\x00\x00") else None
+
+    writer.write(b"\x00\x5a" + bytes(6))
+    return (host or str(ipaddress.ip_address(ip)), port), user.decode()
+
+
+async def socks5(reader, writer, reply=0):
+    version, count = await reader.readexactly(2)
+    methods = await reader.readexactly(count)
+    user = None
+
+    if 2 in methods:
+        writer.write(b"\x05\x02")
+        await reader.readexactly(1)
+        user = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+        pwd = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+        user = f"{user}:{pwd}"
+        writer.write(b"\x01\x00")
+    else:
+        writer.write(b"\x05\x00")
+
+    _, _, _, address_type = await reader.readexactly(4)
+
+    if address_type == 3:
+        host = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+    else:
+        host = str(ipaddress.ip_address(await reader.readexactly(4 if address_type == 1 else 16)))
+
+    port = unpack(">H", await reader.readexactly(2))[0]
+
+    # Bound to a domain name, to check the variable length address is consumed
+    writer.write(bytes([5, reply, 0, 3, 9]) + b"localhost" + pack(">H", 1234))
+    return (host, port), user
+
+
+async def http(reader, writer, status=b"200 Connection established"):
+    request = (await reader.readuntil(b"\r\n\r\n")).decode()
+    lines = request.split("\r\n")
+    host, port = lines[0].split(" ")[1].rsplit(":", 1)
+    user = None
+
+    for line in lines:
+        if line.startswith("Proxy-Authorization: Basic "):
+            user = base64.b64decode(line.split(" ")[-1]).decode()
+
+    writer.write(b"HTTP/1.1 " + status + b"\r\nProxy-Agent: test\r\n\r\n")
+    return (host.strip("[]"), int(port)), user
+
+
+async def through(handshake, proxy: dict, destination, **kwargs):
+    """Connect to a fake proxy, which then plays the server and sends a frame."""
+    seen = asyncio.get_running_loop().create_future()
+
+    async def handle(reader, writer):
+        try:
+            seen.set_result(await handshake(reader, writer, **kwargs))
+            assert await reader.readexactly(4) == b"\xee" * 4
+            writer.write(pack("<i", 4) + b"pong")
+            await writer.drain()
+            await reader.read()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    proxy = dict(proxy, hostname="127.0.0.1", port=server.sockets[0].getsockname()[1])
+
+    tcp = TCPIntermediate(False, proxy)
+
+    try:
+        await tcp.connect(destination)
+        return await tcp.recv(), await seen
+    finally:
+        await tcp.close()
+        server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("handshake, scheme", [(socks5, "socks5"), (http, "http")])
+@pytest.mark.parametrize("destination", [("149.154.167.51", 443), ("2001:67c:4e8:f002::a", 443)])
+async def test_handshake(handshake, scheme, destination):
+    proxy = dict(scheme=scheme, username="user", password="pass")
+
+    assert await through(handshake, proxy, destination) == (b"pong", (destination, "user:pass"))
+
+
+@pytest.mark.asyncio
+async def test_socks5_no_auth():
+    destination = ("example.org", 443)
+
+    assert await through(socks5, dict(scheme="SOCKS5"), destination) == (b"pong", (destination, None))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("destination", [("149.154.167.51", 443), ("example.org", 80)])
+async def test_socks4(destination):
+    proxy = dict(scheme="socks4", username="user")
+
+    assert await through(socks4, proxy, destination) == (b"pong", (destination, "user"))
+
+
+@pytest.mark.asyncio
+async def test_errors():
+    with pytest.raises(ProxyError, match="connection refused"):
+        await through(socks5, dict(scheme="socks5"), ("149.154.167.51", 443), reply=5)
+
+    with pytest.raises(ProxyError, match="407"):
+        await through(http, dict(scheme="http"), ("149.154.167.51", 443), status=b"407 Proxy Authentication Required")
+
+    with pytest.raises(ValueError):
+        await through(http, dict(scheme="socks6"), ("149.154.167.51", 443))
@@ -0,0 +1,103 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram.connection import Connection, ProxyPool
+from pyrogram.connection.transport import TCPAbridged
+from pyrogram.session.internals import DataCenter
+
+A = dict(scheme="socks5", hostname="a", port=1080)
+B = dict(scheme="socks5", hostname="b", port=1080)
+C = dict(scheme="socks5", hostname="c", port=1080)
+
+
+def test_pick():
+    pool = ProxyPool([A, B, C])
+
+    pool.connected(A, 0.2)
+    pool.connected(B, 0.1)
+    pool.connected(B, 0.1)
+
+    # Main connections go through the fastest, media ones through the least busy
+    assert pool.pick() is B
+    assert pool.pick(media=True) is C
+
+    pool.connected(C, 0.3)
+    assert pool.pick(media=True) is A
+
+    pool.failed(B)
+    assert pool.pick() is A
+
+    pool.transferred(A, sent=100, received=900)
+    stats = {s["hostname"]: s for s in pool.stats()}
+
+    assert stats["a"]["sent"] + stats["a"]["received"] == 1000
+    assert stats["b"]["failures"] == 1 and stats["b"]["healthy"]
+
+
+def test_unhealthy(monkeypatch):
+    pool = ProxyPool([A, B], failure_threshold=2, retry_after=60)
+    now = [1000.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+
+    for proxy in (A, A, B):
+        pool.failed(proxy)
+
+    assert [s["healthy"] for s in pool.stats()] == [False, True]
+    assert pool.pick() is B
+
+    # Every proxy is down: try the one which failed the longest time ago
+    now[0] += 1
+    pool.failed(B)
+    assert pool.pick() is A
+
+    now[0] += 59.5
+    assert [s["healthy"] for s in pool.stats()] == [True, False]
+
+
+class FakeTCP(TCPAbridged):
+    down = set()
+
+    async def connect(self, address):
+        if self.proxy["hostname"] in FakeTCP.down:
+            raise ConnectionRefusedError()
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_failover(monkeypatch):
+    monkeypatch.setattr(DataCenter, "latency", {})
+    monkeypatch.setattr(Connection, "RACE_DELAY", 0)
+    monkeypatch.setattr(FakeTCP, "down", {"a"})
+
+    pool = ProxyPool([A, B])
+    connection = Connection(2, False, False, pool, protocol_factory=FakeTCP)
+
+    await connection.connect()
+
+    assert connection.protocol.proxy is B
+    assert [s["connections"] for s in pool.stats()] == [0, 1]
+    # Endpoints aren't blamed for what a proxy does
+    assert DataCenter.latency == {}
+
+    await connection.close()
+
+    assert [s["connections"] for s in pool.stats()] == [0, 0]
@@ -0,0 +1,271 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import socket
+from binascii import crc32
+from struct import pack
+
+import pytest
+
+from pyrogram.connection.transport import TCPAbridged, TCPFull, TCPIntermediate, TCPIntermediateO
+from pyrogram.connection.transport.tcp.tcp import TCPProtocol
+from pyrogram.crypto import aes
+
+
+class Transport:
+    def __init__(self):
+        self.closed = False
+        self.writes = []
+        self.reading = True
+
+    def close(self):
+        self.closed = True
+
+    def is_closing(self):
+        return self.closed
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def writelines(self, data):
+        self.writes.append(list(data))
+
+    def pause_reading(self):
+        self.reading = False
+
+    def resume_reading(self):
+        self.reading = True
+
+
+def feed(protocol: TCPProtocol, data: bytes, chunk: int):
+    # Mimic the event loop, which receives into whatever buffer the protocol hands out
+    for i in range(0, len(data), chunk):
+        part = data[i:i + chunk]
+        buffer = protocol.get_buffer(-1)
+
+        while part:
+            n = min(len(part), len(buffer))
+            buffer[:n] = part[:n]
+            protocol.buffer_updated(n)
+            part = part[n:]
+            buffer = protocol.get_buffer(-1)
+
+
+def frames(protocol: TCPProtocol) -> list:
+    return [protocol.frames.get_nowait() for _ in range(protocol.frames.qsize())]
+
+
+def protocol(tcp_class) -> TCPProtocol:
+    p = TCPProtocol(tcp_class(False, None))
+    p.connection_made(Transport())
+
+    return p
+
+
+def abridged(payload: bytes) -> bytes:
+    length = len(payload) // 4
+    return (bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")) + payload
+
+
+def full(payload: bytes, seq_no: int) -> bytes:
+    data = pack("<II", len(payload) + 12, seq_no) + payload
+    return data + pack("<I", crc32(data))
+
+
+PAYLOADS = [os.urandom(8), os.urandom(1024 * 1024), os.urandom(504), os.urandom(4)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk", [61, 4096, 1 << 22])
+async def test_abridged(chunk):
+    p = protocol(TCPAbridged)
+    feed(p, b"".join(abridged(i) for i in PAYLOADS), chunk)
+
+    assert frames(p) == PAYLOADS
+    assert p.start == p.end == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk", [33, 65536])
+async def test_intermediate(chunk):
+    p = protocol(TCPIntermediate)
+    feed(p, b"".join(pack("<i", len(i)) + i for i in PAYLOADS), chunk)
+
+    assert frames(p) == PAYLOADS
+
+
+@pytest.mark.asyncio
+async def test_full():
+    p = protocol(TCPFull)
+    feed(p, b"".join(full(payload, i) for i, payload in enumerate(PAYLOADS)), 1000)
+
+    assert frames(p) == PAYLOADS
+
+
+@pytest.mark.asyncio
+async def test_full_bad_checksum():
+    p = protocol(TCPFull)
+    data = bytearray(full(PAYLOADS[0], 0))
+    data[-1] ^= 1
+
+    feed(p, bytes(data) + full(PAYLOADS[2], 1), 1000)
+
+    assert frames(p) == [None]
+    assert p.transport.closed
+
+
+@pytest.mark.asyncio
+async def test_recv_over_socket():
+    async def handle(reader, writer):
+        assert await reader.readexactly(4) == b"\xee" * 4
+
+        for payload in PAYLOADS:
+            writer.write(pack("<i", len(payload)) + payload)
+
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    tcp = TCPIntermediate(False, None)
+    await tcp.connect(("127.0.0.1", port))
+
+    assert [await tcp.recv() for _ in PAYLOADS] == PAYLOADS
+    assert tcp.protocol.transport.get_extra_info("socket").getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    assert await tcp.recv() is None
+
+    await tcp.close()
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_send_coalesced():
+    p = protocol(TCPFull)
+    tcp = p.tcp
+    tcp.protocol, tcp.seq_no = p, 0
+
+    await asyncio.gather(*(tcp.send(payload) for payload in PAYLOADS))
+    await tcp.send(PAYLOADS[0])
+    await asyncio.sleep(0)
+
+    assert p.transport.writes == [
+        [full(payload, i) for i, payload in enumerate(PAYLOADS)],
+        [full(PAYLOADS[0], len(PAYLOADS))]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_closed():
+    p = protocol(TCPIntermediate)
+    p.tcp.protocol = p
+    p.transport.close()
+
+    with pytest.raises(OSError):
+        await p.tcp.send(PAYLOADS[0])
+
+
+@pytest.mark.asyncio
+async def test_send_over_socket():
+    received = asyncio.get_running_loop().create_future()
+    payloads = [os.urandom(4 * (i % 300 + 1)) for i in range(500)] + [os.urandom(4 * 1024 * 1024)]
+
+    async def handle(reader, writer):
+        nonce = await reader.readexactly(64)
+        data = await reader.readexactly(sum(len(i) + 4 for i in payloads))
+
+        # The nonce is part of the CTR stream, only its key and iv are sent in clear
+        received.set_result(aes.ctr256_decrypt(nonce + data, nonce[8:40], nonce[40:56], bytearray(1))[64:])
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    client = TCPIntermediateO(False, None)
+    pool_count = client.crypto_scheduler.pool_count
+
+    await client.connect(("127.0.0.1", port))
+    await asyncio.gather(*(client.send(payload) for payload in payloads))
+
+    assert await received == b"".join(pack("<i", len(i)) + i for i in payloads)
+    # The large payload was encrypted by the pool, in order with the others
+    assert client.crypto_scheduler.pool_count > pool_count
+
+    await client.close()
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_recv_obfuscated_over_socket():
+    payloads = [os.urandom(4 * (i % 300 + 1)) for i in range(100)] + [os.urandom(4 * 1024 * 1024), os.urandom(16)]
+
+    async def handle(reader, writer):
+        temp = bytearray((await reader.readexactly(64))[55:7:-1])
+        data = b"".join(pack("<i", len(i)) + i for i in payloads)
+
+        writer.write(aes.ctr256_encrypt(data, temp[0:32], temp[32:48], bytearray(1)))
+        await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    client = TCPIntermediateO(False, None)
+    pool_count = client.crypto_scheduler.pool_count
+
+    await client.connect(("127.0.0.1", port))
+
+    assert [await client.recv() for _ in payloads] == payloads
+    # Large chunks were decrypted by the pool, in order with the others
+    assert client.crypto_scheduler.pool_count > pool_count
+
+    await client.close()
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_recv_timeout():
+    p = protocol(TCPIntermediate)
+    p.tcp.protocol = p
+
+    feed(p, pack("<i", 4) + PAYLOADS[3], 2)
+    assert await p.tcp.recv(timeout=0.05) == PAYLOADS[3]
+
+    # Nothing else comes in
+    assert await p.tcp.recv(timeout=0.05) is None
+
+
+@pytest.mark.asyncio
+async def test_recv_backpressure(monkeypatch):
+    monkeypatch.setattr(TCPIntermediate, "MAX_PENDING_FRAMES", 4)
+
+    p = protocol(TCPIntermediate)
+    p.tcp.protocol = p
+
+    feed(p, (pack("<i", 4) + PAYLOADS[3]) * 5, 1024)
+    assert not p.transport.reading and p.tcp.pending == 5
+
+    # Reading resumes once half of the limit is left
+    for _ in range(3):
+        await p.tcp.recv()
+
+    assert p.transport.reading and p.tcp.pending == 2
@@ -0,0 +1,93 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import random
+
+import pytest
+
+from pyrogram.crypto import aes, pure_aes
+
+# NIST SP 800-38A, F.5.5 CTR-AES256.Encrypt
+KEY = bytes.fromhex("603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4")
+IV = bytes.fromhex("f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff")
+PLAINTEXT = bytes.fromhex(
+    "6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51"
+    "30c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710"
+)
+CIPHERTEXT = bytes.fromhex(
+    "601ec313775789a5b7a7f504bbf3d228f443e3ca4d62b59aca84e990cacaf5c5"
+    "2b0930daa23de94ce87017ba2d84988ddfc9c58db67aada613c2dd08457941a6"
+)
+
+
+BACKENDS = aes.available()
+
+
+def test_aes256_block():
+    # FIPS-197, C.3 AES-256
+    cipher = pure_aes.AES256(bytes(range(32)))
+    ciphertext = cipher.encrypt(bytes.fromhex("00112233445566778899aabbccddeeff"))
+
+    assert ciphertext.hex() == "8ea2b7ca516745bfeafc49904b496089"
+    assert cipher.decrypt(ciphertext).hex() == "00112233445566778899aabbccddeeff"
+
+
+def test_ctr256_vector():
+    assert aes.ctr256_encrypt(PLAINTEXT, KEY, bytearray(IV)) == CIPHERTEXT
+    assert aes.ctr256_decrypt(CIPHERTEXT, KEY, bytearray(IV)) == PLAINTEXT
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backend(name):
+    backend = aes.BACKENDS[name]()
+    reference = aes.BACKENDS["python"]()
+
+    assert backend.CTR256(KEY, bytearray(IV)).update(PLAINTEXT) == CIPHERTEXT
+
+    # Resuming from the middle of a block
+    iv, state = bytearray(IV), bytearray(1)
+    backend.CTR256(KEY, iv, state).update(PLAINTEXT[:21])
+    assert backend.CTR256(KEY, iv, state).update(PLAINTEXT[21:]) == CIPHERTEXT[21:]
+
+    data, iv = os.urandom(16 * 33), os.urandom(32)
+    ciphertext = backend.ige256_encrypt(data, KEY, iv)
+
+    assert ciphertext == reference.ige256_encrypt(data, KEY, iv)
+    assert backend.ige256_decrypt(memoryview(ciphertext), KEY, iv) == data
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ctr256_stream(seed):
+    rng = random.Random(seed)
+    data = os.urandom(rng.randrange(1, 4096))
+
+    iv, state = bytearray(IV), bytearray(1)
+    expected = aes.ctr256_encrypt(data, KEY, iv, state)
+
+    stream = aes.CTR256(KEY, bytearray(IV))
+    chunks, i = [], 0
+
+    # Odd sizes, such as the 1 and 3 bytes of the abridged length prefixes
+    while i < len(data):
+        size = rng.choice([0, 1, 3, 4, 15, 16, 17, 100])
+        chunks.append(stream.update(data[i:i + size]))
+        i += size
+
+    assert b"".join(chunks) == expected
+    assert stream.iv == iv and stream.state == state
@@ -0,0 +1,79 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from hashlib import sha256
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.crypto import mtproto
+from pyrogram.errors import SecurityCheckMismatch
+from pyrogram.raw.core import Message
+
+AUTH_KEY = bytes(range(256))
+SESSION_ID = bytes(range(8))
+
+
+def packet(body) -> bytes:
+    data = body.write()
+
+    # Keys of incoming messages are taken 8 bytes further: shift the auth key to seal a server message
+    return mtproto.pack(Message(body, 3, 4, len(data), data), 5, SESSION_ID, AUTH_KEY[8:] + bytes(8), bytes(8))
+
+
+def server_body(size: int):
+    # Small packets and large ones are decrypted in different ways
+    if not size:
+        return raw.types.Pong(msg_id=1, ping_id=2)
+
+    return raw.types.upload.File(type=raw.types.storage.FilePartial(), mtime=0, bytes=bytes(size))
+
+
+@pytest.mark.parametrize("outgoing", [True, False])
+def test_kdf(outgoing):
+    msg_key = bytes(range(16, 32))
+    x = 0 if outgoing else 8
+
+    sha256_a = sha256(msg_key + AUTH_KEY[x:x + 36]).digest()
+    sha256_b = sha256(AUTH_KEY[x + 40:x + 76] + msg_key).digest()
+
+    assert mtproto.kdf(mtproto.AuthKey(AUTH_KEY), msg_key, outgoing) == (
+        sha256_a[:8] + sha256_b[8:24] + sha256_a[24:32],
+        sha256_b[:8] + sha256_a[8:24] + sha256_b[24:32]
+    )
+
+
+@pytest.mark.parametrize("size", [0, mtproto.SMALL_PACKET_SIZE])
+def test_unpack_bytes(size):
+    body = server_body(size)
+    auth_key = mtproto.AuthKey(AUTH_KEY)
+    message = mtproto.unpack(auth_key.id + packet(body)[8:], SESSION_ID, auth_key, auth_key.id)
+
+    assert message.body == body
+    assert message.msg_id == 3
+
+
+@pytest.mark.parametrize("size", [0, mtproto.SMALL_PACKET_SIZE])
+def test_unpack_tampered(size):
+    body = server_body(size)
+    auth_key = mtproto.AuthKey(AUTH_KEY)
+    data = bytearray(auth_key.id + packet(body)[8:])
+    data[-1] ^= 1
+
+    with pytest.raises(SecurityCheckMismatch):
+        mtproto.unpack(bytes(data), SESSION_ID, auth_key, auth_key.id)
@@ -0,0 +1,76 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+import pytest
+
+from pyrogram.crypto.scheduler import CryptoScheduler
+
+
+def thread_name(*args) -> str:
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_small_packets_run_inline():
+    scheduler = CryptoScheduler(1, inline_threshold=1024)
+
+    assert await scheduler.run(1024, thread_name) == threading.current_thread().name
+    assert scheduler.stats()["inline"] == 1
+    assert scheduler.stats()["pool"] == 0
+
+
+@pytest.mark.asyncio
+async def test_large_packets_run_in_pool():
+    scheduler = CryptoScheduler(2, inline_threshold=1024, name="Test")
+
+    assert (await scheduler.run(1025, thread_name)).startswith("Test")
+
+    stats = scheduler.stats()
+    assert stats["pool"] == 1
+    assert stats["max_queue_wait"] >= stats["avg_queue_wait"] > 0
+
+    scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_no_workers():
+    scheduler = CryptoScheduler(0)
+
+    assert await scheduler.run(1 << 20, thread_name) == threading.current_thread().name
+    assert scheduler.executor is None
+
+
+@pytest.mark.asyncio
+async def test_submit():
+    scheduler = CryptoScheduler(2, inline_threshold=1024, name="Test")
+
+    inline = scheduler.submit(1, thread_name)
+    pooled = scheduler.submit(1025, thread_name)
+    failed = scheduler.submit(1025, int, "x")
+
+    assert inline.done() and inline.result() == threading.current_thread().name
+    assert (await pooled).startswith("Test")
+
+    with pytest.raises(ValueError):
+        await failed
+
+    assert scheduler.stats()["pool"] == 1
+
+    scheduler.shutdown()
@@ -0,0 +1,51 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.raw.all import objects
+
+
+def test_lazy_constructor():
+    module = "pyrogram.raw.types.help.passport_config_not_modified"
+
+    assert module not in sys.modules
+    assert 0xbfb9f457 in objects
+    assert objects[0xbfb9f457] is raw.types.help.PassportConfigNotModified
+    assert module in sys.modules
+
+
+def test_from_import():
+    from pyrogram.raw.functions.help import GetPassportConfig
+
+    assert GetPassportConfig is raw.functions.help.GetPassportConfig
+    assert "GetPassportConfig" in dir(raw.functions.help)
+
+
+def test_unknown():
+    assert 0 not in objects
+
+    with pytest.raises(KeyError):
+        objects[0]
+
+    with pytest.raises(AttributeError):
+        raw.types.Unknown
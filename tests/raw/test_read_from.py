@@ -0,0 +1,88 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from io import BufferedReader, BytesIO
+
+from pyrogram import raw
+from pyrogram.crypto import mtproto
+from pyrogram.raw.core import GzipPacked, Int, Long, Message, TLObject, Vector
+
+MESSAGE = raw.types.Message(
+    id=1,
+    peer_id=raw.types.PeerChannel(channel_id=2),
+    from_id=raw.types.PeerUser(user_id=3),
+    date=4,
+    message="Pyrogram " * 50,
+    entities=[raw.types.MessageEntityBold(offset=0, length=8)],
+    views=5,
+    forwards=6,
+    restriction_reason=[],
+    pinned=True
+)
+
+
+def test_read_from():
+    data = MESSAGE.write()
+    result, offset = TLObject.read_from(memoryview(data), 0)
+
+    assert result.write() == data
+    assert result.message == MESSAGE.message
+    assert offset == len(data)
+
+
+def test_read_matches_stream():
+    data = MESSAGE.write() + Vector([1, 2, 3], Long)
+    buffer = BytesIO(data)
+    stream = BufferedReader(BytesIO(data))
+
+    assert TLObject.read(buffer) == TLObject.read(stream)
+    assert TLObject.read(buffer, Long) == TLObject.read(stream, Long) == [1, 2, 3]
+    assert buffer.read() == stream.read() == b""
+
+
+def test_gzip_packed():
+    data = GzipPacked(MESSAGE).write()
+    result, offset = TLObject.read_from(memoryview(data), 0)
+
+    assert result.write() == MESSAGE.write()
+    assert offset == len(data)
+
+
+def test_message_bounds_body():
+    # Bare vectors guess the size of their items from the bytes left, which must exclude the padding
+    body = Vector([1, 2], Int)
+    data = Message(body, 1, 2, len(body), body).write() + bytes(12)
+    message, offset = Message.read_from(memoryview(data), 0)
+
+    assert message.body == [1, 2]
+    assert offset == len(data) - 12
+
+
+def test_unpack():
+    auth_key = bytes(range(256))
+    auth_key_id = bytes(8)
+    session_id = bytes(range(8))
+    body = raw.types.Pong(msg_id=1, ping_id=2)
+    data = body.write()
+    packed = mtproto.pack(Message(body, 3, 4, len(data), data), 5, session_id, auth_key, auth_key_id)
+
+    # Keys of incoming messages are taken 8 bytes further: shift the auth key to decrypt our own message
+    message = mtproto.unpack(BytesIO(packed), session_id, bytes(8) + auth_key, auth_key_id)
+
+    assert message.body == body
@@ -0,0 +1,58 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from benchmarks import payloads
+from pyrogram import raw
+from pyrogram.raw.core import Message, TLObject
+
+UPDATES = payloads.group_updates(2)
+
+
+def test_read_lazy():
+    data = UPDATES.write()
+    eager, offset = TLObject.read_from(memoryview(data), 0)
+    lazy, lazy_offset = TLObject.read_lazy(memoryview(data), 0)
+
+    assert lazy_offset == offset == len(data)
+    assert repr(lazy) == repr(eager)
+    assert lazy.write() == eager.write()
+
+
+def test_fields_decoded_on_access():
+    data = payloads.message(1).write()
+    message, _ = TLObject.read_lazy(memoryview(data), 0)
+
+    assert set(message._lazy[1]) == {"entities"}
+    assert message.entities[0] == raw.types.MessageEntityUrl(offset=35, length=24)
+
+    # The buffer is let go once every deferred field has been decoded
+    with pytest.raises(AttributeError):
+        message._lazy
+
+    with pytest.raises(AttributeError):
+        message.nonexistent
+
+
+def test_read_lazy_accepted_updates():
+    data = Message(UPDATES, 1, 2, len(UPDATES.write())).write()
+    message, _ = Message.read_lazy(memoryview(data), 0, {raw.types.UpdateNewChannelMessage.ID})
+
+    assert [type(update) for update in message.body.updates] == [raw.types.UpdateNewChannelMessage] * 2
+    assert message.body.updates[1].message.message == payloads.message(1).message
@@ -0,0 +1,67 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from pyrogram import raw
+from pyrogram.raw.core import Message, TLObject
+
+UPDATES = raw.types.Updates(
+    updates=[
+        raw.types.UpdateUserStatus(user_id=1, status=raw.types.UserStatusOnline(expires=2)),
+        raw.types.UpdateNewMessage(
+            message=raw.types.Message(id=3, peer_id=raw.types.PeerUser(user_id=1), date=4, message="Pyrogram"),
+            pts=5,
+            pts_count=1
+        ),
+        raw.types.UpdateReadHistoryOutbox(peer=raw.types.PeerUser(user_id=1), max_id=3, pts=6, pts_count=1)
+    ],
+    users=[raw.types.UserEmpty(id=1)],
+    chats=[],
+    date=7,
+    seq=0
+)
+
+
+def test_skip():
+    data = UPDATES.write() + bytes(4)
+
+    assert TLObject.skip(memoryview(data), 0) == len(data) - 4
+
+
+def test_read_from_accepted_updates():
+    data = UPDATES.write()
+    result, offset = TLObject.read_from(memoryview(data), 0, {raw.types.UpdateNewMessage.ID})
+
+    assert [type(update) for update in result.updates] == [raw.types.UpdateNewMessage]
+    assert result.updates[0].message.message == "Pyrogram"
+    assert result.users == [raw.types.UserEmpty(id=1)]
+    assert offset == len(data)
+
+
+def test_read_from_all_updates():
+    data = UPDATES.write()
+    result, _ = TLObject.read_from(memoryview(data), 0, None)
+
+    assert len(result.updates) == 3
+
+
+def test_message_accepted_updates():
+    data = Message(UPDATES, 1, 2, len(UPDATES.write())).write()
+    message, _ = Message.read_from(memoryview(data), 0, frozenset())
+
+    assert message.body.updates == []
+    assert message.body.date == 7
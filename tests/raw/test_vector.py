@@ -0,0 +1,55 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from io import BytesIO
+
+from pyrogram import raw
+from pyrogram.raw.core import Long, TLObject, Vector
+
+
+def test_nested_vectors():
+    messages = raw.types.messages.Messages(
+        messages=[
+            raw.types.Message(
+                id=i,
+                peer_id=raw.types.PeerUser(user_id=1),
+                date=0,
+                message="",
+                entities=[raw.types.MessageEntityBold(offset=0, length=i)] * i
+            )
+            for i in range(3)
+        ],
+        topics=[],
+        chats=[],
+        users=[raw.types.User(id=1, first_name="Pyrogram")]
+    )
+
+    data = BytesIO(messages.write() + b"trailing")
+    result = TLObject.read(data)
+
+    assert [len(m.entities) for m in result.messages] == [0, 1, 2]
+    assert result.messages[2].entities[1] == raw.types.MessageEntityBold(offset=0, length=2)
+    assert result.users[0].first_name == "Pyrogram"
+    assert data.read() == b"trailing"
+
+
+def test_untyped_vector():
+    data = BytesIO(Vector([1, 2, 3], Long))
+
+    assert TLObject.read(data) == [1, 2, 3]
+    assert data.read() == b""
@@ -0,0 +1,61 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from pyrogram import raw
+from pyrogram.raw.core import Bytes, Int, Long, String, Vector
+
+
+def test_shared_buffer():
+    media = raw.functions.messages.SendMultiMedia(
+        peer=raw.types.InputPeerSelf(),
+        multi_media=[
+            raw.types.InputSingleMedia(
+                media=raw.types.InputMediaPhoto(
+                    id=raw.types.InputPhoto(id=i, access_hash=i, file_reference=b"reference")
+                ),
+                random_id=i,
+                message="caption",
+                entities=[raw.types.MessageEntityBold(offset=0, length=7)]
+            )
+            for i in range(3)
+        ]
+    )
+
+    b = bytearray(b"head")
+    media.write_into(b)
+
+    assert b == b"head" + media.write()
+    assert raw.functions.messages.SendMultiMedia.read_from(memoryview(b), 8)[0].write() == media.write()
+
+
+def test_primitives():
+    b = bytearray()
+
+    Bytes.write_into(b, bytes(300))
+    String.write_into(b, "Pyrogram")
+    Vector.write_into(b, [1, -2], Int)
+    Vector.write_into(b, [3, -4], Long)
+    Vector.write_into(b, ["a", "b"], String)
+
+    assert b == (
+        Bytes(bytes(300)) + String("Pyrogram")
+        + Int(Vector.ID, False) + Int(2) + Int(1) + Int(-2)
+        + Int(Vector.ID, False) + Int(2) + Long(3) + Long(-4)
+        + Int(Vector.ID, False) + Int(2) + String("a") + String("b")
+    )
@@ -0,0 +1,57 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from pyrogram.crypto.scheduler import CryptoScheduler
+from pyrogram.session.internals import RateLimiter
+
+
+class Dispatcher:
+    update_ids = None
+
+
+class Client:
+    def __init__(self):
+        self.name = "test"
+        self.dispatcher = Dispatcher()
+        self.lazy_decoding = False
+        self.ping_interval = 5
+        self.media_ping_interval = 30
+        self.max_requests_in_flight = 100
+        self.rate_limiter = RateLimiter()
+        self.disconnect_handler = None
+        self.updates = []
+
+    def get_crypto_scheduler(self, dc_id):
+        # Everything runs inline, the tests don't go through the encryption anyway
+        return CryptoScheduler(0)
+
+    async def put_updates(self, updates):
+        self.updates.append(updates)
+
+
+class Connection:
+    def __init__(self):
+        self.sent = []
+        self.last_received = 0.0
+        self.pending = 0
+
+    async def send(self, data):
+        self.sent.append(data)
+
+    async def close(self):
+        pass
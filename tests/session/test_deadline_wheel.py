@@ -0,0 +1,86 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from pyrogram.session.internals import DeadlineWheel
+
+
+class Result:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_deadline_wheel():
+    loop = asyncio.get_running_loop()
+    wheel = DeadlineWheel(0.01)
+    late, early, answered = loop.create_future(), loop.create_future(), loop.create_future()
+
+    wheel.add(late, 0.2)
+    wheel.add(answered, 0.02)
+    # Expires before the timer set for the first one
+    wheel.add(early, 0.02)
+
+    answered.set_result(1)
+    await asyncio.sleep(0.05)
+
+    assert isinstance(early.exception(), TimeoutError)
+    assert answered.result() == 1 and not late.done()
+    assert len(wheel) == 1
+
+    wheel.clear()
+    assert wheel.handle is None
+
+
+@pytest.mark.asyncio
+async def test_same_tick_shares_timer():
+    loop = asyncio.get_running_loop()
+    wheel = DeadlineWheel(1)
+    futures = [loop.create_future() for _ in range(100)]
+
+    for future in futures:
+        wheel.add(future, 0.5)
+
+    assert len(wheel.slots) <= 2 and len(wheel) == 100
+
+    wheel.clear()
+
+
+@pytest.mark.asyncio
+async def test_done_future_released():
+    loop = asyncio.get_running_loop()
+    wheel = DeadlineWheel(1)
+    future = loop.create_future()
+    result = Result()
+    ref = weakref.ref(result)
+
+    wheel.add(future, 15)
+    future.set_result(result)
+    await asyncio.sleep(0)
+
+    assert len(wheel) == 0
+
+    del future, result
+    gc.collect()
+    assert ref() is None
+
+    wheel.clear()
@@ -0,0 +1,176 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.session import MediaSessions
+from pyrogram.session import media_sessions as media_sessions_module
+
+
+class Storage:
+    async def test_mode(self):
+        return False
+
+    async def dc_id(self):
+        return 2
+
+    async def auth_key(self):
+        return b"home"
+
+
+class Client:
+    def __init__(self):
+        self.storage = Storage()
+        self.exports = 0
+
+    async def invoke(self, query):
+        self.exports += 1
+        return raw.types.auth.ExportedAuthorization(id=1, bytes=b"")
+
+
+class Session:
+    def __init__(self, client, dc_id, auth_key, test_mode, is_media=False, is_cdn=False):
+        self.dc_id = dc_id
+        self.auth_key = auth_key
+        self.is_cdn = is_cdn
+        self.results = {}
+        self.started = False
+
+    async def start(self):
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+
+    async def invoke(self, query):
+        pass
+
+
+class Auth:
+    created = 0
+
+    def __init__(self, client, dc_id, test_mode):
+        self.dc_id = dc_id
+
+    async def create(self):
+        Auth.created += 1
+        return f"key{self.dc_id}".encode()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(media_sessions_module, "Session", Session)
+    monkeypatch.setattr(media_sessions_module, "Auth", Auth)
+    monkeypatch.setattr(Auth, "created", 0)
+
+    return Client()
+
+
+@pytest.mark.asyncio
+async def test_reopen_keeps_authorization(client):
+    sessions = MediaSessions(client, idle_timeout=0.05)
+
+    async with sessions.get(4) as first:
+        assert first.started and first.auth_key == b"key4"
+        assert client.exports == 1
+
+    await asyncio.sleep(0.1)
+    assert (4, False) not in sessions and not first.started
+
+    async with sessions.get(4) as second:
+        pass
+
+    assert second is not first and second.auth_key == b"key4"
+    assert Auth.created == 1 and client.exports == 1
+
+    await sessions.stop()
+    assert not second.started and sessions.reaper_task is None
+
+
+@pytest.mark.asyncio
+async def test_acquired_session_not_reaped(client):
+    sessions = MediaSessions(client, idle_timeout=0.05)
+
+    session = await sessions.acquire(2)
+    assert session.auth_key == b"home" and client.exports == 0
+
+    await asyncio.sleep(0.1)
+    assert session.started
+
+    sessions.release(session)
+    await asyncio.sleep(0.1)
+    assert not session.started and not len(sessions)
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_evicted(client):
+    sessions = MediaSessions(client, idle_timeout=0, max_sessions=2)
+
+    dc1 = await sessions.acquire(1)
+    sessions.release(dc1)
+    dc3 = await sessions.acquire(3)
+    sessions.release(await sessions.acquire(1))
+    dc5 = await sessions.acquire(5, cdn=True)
+    sessions.release(dc5)
+
+    # DC3 is the least recently used, but still in use
+    assert not dc1.started and dc3.started and dc5.started
+    assert list(sessions.sessions) == [(3, False), (5, True)]
+
+    sessions.release(dc3)
+    sessions.release(await sessions.acquire(4))
+    assert not dc3.started and list(sessions.sessions) == [(5, True), (4, False)]
+
+    await sessions.stop()
+
+
+@pytest.mark.asyncio
+async def test_none_evicted_under_limit(client):
+    sessions = MediaSessions(client, idle_timeout=0, max_sessions=5)
+
+    opened = []
+
+    for dc_id in (1, 2, 4, 5):
+        async with sessions.get(dc_id) as session:
+            opened.append(session)
+
+    assert all(session.started for session in opened)
+    assert list(sessions.sessions) == [(1, False), (2, False), (4, False), (5, False)]
+
+    await sessions.stop()
+
+
+@pytest.mark.asyncio
+async def test_session_held_until_block_left(client):
+    sessions = MediaSessions(client, idle_timeout=0.05, max_sessions=1)
+
+    async with sessions.get(4) as session:
+        await asyncio.sleep(0.1)
+        assert session.started
+
+        # Going over the limit doesn't stop a session in use either
+        async with sessions.get(1):
+            pass
+
+        assert session.started
+
+    await asyncio.sleep(0.1)
+    assert not session.started and not len(sessions)
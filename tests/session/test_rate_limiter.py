@@ -0,0 +1,116 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.errors import FloodWait
+from pyrogram.session.internals import RateLimiter
+
+USER = raw.types.InputPeerUser(user_id=1, access_hash=0)
+CHANNEL = raw.types.InputPeerChannel(channel_id=1, access_hash=0)
+
+
+def send_message(peer) -> raw.functions.messages.SendMessage:
+    return raw.functions.messages.SendMessage(peer=peer, message="", random_id=0)
+
+
+def get_history(peer) -> raw.functions.messages.GetHistory:
+    return raw.functions.messages.GetHistory(
+        peer=peer, offset_id=0, offset_date=0, add_offset=0, limit=100, max_id=0, min_id=0, hash=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_known_limits():
+    limiter = RateLimiter()
+
+    for _ in range(3):
+        await limiter.acquire(send_message(USER))
+
+    # A burst of three messages to a user, then about one a second
+    assert limiter.bucket(("send", 1)).delay(time.monotonic()) > 0.9
+    assert limiter.bucket(("send", 0)).delay(time.monotonic()) == 0
+
+    # Whichever method sends the message
+    with pytest.raises(FloodWait):
+        await limiter.acquire(raw.functions.messages.SendMedia(
+            peer=USER, media=raw.types.InputMediaEmpty(), message="", random_id=0
+        ), sleep_threshold=0)
+
+    assert limiter.bucket(("send", 0)).tokens == pytest.approx(27, abs=0.1)
+
+    # Other chats aren't held back
+    await asyncio.wait_for(limiter.acquire(send_message(CHANNEL)), 0.01)
+
+    # Nor are requests with no known limit
+    await asyncio.wait_for(limiter.acquire(get_history(CHANNEL)), 0.01)
+    assert ("functions.messages.GetHistory", 0) not in limiter.buckets
+
+
+@pytest.mark.asyncio
+async def test_learn_from_flood_wait():
+    limiter = RateLimiter()
+    limiter.flood(get_history(CHANNEL), 0.05)
+
+    [(name, peer_id, rate, until)] = limiter.learned()
+    assert (name, peer_id) == ("functions.messages.GetHistory", -1000000000001)
+    assert rate == 1 and until > time.time()
+
+    start = time.monotonic()
+    await limiter.acquire(get_history(CHANNEL))
+    assert time.monotonic() - start >= 0.04
+
+    # The same request for another chat goes out right away
+    await asyncio.wait_for(limiter.acquire(get_history(USER)), 0.01)
+
+    # Waits longer than the threshold are left to the caller, as the server's are
+    limiter.flood(get_history(CHANNEL), 3600)
+
+    with pytest.raises(FloodWait) as e:
+        await limiter.acquire(get_history(CHANNEL), sleep_threshold=10)
+
+    assert e.value.value == 3600
+
+    # Flood waits halve the rate
+    limiter.flood(get_history(CHANNEL), 0.05)
+    assert limiter.learned()[0][2] == pytest.approx(1.01 / 4)
+
+    restored = RateLimiter()
+    restored.load(limiter.learned())
+
+    [(*learned, until)], [(*expected, expected_until)] = restored.learned(), limiter.learned()
+    assert learned == expected and until == pytest.approx(expected_until, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_recovery():
+    limiter = RateLimiter()
+    limiter.flood(raw.functions.help.GetConfig(), 0)
+
+    bucket = limiter.buckets[("functions.help.GetConfig", 0)]
+    bucket.rate = bucket.burst = RateLimiter.MAX_RATE / RateLimiter.RECOVERY
+    bucket.tokens = 1
+
+    await limiter.acquire(raw.functions.help.GetConfig())
+
+    # Back to where it was, the bucket is let go
+    assert not limiter.buckets and not limiter.learned()
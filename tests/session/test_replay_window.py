@@ -0,0 +1,40 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from pyrogram.session.internals import ReplayWindow
+
+
+def test_replay_window():
+    window = ReplayWindow(4)
+    assert not window and window.floor is None
+
+    for msg_id in (12, 4, 8, 8):
+        window.add(msg_id)
+
+    assert len(window) == 3 and window.floor == 4
+    assert 8 in window and 16 not in window
+
+
+def test_replay_window_forgets_oldest_half():
+    window = ReplayWindow(4)
+
+    for msg_id in (20, 4, 16, 8, 12):
+        window.add(msg_id)
+
+    assert len(window) == 3 and window.floor == 12
+    assert 4 not in window and 8 not in window and 20 in window
@@ -0,0 +1,100 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.enums import RequestPriority
+from pyrogram.session.internals import RequestScheduler
+
+
+async def run(scheduler: RequestScheduler, priority: RequestPriority, name: str, order: list):
+    await scheduler.acquire(priority)
+    order.append(name)
+
+
+@pytest.mark.asyncio
+async def test_priorities_share_window():
+    scheduler = RequestScheduler(1)
+    order = []
+
+    await scheduler.acquire(RequestPriority.NORMAL)
+
+    tasks = [
+        asyncio.create_task(run(scheduler, priority, f"{priority.value}{i}", order))
+        for priority, count in ((RequestPriority.BULK, 2), (RequestPriority.NORMAL, 4), (RequestPriority.INTERACTIVE, 20))
+        for i in range(count)
+    ]
+
+    await asyncio.sleep(0)
+    assert scheduler.stats() == {"in_flight": 1, "window": 1, "interactive": 20, "normal": 4, "bulk": 2}
+
+    for _ in range(len(tasks)):
+        scheduler.release()
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*tasks)
+
+    # Interactive requests go first, yet the others aren't starved until they're all done
+    assert order[:2] == ["interactive0", "interactive1"]
+    assert order.index("bulk0") < order.index("interactive19")
+    assert [o for o in order if o.startswith("normal")] == ["normal0", "normal1", "normal2", "normal3"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_passes_turn():
+    scheduler = RequestScheduler(1)
+    order = []
+
+    await scheduler.acquire(RequestPriority.NORMAL)
+    cancelled = asyncio.create_task(run(scheduler, RequestPriority.NORMAL, "cancelled", order))
+    waiting = asyncio.create_task(run(scheduler, RequestPriority.NORMAL, "waiting", order))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    scheduler.release()
+    await waiting
+
+    assert order == ["waiting"] and scheduler.in_flight == 1
+
+
+def test_flood_shrinks_window():
+    scheduler = RequestScheduler(8)
+
+    scheduler.flood()
+    scheduler.flood()
+    assert scheduler.stats()["window"] == 2
+
+    # About one more request every window's worth of them answered
+    for _ in range(30):
+        scheduler.in_flight += 1
+        scheduler.release()
+
+    assert scheduler.stats()["window"] == 8
+
+
+def test_default_priority():
+    assert RequestScheduler.priority(
+        raw.functions.messages.SetBotCallbackAnswer(query_id=0, cache_time=0)
+    ) == RequestPriority.INTERACTIVE
+    assert RequestScheduler.priority(
+        raw.functions.upload.SaveFilePart(file_id=0, file_part=0, bytes=b"")
+    ) == RequestPriority.BULK
+    assert RequestScheduler.priority(raw.functions.help.GetConfig()) == RequestPriority.NORMAL
@@ -0,0 +1,214 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.errors import FloodWait
+from pyrogram.raw.core import Message, MsgContainer
+from pyrogram.session import Session
+from pyrogram.session import session as session_module
+from pyrogram.session.internals import MsgId
+from tests.session import Client, Connection
+
+
+@pytest.fixture
+def session(monkeypatch):
+    # Skip the encryption step and look at the outgoing messages directly
+    monkeypatch.setattr(session_module.mtproto, "pack", lambda message, *args: message)
+
+    s = Session(Client(), 2, bytes(256), False)
+    s.connection = Connection()
+
+    return s
+
+
+@pytest.mark.asyncio
+async def test_single_message_is_not_wrapped(session):
+    await session.send(raw.types.MsgsAck(msg_ids=[1]), False)
+
+    assert len(session.connection.sent) == 1
+    assert isinstance(session.connection.sent[0].body, raw.types.MsgsAck)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_messages_share_container(session):
+    await asyncio.gather(*[
+        session.send(raw.types.MsgsAck(msg_ids=[i]), False)
+        for i in range(5)
+    ])
+
+    assert len(session.connection.sent) == 1
+
+    container = session.connection.sent[0]
+    assert isinstance(container.body, MsgContainer)
+    assert [m.body.msg_ids for m in container.body.messages] == [[i] for i in range(5)]
+    assert container.msg_id > max(m.msg_id for m in container.body.messages)
+
+
+@pytest.mark.asyncio
+async def test_container_size_cap(session, monkeypatch):
+    monkeypatch.setattr(Session, "MAX_CONTAINER_SIZE", 2)
+
+    await asyncio.gather(*[
+        session.send(raw.types.MsgsAck(msg_ids=[i]), False)
+        for i in range(5)
+    ])
+
+    assert len(session.connection.sent) == 3
+
+
+@pytest.mark.asyncio
+async def test_container_notification_reaches_every_request(session, monkeypatch):
+    tasks = [
+        asyncio.create_task(session.send(raw.functions.Ping(ping_id=i), timeout=1))
+        for i in range(2)
+    ]
+
+    while not session.connection.sent:
+        await asyncio.sleep(0)
+
+    container = session.connection.sent[0]
+    notification = raw.types.BadMsgNotification(bad_msg_id=container.msg_id, bad_msg_seqno=0, error_code=48)
+
+    monkeypatch.setattr(
+        session_module.mtproto, "unpack",
+        lambda *args: Message(notification, MsgId() + 1, 0, len(notification))
+    )
+
+    await session.handle_packet(session.unpack(b""))
+
+    assert await asyncio.gather(*tasks) == [notification, notification]
+    assert not session.containers
+
+
+@pytest.mark.asyncio
+async def test_request_timeout(session):
+    with pytest.raises(TimeoutError):
+        await session.send(raw.functions.Ping(ping_id=0), timeout=0.05)
+
+    assert not session.results
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_pending_requests(session):
+    await session._set_state(session_module.SessionState.STARTED)
+    task = asyncio.create_task(session.send(raw.functions.Ping(ping_id=0), timeout=15))
+
+    while not session.connection.sent:
+        await asyncio.sleep(0)
+
+    await session.stop()
+
+    with pytest.raises(ConnectionError):
+        await task
+
+    assert not session.results and session.deadlines.handle is None
+
+
+@pytest.mark.asyncio
+async def test_local_flood_wait_not_learned(session):
+    session.is_started.set()
+    query = raw.functions.messages.GetHistory(
+        peer=raw.types.InputPeerChannel(channel_id=1, access_hash=0),
+        offset_id=0, offset_date=0, add_offset=0, limit=100, max_id=0, min_id=0, hash=0
+    )
+
+    session.client.rate_limiter.flood(query, 3600)
+    learned = session.client.rate_limiter.learned()
+
+    # The wait comes from the rate limiter, not from the server
+    for _ in range(3):
+        with pytest.raises(FloodWait):
+            await session.invoke(query, sleep_threshold=10)
+
+    [(*limit, until)], [(*expected, expected_until)] = session.client.rate_limiter.learned(), learned
+    assert limit == expected and until == pytest.approx(expected_until, abs=0.01)
+    assert not session.connection.sent
+
+
+async def count_pings(session, traffic: bool) -> int:
+    loop = asyncio.get_running_loop()
+    session.ping_interval = 0.05
+    session.connection.last_received = loop.time()
+    task = asyncio.create_task(session.ping_worker())
+
+    for _ in range(30):
+        await asyncio.sleep(0.01)
+
+        if traffic:
+            session.connection.last_received = loop.time()
+
+    session.ping_task_event.set()
+    await task
+
+    return sum(isinstance(m.body, raw.functions.PingDelayDisconnect) for m in session.connection.sent)
+
+
+@pytest.mark.asyncio
+async def test_ping_idle(session):
+    assert await count_pings(session, traffic=False) >= 4
+
+
+@pytest.mark.asyncio
+async def test_ping_skipped_with_traffic(session):
+    # Only the pings keeping the server from dropping the connection go out
+    assert await count_pings(session, traffic=True) <= 2
+
+
+@pytest.mark.asyncio
+async def test_stop_not_held_by_config_refresh(session):
+    await session._set_state(session_module.SessionState.STARTED)
+    session.ping_interval = 0.01
+    session.config_expires = 1
+    session.ping_task = asyncio.create_task(session.ping_worker())
+
+    # The refresh never gets an answer
+    while session.config_task is None or not session.results:
+        await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(session.stop(), 1)
+
+    assert session.config_task is None and session.ping_task is None
+
+
+@pytest.mark.asyncio
+async def test_packets_handled_in_order(session):
+    loop = asyncio.get_running_loop()
+    session.packets = asyncio.Queue(Session.MAX_PENDING_PACKETS)
+    task = asyncio.create_task(session.process_worker())
+
+    first, second = raw.types.UpdatesTooLong(), raw.types.UpdateShort(update=raw.types.UpdateConfig(), date=0)
+    slow, fast = loop.create_future(), loop.create_future()
+    first_id, second_id = MsgId(), MsgId()
+
+    await session.packets.put(slow)
+    await session.packets.put(fast)
+
+    # The second packet is decrypted first
+    fast.set_result(Message(second, second_id, 0, len(second)))
+    await asyncio.sleep(0.01)
+    assert session.client.updates == [] and session.stats()["packets"] == 1
+
+    slow.set_result(Message(first, first_id, 0, len(first)))
+    await asyncio.sleep(0.01)
+    assert session.client.updates == [first, second]
+
+    task.cancel()
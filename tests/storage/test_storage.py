@@ -0,0 +1,93 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+
+import pytest
+
+from pyrogram.storage import FileStorage, MemoryStorage, Storage
+from pyrogram.storage.sqlite_storage import SCHEMA
+
+DC_OPTIONS = [
+    (2, "149.154.167.51", 443, False, False, False, False),
+    (2, "2001:67c:4e8:f002::a", 443, True, False, False, False),
+    (2, "149.154.167.151", 443, False, True, False, False),
+    (203, "91.105.192.100", 443, False, False, True, False),
+]
+
+
+@pytest.mark.asyncio
+async def test_dc_options():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    assert await storage.dc_options() == []
+
+    for _ in range(2):
+        await storage.dc_options(DC_OPTIONS)
+
+    assert await storage.dc_options() == DC_OPTIONS
+
+
+@pytest.mark.asyncio
+async def test_not_kept():
+    # Third-party storages written before these were added keep working
+    storage = Storage("test")
+
+    await storage.dc_options(DC_OPTIONS)
+    await storage.rate_limits([("functions.help.GetConfig", 0, 1.0, 0.0)])
+
+    assert await storage.dc_options() == []
+    assert await storage.rate_limits() == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limits():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    assert await storage.rate_limits() == []
+
+    limits = [("functions.messages.GetHistory", -1001, 0.5, 1700000000.0), ("functions.help.GetConfig", 0, 1.0, 0.0)]
+
+    for _ in range(2):
+        await storage.rate_limits(limits)
+
+    assert sorted(await storage.rate_limits()) == sorted(limits)
+
+
+@pytest.mark.asyncio
+async def test_migration(tmp_path):
+    # A version 4 session file, from before the data center options were kept
+    conn = sqlite3.connect(tmp_path / "test.session")
+    conn.executescript(SCHEMA.split("CREATE TABLE dc_options")[0] + "CREATE TABLE version (number INTEGER PRIMARY KEY);")
+    conn.execute("INSERT INTO version VALUES (4)")
+    conn.execute("INSERT INTO sessions VALUES (2, 1, 0, NULL, 0, NULL, NULL)")
+    conn.commit()
+    conn.close()
+
+    storage = FileStorage("test", tmp_path)
+    await storage.open()
+
+    assert storage.version() == FileStorage.VERSION == 6
+
+    await storage.dc_options(DC_OPTIONS)
+
+    assert await storage.dc_options() == DC_OPTIONS
+
+    await storage.close()
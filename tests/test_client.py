@@ -0,0 +1,102 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+import pyrogram
+from pyrogram import Client
+
+
+@pytest.mark.asyncio
+async def test_updates_backpressure():
+    client = Client("test", in_memory=True, updates_queue_size=2)
+    handled = []
+    gate, response = asyncio.Event(), asyncio.Event()
+
+    async def handle_updates(updates):
+        await gate.wait()
+        handled.append(updates)
+
+    async def invoke(query):
+        await response.wait()
+
+    client.handle_updates = handle_updates
+    client.invoke = invoke
+
+    await client.put_updates(0)
+    await asyncio.sleep(0)
+
+    await client.put_updates(1)
+    await client.put_updates(2)
+
+    put = asyncio.create_task(client.put_updates(3))
+    await asyncio.sleep(0.01)
+    assert not put.done() and client.pipeline_stats()["updates"] == 2
+
+    async def fetch_difference():
+        # Any request made meanwhile, resolving a peer too, lets the next updates through
+        async with client.fetching_difference():
+            await client.invoke(None)
+
+    # Updates waiting for a response of their own let the next ones through
+    fetch = asyncio.create_task(fetch_difference())
+    await asyncio.sleep(0.01)
+    assert put.done()
+
+    response.set()
+    gate.set()
+    await fetch
+    await asyncio.sleep(0.01)
+    assert handled == [0, 1, 2, 3]
+
+    await client.stop_updates_worker()
+
+
+@pytest.mark.asyncio
+async def test_stop_drops_pending_updates():
+    client = Client("test", in_memory=True)
+    gate = asyncio.Event()
+
+    async def handle_updates(updates):
+        await gate.wait()
+
+    client.handle_updates = handle_updates
+
+    for i in range(3):
+        await client.put_updates(i)
+
+    await asyncio.sleep(0)
+    await client.stop_updates_worker()
+
+    assert client.pipeline_stats()["updates"] == 0
+
+
+@pytest.mark.asyncio
+async def test_terminate_shuts_crypto_pools_down():
+    client = Client("test", in_memory=True, crypto_pool_per_dc=True)
+    schedulers = [client.get_crypto_scheduler(dc_id) for dc_id in (2, 4)]
+
+    await client.storage.open()
+    client.is_initialized = True
+    await client.terminate()
+
+    assert all(scheduler.executor is None for scheduler in schedulers)
+    assert not client.crypto_schedulers
+    assert pyrogram.crypto_scheduler.executor is not None
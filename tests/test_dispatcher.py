@@ -0,0 +1,55 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.dispatcher import Dispatcher
+from pyrogram.handlers import EditedMessageHandler, MessageHandler, RawUpdateHandler
+
+
+def dispatcher(**kwargs) -> Dispatcher:
+    return Dispatcher(SimpleNamespace(**{"no_updates": False, "skip_updates": True, **kwargs}))
+
+
+@pytest.mark.asyncio
+async def test_update_ids():
+    d = dispatcher()
+    assert d.update_ids == frozenset()
+
+    handler = MessageHandler(lambda *_: None)
+    d.add_handler(handler, 0)
+    assert d.update_ids == {update.ID for update in Dispatcher.NEW_MESSAGE_UPDATES}
+
+    d.add_handler(EditedMessageHandler(lambda *_: None), 1)
+    assert raw.types.UpdateEditChannelMessage.ID in d.update_ids
+
+    d.remove_handler(handler, 0)
+    assert raw.types.UpdateNewMessage.ID not in d.update_ids
+
+
+@pytest.mark.asyncio
+async def test_update_ids_all():
+    d = dispatcher()
+    d.add_handler(RawUpdateHandler(lambda *_: None), 0)
+    assert d.update_ids is None
+
+    assert dispatcher(skip_updates=False).update_ids is None
+    assert dispatcher(no_updates=True).update_ids == frozenset()